@@ -0,0 +1,193 @@
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+import headless
+from images import write_png
+
+# RENDERIZAÇÃO EM LOTE
+# Renderiza uma lista de vistas (posição da câmera e instante da animação)
+# em um pool de processos. Cada worker abre o seu próprio contexto sem
+# janela (EGL/OSMesa), prepara a geometria uma vez e desenha as vistas que
+# receber com draw_scene(), sem o HUD. As imagens voltam na ordem da lista:
+# cada uma vira um PNG (gravado pelo próprio worker) e, opcionalmente, uma
+# célula de uma folha de sprites.
+#
+#   python batch_render.py --turntable 36 --size 512x512 --sheet w16_turntable.png
+#   python batch_render.py --spec vistas.json --output stills --workers 8
+#
+# Formato do --spec (cada item de "views" é uma vista, um giro ou uma varredura):
+#   {"size": [1920, 1080], "core": false, "cars": 0,
+#    "views": [{"angle_x": 10, "angle_y": 30, "distance": 7, "time": 2.0},
+#              {"turntable": {"count": 36, "elevation": 15, "distance": 8, "time": 0}},
+#              {"sweep": {"count": 60, "start": {...vista...}, "end": {...vista...}}}]}
+
+# angle_x: elevação e angle_y: giro em graus, como camera_angle_x/y de
+# main.py; time: segundos desde o início da animação
+View = collections.namedtuple('View', ['angle_x', 'angle_y', 'distance', 'time'])
+
+DEFAULT_VIEW = View(15.0, 25.0, 8.0, 0.0)
+FRAME_PATTERN = "view_%05d.png"
+
+
+def make_view(values):
+    return DEFAULT_VIEW._replace(**{name: float(value) for name, value in values.items()})
+
+
+# count vistas em volta do carro, com o mesmo ângulo entre elas
+def turntable(count, elevation=DEFAULT_VIEW.angle_x, distance=DEFAULT_VIEW.distance, time=0.0, start=0.0):
+    angles = start + np.arange(count) * 360.0 / count
+    return [View(float(elevation), float(angle), float(distance), float(time)) for angle in angles]
+
+
+# count vistas interpolando câmera e tempo de start até end (inclusive)
+def camera_sweep(start, end, count):
+    steps = np.linspace(0.0, 1.0, count)
+    return [View(*(float(a + (b - a) * t) for a, b in zip(start, end))) for t in steps]
+
+
+def expand_views(entries):
+    views = []
+    for entry in entries:
+        if 'turntable' in entry:
+            views.extend(turntable(**entry['turntable']))
+        elif 'sweep' in entry:
+            sweep = entry['sweep']
+            views.extend(camera_sweep(make_view(sweep['start']), make_view(sweep['end']), sweep['count']))
+        else:
+            views.append(make_view(entry))
+    return views
+
+
+def load_spec(path):
+    with open(path) as f:
+        spec = json.load(f)
+    return spec, expand_views(spec.get('views', []))
+
+
+# Junta as imagens em uma grade, da esquerda para a direita e de cima para baixo
+def sprite_sheet(images, columns):
+    height, width = images[0].shape[:2]
+    rows = -(-len(images) // columns)
+    sheet = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+    for i, image in enumerate(images):
+        row, column = divmod(i, columns)
+        sheet[row * height:(row + 1) * height, column * width:(column + 1) * width] = image
+    return sheet
+
+
+# WORKER
+# Estado de cada processo do pool: o módulo main.py (importado só depois de
+# escolher a plataforma do PyOpenGL) e o contexto sem janela
+_viewer = None
+_context = None
+
+
+def _init_worker(backend, size, core, cars, asset, geometry_cache):
+    global _viewer, _context
+
+    headless.configure_platform(backend)
+    import main as viewer
+
+    width, height = size
+    _context = headless.HeadlessContext(width, height, backend, 'core' if core else 'compatibility')
+    if geometry_cache:
+        viewer.enable_mesh_cache()
+    if asset:
+        viewer.load_car_asset(asset)
+    viewer.setup_gl(width, height, core)
+    if cars:
+        viewer.enable_grid(cars)
+    _viewer = viewer
+
+
+def _render_view(job):
+    index, view, output, keep = job
+    viewer = _viewer
+
+    viewer.camera_angle_x, viewer.camera_angle_y, viewer.camera_distance = view.angle_x, view.angle_y, view.distance
+    viewer.seek_animation(view.time)
+    # Sem histerese entre vistas: o nível de detalhe não depende da vista anterior
+    viewer.lod_selector.reset()
+    viewer.render_frame(_context.width, _context.height, hud=False)
+    pixels = _context.read_pixels()
+
+    if output:
+        write_png(os.path.join(output, FRAME_PATTERN % index), pixels)
+    return pixels if keep else None
+
+
+# Devolve as imagens na ordem de views (None para cada uma se keep=False).
+# Os workers são criados com 'spawn': cada um importa o PyOpenGL do zero,
+# com a plataforma headless, em vez de herdar o estado do processo pai.
+def render_views(views, size, output=None, keep=False, workers=None, backend='egl', core=False, cars=0,
+                 asset=None, geometry_cache=True):
+    if output:
+        os.makedirs(output, exist_ok=True)
+    setup = (backend, tuple(size), core, cars, asset, geometry_cache)
+    jobs = [(i, view, output, keep) for i, view in enumerate(views)]
+    workers = min(workers or os.cpu_count(), len(jobs)) or 1
+
+    if workers == 1:
+        _init_worker(*setup)
+        try:
+            return [_render_view(job) for job in jobs]
+        finally:
+            _viewer.release_gl()
+            _context.release()
+
+    with multiprocessing.get_context('spawn').Pool(workers, _init_worker, setup) as pool:
+        return pool.map(_render_view, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Renderização em lote de vistas do carro")
+    parser.add_argument("--spec", help="arquivo JSON com as vistas (ver o início de batch_render.py)")
+    parser.add_argument("--turntable", type=int, default=0, help="N vistas em volta do carro")
+    parser.add_argument("--elevation", type=float, default=DEFAULT_VIEW.angle_x, help="elevação da câmera no giro")
+    parser.add_argument("--distance", type=float, default=DEFAULT_VIEW.distance, help="distância da câmera no giro")
+    parser.add_argument("--time", type=float, default=0.0, help="instante da animação no giro, em segundos")
+    parser.add_argument("--size", type=headless.parse_size, default=None, help="resolução LARGURAxALTURA")
+    parser.add_argument("--core", action="store_true", help="usa o caminho de shaders (OpenGL 3.3 core)")
+    parser.add_argument("--cars", type=int, default=None, help="desenha um grid com N carros")
+    parser.add_argument("--asset", help="carrega o carro de um .glb (gltf_export.py)")
+    parser.add_argument("--no-geometry-cache", action="store_true", help="gera a geometria sem o cache em disco")
+    parser.add_argument("--osmesa", action="store_true", help="usa OSMesa em vez de EGL")
+    parser.add_argument("--workers", type=int, default=None, help="processos no pool (padrão: um por CPU)")
+    parser.add_argument("--output", default="batch", help="pasta dos PNGs ('' para não gravar)")
+    parser.add_argument("--sheet", help="grava também uma folha de sprites com todas as vistas")
+    parser.add_argument("--columns", type=int, default=0, help="colunas da folha de sprites (padrão: quadrada)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    spec, views = load_spec(args.spec) if args.spec else ({}, [])
+    if args.turntable:
+        views += turntable(args.turntable, args.elevation, args.distance, args.time)
+    if not views:
+        raise SystemExit("nenhuma vista: use --spec ou --turntable")
+
+    size = args.size or tuple(spec.get('size', (1024, 1024)))
+    core = args.core or spec.get('core', False)
+    cars = args.cars if args.cars is not None else spec.get('cars', 0)
+    backend = 'osmesa' if args.osmesa else 'egl'
+
+    start = time.perf_counter()
+    images = render_views(views, size, args.output, bool(args.sheet), args.workers, backend, core, cars,
+                          args.asset or spec.get('asset'), not args.no_geometry_cache)
+    elapsed = time.perf_counter() - start
+
+    if args.sheet:
+        columns = args.columns or int(np.ceil(np.sqrt(len(images))))
+        write_png(args.sheet, sprite_sheet(images, columns))
+    print("%d vistas %dx%d em %.2f s (%.1f vistas/s)" % (len(views), size[0], size[1], elapsed, len(views) / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import argparse
+import collections
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+
+import headless
+
+# BENCHMARK DE TEMPO DE QUADRO
+# Roda update_animation + draw_scene + draw_hud_opengl por um número fixo de
+# quadros, com câmera orbital roteirizada e dt fixo (sem clock.tick), e grava
+# percentis do tempo de quadro, tempo por componente e vértices enviados em
+# JSON. Por padrão usa o contexto headless, então roda em máquinas sem GPU.
+#
+#   python benchmark.py --frames 600 --size 1280x720 --output bench.json
+
+# Componentes medidos: nome no relatório -> função de main.py
+COMPONENTS = [
+    ('track', 'draw_track'),
+    ('chassis', 'draw_chassis'),
+    ('grid', 'draw_grid'),
+    ('wheels', 'draw_wheels_on_suspension'),
+    ('rear_wing', 'draw_drs_flap'),
+    ('hud', 'draw_hud_opengl'),
+]
+
+
+def percentiles(samples):
+    import numpy as np
+
+    samples = np.asarray(samples, dtype=np.float64) * 1000.0
+    if len(samples) == 0:
+        return {}
+    return {
+        'mean': float(samples.mean()),
+        'min': float(samples.min()),
+        'p50': float(np.percentile(samples, 50)),
+        'p95': float(np.percentile(samples, 95)),
+        'p99': float(np.percentile(samples, 99)),
+        'max': float(samples.max()),
+    }
+
+
+# Órbita determinística: uma volta completa em torno do carro, subindo e
+# descendo e variando o zoom
+def scripted_camera(frame, frames):
+    t = frame / max(frames, 1)
+    angle_y = 25.0 + 360.0 * t
+    angle_x = 15.0 + 20.0 * math.sin(2 * math.pi * t)
+    distance = 10.0 + 6.0 * math.sin(4 * math.pi * t)
+    return angle_x, angle_y, distance
+
+
+class ComponentTimer:
+    def __init__(self, module):
+        self.module = module
+        self.originals = {}
+        self.totals = {}
+
+    def install(self):
+        for name, function_name in COMPONENTS:
+            original = getattr(self.module, function_name)
+            self.originals[function_name] = original
+            setattr(self.module, function_name, self._wrap(name, original))
+
+    def uninstall(self):
+        for function_name, original in self.originals.items():
+            setattr(self.module, function_name, original)
+        self.originals.clear()
+
+    def _wrap(self, name, function):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.totals[name] = self.totals.get(name, 0.0) + time.perf_counter() - start
+        return timed
+
+    def reset(self):
+        self.totals = {}
+
+    # draw_chassis inclui flap e rodas; o chassi é reportado sem eles. No
+    # grid em pipeline fixo, draw_grid é quem chama draw_drs_flap.
+    def frame_times(self):
+        times = {name: self.totals.get(name, 0.0) for name, _ in COMPONENTS}
+        parent = 'grid' if times['grid'] else 'chassis'
+        times[parent] -= times['wheels'] + times['rear_wing']
+        return times
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(main, frames, width, height, dt=1.0 / 60, warmup=10, compiled=True, finish=True,
+                  instrument=False, lod=True, culling=True):
+    from OpenGL.GL import GL_RENDERER, GL_VERSION, glFinish, glGetString
+    import culling as frustum_culling
+    import gl_backend
+    import instrumentation
+
+    main.compiled_geometry = compiled
+    main.lod_selector.enabled = lod
+    main.lod_selector.reset()
+    main.culling_enabled = culling
+    if not main.animation_running:
+        main.toggle_animation()
+
+    # A instrumentação entra antes dos timers para enxergar as funções draw_* originais
+    if instrument:
+        main.toggle_instrumentation()
+    timer = ComponentTimer(main)
+    timer.install()
+    gl_calls = collections.defaultdict(collections.Counter)
+
+    frame_times = []
+    component_times = {name: [] for name, _ in COMPONENTS}
+    vertices = []
+    draw_calls = []
+    culled = []
+
+    try:
+        for frame in range(warmup + frames):
+            main.camera_angle_x, main.camera_angle_y, main.camera_distance = scripted_camera(frame, frames)
+            timer.reset()
+            gl_backend.reset_frame_stats()
+            frustum_culling.reset_frame_stats()
+
+            start = time.perf_counter()
+            main.update_animation(dt)
+            main.render_frame(width, height)
+            if finish:
+                glFinish()
+            elapsed = time.perf_counter() - start
+
+            if frame < warmup:
+                continue
+            frame_times.append(elapsed)
+            for name, value in timer.frame_times().items():
+                component_times[name].append(value)
+            vertices.append(gl_backend.frame_stats['vertices'])
+            draw_calls.append(gl_backend.frame_stats['draw_calls'])
+            culled.append(frustum_culling.frame_stats['culled'])
+            for name, counts in instrumentation.last_frame().items():
+                gl_calls[name].update(counts)
+    finally:
+        timer.uninstall()
+        if instrumentation.enabled:
+            instrumentation.disable()
+
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'renderer': glGetString(GL_RENDERER).decode(errors='replace'),
+        'gl_version': glGetString(GL_VERSION).decode(errors='replace'),
+        'frames': frames,
+        'warmup': warmup,
+        'size': [width, height],
+        'dt': dt,
+        'sim_rate': main.car_simulation.rate,
+        'compiled_geometry': compiled,
+        'lod': lod,
+        'culling': culling,
+        'core_profile': main.core_renderer is not None,
+        'cars': main.car_grid.count if main.car_grid is not None else 1,
+        'frame_time_ms': percentiles(frame_times),
+        'fps_mean': len(frame_times) / sum(frame_times) if frame_times else 0.0,
+        'components_ms': {name: percentiles(samples) for name, samples in component_times.items()},
+        'vertices_per_frame': int(sum(vertices) / len(vertices)) if vertices else 0,
+        'draw_calls_per_frame': int(sum(draw_calls) / len(draw_calls)) if draw_calls else 0,
+        'culled_per_frame': sum(culled) / len(culled) if culled else 0.0,
+        # Média de chamadas GL por quadro e por componente (só com --instrument)
+        'gl_calls_per_frame': {
+            name: {call: count / frames for call, count in sorted(counts.items())}
+            for name, counts in gl_calls.items()
+        },
+    }
+
+
+def print_report(result):
+    frame = result['frame_time_ms']
+    print("%s | %dx%d | %d quadros | %s | %d carro(s) | compilado=%s | lod=%s | culling=%s" % (
+        result['renderer'], result['size'][0], result['size'][1], result['frames'],
+        'core' if result['core_profile'] else 'pipeline fixo', result['cars'], result['compiled_geometry'],
+        result['lod'], result['culling']))
+    print("quadro   p50 %7.3f ms  p95 %7.3f ms  p99 %7.3f ms  (%.1f fps)" % (
+        frame['p50'], frame['p95'], frame['p99'], result['fps_mean']))
+    for name, stats in result['components_ms'].items():
+        print("%-9s p50 %7.3f ms  p95 %7.3f ms  p99 %7.3f ms" % (name, stats['p50'], stats['p95'], stats['p99']))
+    print("vertices/quadro %d | draw calls/quadro %d | componentes descartados/quadro %.1f" % (
+        result['vertices_per_frame'], result['draw_calls_per_frame'], result['culled_per_frame']))
+    if 'setup_ms' in result:
+        source = result['asset'] or 'geometria gerada'
+        if result.get('geometry_cache') and not result['asset']:
+            source = "cache: %(hits)d do disco, %(misses)d gerados" % result['geometry_cache']
+        print("setup_gl %.1f ms (%s)" % (result['setup_ms'], source))
+    if result.get('track_streaming'):
+        print("pista: %(resident)d trechos na GPU (%(resident_mib).1f MiB) | %(uploads)d enviados, "
+              "%(prefetched)d adiantados, %(evictions)d liberados | %(waited)d esperados (%(wait_ms).1f ms)"
+              % result['track_streaming'])
+    if result.get('record'):
+        print("gravacao %(path)s: %(frames)d quadros, %(finish_ms).1f ms para esvaziar a fila" % result['record'])
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark de tempo de quadro do F1 W16")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--size", type=headless.parse_size, default=(1280, 720))
+    parser.add_argument("--dt", type=float, default=1.0 / 60, help="passo de simulação fixo em segundos")
+    parser.add_argument("--immediate", action="store_true", help="desativa a geometria compilada")
+    parser.add_argument("--no-lod", action="store_true", help="desenha sempre o nível de detalhe máximo")
+    parser.add_argument("--core", action="store_true", help="usa o caminho de shaders (OpenGL 3.3 core)")
+    parser.add_argument("--asset", help="carrega o carro de um .glb (gltf_export.py) em vez de gerar")
+    parser.add_argument("--no-geometry-cache", action="store_true",
+                        help="gera a geometria sem o cache em disco (mede o setup a frio)")
+    parser.add_argument("--telemetry", help="anima com uma volta gravada (.f1tel ou .csv) em vez do movimento sintético")
+    parser.add_argument("--circuit", nargs='?', const='', metavar="CSV",
+                        help="desenha um circuito (circuit.py) em vez da reta; sem CSV, o traçado embutido")
+    parser.add_argument("--track-budget", type=float, default=None, metavar="MIB",
+                        help="memória de GPU para os trechos do circuito")
+    parser.add_argument("--record", help="grava os quadros (pasta de PNGs ou .y4m) para medir o custo da captura")
+    parser.add_argument("--cars", type=int, default=0, help="desenha um grid com N carros (0 = carro unico)")
+    parser.add_argument("--no-culling", action="store_true", help="desativa o culling por frustum")
+    parser.add_argument("--osmesa", action="store_true", help="usa OSMesa em vez de EGL")
+    parser.add_argument("--window", action="store_true", help="usa uma janela pygame em vez do modo headless")
+    parser.add_argument("--instrument", action="store_true",
+                        help="conta chamadas GL por componente (adiciona overhead ao tempo medido)")
+    parser.add_argument("--output", default="benchmark.json", help="arquivo JSON de saída")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    width, height = args.size
+    backend = 'osmesa' if args.osmesa else 'egl'
+
+    if not args.window:
+        headless.configure_platform(backend)
+
+    import main as viewer
+
+    context = None
+    if args.window:
+        import pygame
+
+        pygame.init()
+        if args.core:
+            pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
+            pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
+            pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
+        pygame.display.set_mode((width, height), pygame.DOUBLEBUF | pygame.OPENGL)
+    else:
+        context = headless.HeadlessContext(width, height, backend, 'core' if args.core else 'compatibility')
+
+    setup_start = time.perf_counter()
+    if not args.no_geometry_cache:
+        viewer.enable_mesh_cache()
+    if args.asset:
+        viewer.load_car_asset(args.asset)
+    if args.telemetry:
+        viewer.load_telemetry(args.telemetry)
+    if args.circuit is not None:
+        if args.track_budget is not None:
+            viewer.track_budget = int(args.track_budget * 2 ** 20)
+        viewer.load_circuit(args.circuit or None)
+    viewer.setup_gl(width, height, args.core)
+    setup_seconds = time.perf_counter() - setup_start
+    if args.cars:
+        viewer.enable_grid(args.cars)
+    if args.record:
+        viewer.start_recording(args.record, width, height)
+    result = run_benchmark(viewer, args.frames, width, height, args.dt, args.warmup, not args.immediate,
+                           instrument=args.instrument, lod=not args.no_lod,
+                           culling=not args.no_culling)
+    if args.record:
+        # A captura entra no tempo de cada quadro; o que sobra na fila é medido à parte
+        recorded = viewer.frame_capture.frames
+        finish_start = time.perf_counter()
+        viewer.stop_recording()
+        result['record'] = {'path': args.record, 'frames': recorded,
+                            'finish_ms': (time.perf_counter() - finish_start) * 1000}
+    result['backend'] = 'window' if args.window else backend
+    result['asset'] = args.asset
+    result['telemetry'] = args.telemetry
+    result['circuit'] = None if args.circuit is None else (args.circuit or 'embutido')
+    result['setup_ms'] = setup_seconds * 1000
+    if viewer.track_streamer is not None:
+        streamer = viewer.track_streamer
+        result['track_streaming'] = dict(streamer.stats, resident=len(streamer.resident),
+                                         resident_mib=streamer.resident_bytes / 2 ** 20,
+                                         budget_mib=streamer.budget / 2 ** 20)
+    if viewer.mesh_source is not viewer.car_geometry:
+        result['geometry_cache'] = {'hits': viewer.mesh_source.hits, 'misses': viewer.mesh_source.misses}
+    viewer.release_gl()
+    if context is not None:
+        context.release()
+
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print_report(result)
+    print("resultado gravado em %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import collections
+import concurrent.futures
+import ctypes
+import os
+
+import numpy as np
+from OpenGL.GL import *
+
+from images import encode_png
+
+# CAPTURA DE QUADROS
+# glReadPixels vai para um pixel buffer object (PBO) e retorna sem esperar a
+# GPU; o quadro só é copiado para a memória do processo PBO_COUNT - 1
+# quadros depois, quando a leitura já terminou. A codificação (PNG ou
+# conversão para YUV do Y4M) roda em um pool de threads (zlib e NumPy
+# liberam o GIL); a escrita no arquivo de vídeo acontece na ordem dos
+# quadros, na thread principal.
+#
+#   python main.py --record video.y4m          # grava enquanto a janela roda
+#   python main.py --headless --output frames  # PNGs (ou --output video.y4m)
+
+PBO_COUNT = 3
+# Quadros codificando ao mesmo tempo antes de o loop esperar o mais antigo
+MAX_PENDING = 8
+Y4M_FPS = 60
+
+
+# Sequência de PNGs: cada thread grava o seu arquivo
+class PngSequenceWriter:
+    def __init__(self, directory, pattern="frame_%05d.png"):
+        self.directory = directory
+        self.pattern = pattern
+        os.makedirs(directory, exist_ok=True)
+
+    def encode(self, index, pixels):
+        with open(os.path.join(self.directory, self.pattern % index), 'wb') as f:
+            f.write(encode_png(pixels))
+
+    def write(self, index, data):
+        pass
+
+    def close(self):
+        pass
+
+
+# Vídeo Y4M sem compressão (YUV 4:2:0, BT.601 de faixa completa), que
+# ffmpeg e a maioria dos players leem direto
+class Y4mWriter:
+    def __init__(self, path, width, height, fps=Y4M_FPS):
+        if width % 2 or height % 2:
+            raise ValueError("Y4M 4:2:0 precisa de largura e altura pares")
+        self.file = open(path, 'wb')
+        self.file.write(b"YUV4MPEG2 W%d H%d F%d:1 Ip A1:1 C420jpeg\n" % (width, height, fps))
+
+    # Aritmética inteira em ponto fixo (pesos * 2^16); a crominância é
+    # calculada sobre a média RGB de cada bloco 2x2, que dá o mesmo
+    # resultado (a conversão é linear) com um quarto das contas
+    def encode(self, index, pixels):
+        rgb = pixels.astype(np.int32)
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        y = (19595 * r + 38470 * g + 7471 * b + 32768) >> 16
+
+        blocks = rgb[0::2, 0::2] + rgb[0::2, 1::2] + rgb[1::2, 0::2] + rgb[1::2, 1::2]
+        r, g, b = blocks[..., 0], blocks[..., 1], blocks[..., 2]
+        u = (-11059 * r - 21709 * g + 32768 * b + (128 * 4 << 16) + (2 << 16)) >> 18
+        v = (32768 * r - 27439 * g - 5329 * b + (128 * 4 << 16) + (2 << 16)) >> 18
+
+        planes = [y, u, v]
+        return b"FRAME\n" + b"".join(np.clip(p, 0, 255).astype(np.uint8).tobytes() for p in planes)
+
+    def write(self, index, data):
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+
+# .y4m grava vídeo; qualquer outro caminho é uma pasta de PNGs
+def open_writer(path, width, height):
+    if path.lower().endswith('.y4m'):
+        return Y4mWriter(path, width, height)
+    return PngSequenceWriter(path)
+
+
+class FrameCapture:
+    def __init__(self, width, height, writer, buffer_count=PBO_COUNT, workers=None):
+        self.width = width
+        self.height = height
+        self.writer = writer
+        self.frame_bytes = width * height * 3
+        self.buffers = [int(buffer) for buffer in np.atleast_1d(glGenBuffers(buffer_count))]
+        for buffer in self.buffers:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+            glBufferData(GL_PIXEL_PACK_BUFFER, self.frame_bytes, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+
+        # Índice do quadro lido em cada PBO (None = livre)
+        self.in_flight = [None] * len(self.buffers)
+        self.next_buffer = 0
+        self.frames = 0
+        self.pool = concurrent.futures.ThreadPoolExecutor(workers or os.cpu_count())
+        self.pending = collections.deque()
+
+    # Chamado depois de desenhar o quadro (e o HUD), antes da troca de buffers
+    def capture(self):
+        buffer = self.next_buffer
+        if self.in_flight[buffer] is not None:
+            self._collect(buffer)
+
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.buffers[buffer])
+        glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.in_flight[buffer] = self.frames
+        self.frames += 1
+        self.next_buffer = (buffer + 1) % len(self.buffers)
+
+        self._write_finished()
+
+    # Copia o PBO (já lido pela GPU) e manda o quadro para o pool
+    def _collect(self, buffer):
+        pixels = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.buffers[buffer])
+        glGetBufferSubData(GL_PIXEL_PACK_BUFFER, 0, self.frame_bytes, pixels)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        index = self.in_flight[buffer]
+        self.in_flight[buffer] = None
+
+        while len(self.pending) >= MAX_PENDING:
+            self._write(*self.pending.popleft())
+        self.pending.append((index, self.pool.submit(self._encode, index, pixels)))
+
+    def _encode(self, index, pixels):
+        return self.writer.encode(index, pixels[::-1])
+
+    def _write(self, index, future):
+        self.writer.write(index, future.result())
+
+    def _write_finished(self):
+        while self.pending and self.pending[0][1].done():
+            self._write(*self.pending.popleft())
+
+    # Lê os PBOs que faltam, espera a codificação e fecha o arquivo
+    def finish(self):
+        order = sorted((index, buffer) for buffer, index in enumerate(self.in_flight) if index is not None)
+        for _, buffer in order:
+            self._collect(buffer)
+        while self.pending:
+            self._write(*self.pending.popleft())
+        self.pool.shutdown()
+        self.writer.close()
+        glDeleteBuffers(len(self.buffers), self.buffers)
+        self.buffers = []
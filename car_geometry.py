@@ -0,0 +1,783 @@
+import math
+import time
+
+import numpy as np
+
+from mesh import (
+    box, compose, cylinder, disk, merge_meshes, polygon, quad_strip, quads, ring,
+    rotation, scaling, translation,
+)
+
+# GERADORES DE MALHA DO CARRO
+# Cada função devolve um Mesh em coordenadas do carro, sem nenhuma chamada
+# OpenGL. As tabelas de perfil ficam no nível do módulo para poderem ser
+# reutilizadas (e inspecionadas) fora dos geradores.
+
+CARBON = (0.08, 0.08, 0.08)
+CARBON_DARK = (0.06, 0.06, 0.06)
+TURQUOISE = (0, 0.85, 0.80)
+
+# MONOCOQUE / CHASSI PRINCIPAL
+MONOCOQUE_PROFILE = [
+    (1.5, 0.28),   # Frente (conexão com bico)
+    (0.8, 0.32),   # Cockpit (mais largo)
+    (0.2, 0.30),   # Atrás do cockpit
+    (-0.3, 0.25),  # Início sidepods
+    (-0.8, 0.22),  # Meio
+    (-1.4, 0.18),  # Afunilando
+    (-1.8, 0.12),  # Traseira estreita
+]
+MONOCOQUE_Y_TOP = 0.12
+MONOCOQUE_Y_BOTTOM = -0.22
+
+def monocoque_mesh():
+    profile = np.array(MONOCOQUE_PROFILE)
+    x, z = profile[:, 0], profile[:, 1]
+    y_top = np.full_like(x, MONOCOQUE_Y_TOP)
+    y_bottom = np.full_like(x, MONOCOQUE_Y_BOTTOM)
+
+    top_left = np.column_stack((x, y_top, -z))
+    top_right = np.column_stack((x, y_top, z))
+    bottom_left = np.column_stack((x, y_bottom, -z * 0.9))
+    bottom_right = np.column_stack((x, y_bottom, z * 0.9))
+
+    return merge_meshes([
+        quad_strip(top_left, top_right, CARBON, (0, 1, 0)),
+        quad_strip(bottom_right, bottom_left, CARBON, (0, -1, 0)),
+        quad_strip(top_right, bottom_right, CARBON, (0, 0, 1)),
+        quad_strip(bottom_left, top_left, CARBON, (0, 0, -1)),
+    ], 'monocoque')
+
+# COBERTURA DO MOTOR
+ENGINE_COVER_PROFILE = [
+    (0.2, 0.15),    # Início (atrás do cockpit)
+    (0.0, 0.28),    # Subindo
+    (-0.15, 0.42),  # Subindo mais (base do airbox)
+    (-0.3, 0.52),   # Pico máximo (topo do airbox)
+    (-0.5, 0.48),   # Começando a descer
+    (-0.7, 0.40),   # Descendo
+    (-0.9, 0.32),   # Descendo mais
+    (-1.1, 0.24),   # Continuando
+    (-1.3, 0.18),   # Quase no fim
+    (-1.5, 0.14),   # Baixo
+    (-1.7, 0.10),   # Mais baixo
+    (-1.9, 0.06),   # Traseira
+]
+ENGINE_COVER_WIDTHS = [0.28, 0.26, 0.22, 0.18, 0.16, 0.15, 0.14, 0.13, 0.12, 0.11, 0.10, 0.08]
+
+def engine_cover_mesh():
+    profile = np.array(ENGINE_COVER_PROFILE)
+    x, y = profile[:, 0], profile[:, 1]
+    w = np.array(ENGINE_COVER_WIDTHS)
+    y_base = np.where(x > -0.5, 0.12, 0.10 - (x + 0.5) * 0.05)
+
+    top_left = np.column_stack((x, y, -w))
+    top_right = np.column_stack((x, y, w))
+    base_left = np.column_stack((x, y_base, -w))
+    base_right = np.column_stack((x, y_base, w))
+
+    x_back, y_back, w_back = x[-1], y[-1], w[-1]
+    back = quads([[
+        (x_back, y_back, -w_back),
+        (x_back, y_back, w_back),
+        (x_back, -0.05, w_back),
+        (x_back, -0.05, -w_back),
+    ]], CARBON_DARK, (-1, 0, 0))
+
+    return merge_meshes([
+        quad_strip(top_left, top_right, CARBON, (0, 1, 0)),
+        quad_strip(top_right, base_right, CARBON, (0, 0, 1)),
+        quad_strip(base_left, top_left, CARBON, (0, 0, -1)),
+        back,
+    ], 'engine_cover')
+
+# BICO
+NOSE_SECTIONS = [
+    # x,    larg. topo, larg. base, y topo, y base
+    (1.5,   0.22,  0.20,  0.08,  -0.20),  # Base (conexão com chassi)
+    (1.8,   0.18,  0.17,  0.04,  -0.20),  # Transição
+    (2.1,   0.15,  0.14,  0.00,  -0.19),  #
+    (2.4,   0.12,  0.11, -0.04,  -0.18),  # Meio do bico
+    (2.7,   0.09,  0.08, -0.06,  -0.17),  # Afunilando
+    (3.0,   0.06,  0.05, -0.08,  -0.16),  # Mais fino
+    (3.2,   0.04,  0.03, -0.10,  -0.15),  # Quase na ponta
+    (3.4,   0.02,  0.015, -0.12,  -0.14),  # Ponta
+]
+
+def nose_mesh():
+    s = np.array(NOSE_SECTIONS)
+    x1, wt1, wb1, yt1, yb1 = s[:-1].T
+    x2, wt2, wb2, yt2, yb2 = s[1:].T
+
+    def corners(*points):
+        return np.stack([np.stack(p, axis=1) for p in points], axis=1)
+
+    top = corners((x1, yt1, -wt1), (x1, yt1, wt1), (x2, yt2, wt2), (x2, yt2, -wt2))
+    bottom = corners((x1, yb1, wt1), (x1, yb1, -wt1), (x2, yb2, -wt2), (x2, yb2, wt2))
+    right = corners((x1, yt1, wt1), (x1, yb1, wb1), (x2, yb2, wb2), (x2, yt2, wt2))
+    left = corners((x1, yt1, -wt1), (x2, yt2, -wt2), (x2, yb2, -wb2), (x1, yb1, -wb1))
+
+    x_tip, wt_tip, _, yt_tip, yb_tip = NOSE_SECTIONS[-1]
+    tip = quads([[
+        (x_tip, yt_tip, -wt_tip),
+        (x_tip, yt_tip, wt_tip),
+        (x_tip, yb_tip, wt_tip),
+        (x_tip, yb_tip, -wt_tip),
+    ]], CARBON_DARK, (1, 0, 0))
+
+    return merge_meshes([
+        quads(top, CARBON, (0, 1, 0)),
+        quads(bottom, CARBON, (0, -1, 0)),
+        quads(right, CARBON, (0, 0, 1)),
+        quads(left, CARBON, (0, 0, -1)),
+        tip,
+    ], 'nose')
+
+# SIDEPODS
+SIDEPOD_WIDTHS = [
+    (0.8, 0.55),    # Frente - largo
+    (0.5, 0.60),    # Máxima largura
+    (0.0, 0.55),    # Meio
+    (-0.4, 0.45),   # Começando undercut
+    (-0.8, 0.30),   # Undercut forte
+    (-1.2, 0.18),   # Traseira estreita
+]
+SIDEPOD_Y_TOP = 0.18
+SIDEPOD_Y_BOTTOM = -0.20
+SIDEPOD_COLOR = (0.10, 0.10, 0.10)
+
+def sidepod_mesh(side):
+    widths = np.array(SIDEPOD_WIDTHS)
+    x, w = widths[:, 0], widths[:, 1]
+    h = SIDEPOD_Y_TOP * np.where(np.arange(len(x)) < 2, 1.0, 0.85)
+    y_bottom = np.full_like(x, SIDEPOD_Y_BOTTOM)
+    z_inner = np.full_like(x, side * 0.22)
+    z_outer = side * 0.22 + side * w
+
+    top_inner = np.column_stack((x, h, z_inner))
+    top_outer = np.column_stack((x, h, z_outer))
+    bottom_inner = np.column_stack((x, y_bottom, z_inner))
+    bottom_outer = np.column_stack((x, y_bottom, z_outer))
+
+    def ends(i, normal):
+        return quads([[top_inner[i], top_outer[i], bottom_outer[i], bottom_inner[i]]],
+                     SIDEPOD_COLOR, normal)
+
+    return merge_meshes([
+        quad_strip(top_inner, top_outer, SIDEPOD_COLOR, (0, 1, 0)),
+        quad_strip(top_outer, bottom_outer, SIDEPOD_COLOR, (0, 0, side)),
+        quad_strip(bottom_outer, bottom_inner, SIDEPOD_COLOR, (0, -1, 0)),
+        ends(0, (1, 0, 0)),
+        ends(-1, (-1, 0, 0)),
+    ], 'sidepod_right' if side > 0 else 'sidepod_left')
+
+def sidepods_mesh():
+    return merge_meshes([sidepod_mesh(1), sidepod_mesh(-1)], 'sidepods')
+
+# HALO
+HALO_SEGMENTS = 32
+
+def halo_mesh(num_segments=HALO_SEGMENTS):
+    front_base_x = 1.05
+    front_base_y = 0.02
+    front_top_x = 0.70
+    front_top_y = 0.38
+    pillar_width_base = 0.06
+    pillar_width_top = 0.04
+    pillar_depth = 0.035
+
+    parts = [
+        quads([[
+            (front_base_x, front_base_y, -pillar_width_base),
+            (front_base_x, front_base_y, pillar_width_base),
+            (front_top_x, front_top_y, pillar_width_top),
+            (front_top_x, front_top_y, -pillar_width_top),
+        ]], CARBON, (0.7, 0.7, 0)),
+        quads([[
+            (front_base_x - pillar_depth, front_base_y, pillar_width_base),
+            (front_base_x - pillar_depth, front_base_y, -pillar_width_base),
+            (front_top_x - pillar_depth * 0.7, front_top_y, -pillar_width_top),
+            (front_top_x - pillar_depth * 0.7, front_top_y, pillar_width_top),
+        ]], CARBON, (-0.7, -0.7, 0)),
+    ]
+    for side in [-1, 1]:
+        parts.append(quads([[
+            (front_base_x, front_base_y, side * pillar_width_base),
+            (front_base_x - pillar_depth, front_base_y, side * pillar_width_base),
+            (front_top_x - pillar_depth * 0.7, front_top_y, side * pillar_width_top),
+            (front_top_x, front_top_y, side * pillar_width_top),
+        ]], CARBON, (0, 0, side)))
+
+    arc_center_x = 0.35
+    arc_center_y = 0.38
+    arc_radius_x = 0.38
+    arc_radius_z = 0.28
+    arc_thickness = 0.032
+    arc_height = 0.025
+
+    angles = 2 * math.pi * np.arange(num_segments + 1) / num_segments
+    ax = arc_center_x + np.cos(angles) * arc_radius_x
+    az = np.sin(angles) * arc_radius_z
+    ay = arc_center_y + 0.015 * np.abs(np.sin(angles))
+    half = arc_thickness * 0.5
+
+    def point(i, dy, dz):
+        return np.column_stack((ax[i], ay[i] + dy, az[i] + dz))
+
+    a, b = slice(0, -1), slice(1, None)
+    normals = np.column_stack((np.cos(angles), np.zeros_like(angles), np.sin(angles)))
+    side_normals = (normals[a] + normals[b]) * 0.5
+
+    parts += [
+        quads(np.stack((point(a, arc_height, -half), point(a, arc_height, half),
+                        point(b, arc_height, half), point(b, arc_height, -half)), axis=1),
+              CARBON, (0, 1, 0)),
+        quads(np.stack((point(a, 0, half), point(a, 0, -half),
+                        point(b, 0, -half), point(b, 0, half)), axis=1),
+              CARBON, (0, -1, 0)),
+        quads(np.stack((point(a, 0, half), point(a, arc_height, half),
+                        point(b, arc_height, half), point(b, 0, half)), axis=1),
+              CARBON, side_normals),
+        quads(np.stack((point(a, arc_height, -half), point(a, 0, -half),
+                        point(b, 0, -half), point(b, arc_height, -half)), axis=1),
+              CARBON, -side_normals),
+    ]
+
+    for side in [-1, 1]:
+        back_base_x = 0.05
+        back_base_y = 0.12
+        back_base_z = side * 0.22
+        back_top_x = arc_center_x - arc_radius_x * 0.95
+        back_top_y = arc_center_y
+        back_top_z = side * arc_radius_z * 0.95
+        back_width = 0.025
+        back_depth = 0.030
+
+        parts += [
+            quads([[
+                (back_base_x, back_base_y, back_base_z),
+                (back_base_x - back_depth, back_base_y, back_base_z),
+                (back_top_x - back_depth * 0.8, back_top_y, back_top_z),
+                (back_top_x, back_top_y, back_top_z),
+            ]], CARBON, (0, 0, side)),
+            quads([[
+                (back_base_x - back_depth, back_base_y, back_base_z - side * back_width),
+                (back_base_x, back_base_y, back_base_z - side * back_width),
+                (back_top_x, back_top_y, back_top_z - side * back_width * 0.8),
+                (back_top_x - back_depth * 0.8, back_top_y, back_top_z - side * back_width * 0.8),
+            ]], CARBON, (0, 0, -side)),
+            quads([[
+                (back_base_x, back_base_y, back_base_z - side * back_width),
+                (back_base_x, back_base_y, back_base_z),
+                (back_top_x, back_top_y, back_top_z),
+                (back_top_x, back_top_y, back_top_z - side * back_width * 0.8),
+            ]], CARBON, (1, 0, 0)),
+            quads([[
+                (back_base_x - back_depth, back_base_y, back_base_z),
+                (back_base_x - back_depth, back_base_y, back_base_z - side * back_width),
+                (back_top_x - back_depth * 0.8, back_top_y, back_top_z - side * back_width * 0.8),
+                (back_top_x - back_depth * 0.8, back_top_y, back_top_z),
+            ]], CARBON, (-1, 0, 0)),
+        ]
+
+    return merge_meshes(parts, 'halo')
+
+# ASA DIANTEIRA
+FRONT_WING_X = 3.2
+FRONT_WING_Y = -0.16
+FRONT_WING_HALF_WIDTH = 0.95
+FRONT_WING_SECTIONS = 12
+FRONT_WING_ELEMENTS = [
+    # y offset, espessura, corda frontal, corda traseira, ângulo
+    (0, 0.025, 0.25, 0.35, 5),
+    (0.045, 0.02, 0.18, 0.28, 12),
+    (0.085, 0.018, 0.12, 0.22, 20),
+    (0.12, 0.015, 0.08, 0.15, 28),
+]
+
+def front_wing_element_mesh(y_offset, thickness, chord_front, chord_back, angle,
+                            num_sections=FRONT_WING_SECTIONS, color=CARBON):
+    x_base = FRONT_WING_X
+    y_base = FRONT_WING_Y
+    wing_half_width = FRONT_WING_HALF_WIDTH
+
+    t = np.arange(num_sections + 1) / num_sections
+    z = -wing_half_width + t * 2 * wing_half_width
+    t_center = np.abs(t - 0.5) * 2
+    arch = -0.06 * (1 - t_center ** 1.2)
+    x_trailing = np.full_like(t, x_base + chord_back)
+    x_leading = x_base - chord_front * (1 + t_center * 0.4)
+    y_top = y_base + y_offset + arch
+    y_bot = y_top - thickness
+    rise = math.sin(math.radians(angle)) * chord_front
+
+    return merge_meshes([
+        quad_strip(np.column_stack((x_trailing, y_top, z)),
+                   np.column_stack((x_leading, y_top + rise, z)), color, (0, 1, 0)),
+        quad_strip(np.column_stack((x_leading, y_bot + rise, z)),
+                   np.column_stack((x_trailing, y_bot, z)), color, (0, -1, 0)),
+    ], 'front_wing_element')
+
+def front_wing_mesh(num_sections=FRONT_WING_SECTIONS):
+    x_base = FRONT_WING_X
+    y_base = FRONT_WING_Y
+    wing_half_width = FRONT_WING_HALF_WIDTH
+
+    parts = [front_wing_element_mesh(*element, num_sections=num_sections)
+             for element in FRONT_WING_ELEMENTS]
+
+    for side in [-1, 1]:
+        z_pos = side * wing_half_width
+        endplate = translation(x_base - 0.05, y_base + 0.08, z_pos)
+        t = -side * 0.02
+        parts += [
+            quads([[(0.35, 0.12, 0), (0.35, -0.08, 0), (-0.40, -0.08, 0), (-0.40, 0.18, 0)]],
+                  CARBON_DARK, (0, 0, side)).transformed(endplate),
+            quads([[(-0.40, 0.18, t), (-0.40, -0.08, t), (0.35, -0.08, t), (0.35, 0.12, t)]],
+                  CARBON_DARK, (0, 0, -side)).transformed(endplate),
+            quads([[(0.35, 0.12, 0), (-0.40, 0.18, 0), (-0.40, 0.18, t), (0.35, 0.12, t)]],
+                  SIDEPOD_COLOR, (0, 1, 0)).transformed(endplate),
+            quads([[(0.35, 0.12, 0), (0.35, 0.12, t), (0.35, -0.08, t), (0.35, -0.08, 0)]],
+                  SIDEPOD_COLOR, (1, 0, 0)).transformed(endplate),
+            box(TURQUOISE, compose(translation(x_base - 0.05, y_base + 0.22, z_pos - side * 0.01),
+                                   scaling(0.70, 0.02, 0.025))),
+            box(CARBON, compose(translation(x_base - 0.15, y_base + 0.02, side * 0.06),
+                                scaling(0.08, 0.06, 0.03))),
+        ]
+
+    parts += [
+        box(CARBON, compose(translation(x_base - 0.1, y_base + 0.02, 0), scaling(0.12, 0.06, 0.04))),
+        box(TURQUOISE, compose(translation(x_base - 0.05, y_base + 0.005, 0), scaling(0.50, 0.008, 0.30))),
+    ]
+    return merge_meshes(parts, 'front_wing')
+
+# ASSOALHO E DIFUSOR
+def floor_mesh():
+    y = -0.22
+    parts = [quads([[(2.0, y, -0.55), (2.0, y, 0.55), (-1.5, y, 0.55), (-1.5, y, -0.55)]],
+                   CARBON_DARK, (0, -1, 0))]
+    for side in [-1, 1]:
+        parts.append(quads([[
+            (1.8, y, side * 0.55),
+            (1.8, y, side * 0.75),
+            (-0.5, y, side * 0.75),
+            (-0.5, y, side * 0.55),
+        ]], CARBON, (0, -1, 0)))
+    return merge_meshes(parts, 'floor')
+
+def diffuser_mesh():
+    matrices = [
+        compose(translation(-1.6, -0.15, (i - 3) * 0.12), rotation(25, 0, 0, 1),
+                scaling(0.35, 0.02, 0.08))
+        for i in range(7)
+    ]
+    return box((0.05, 0.05, 0.05)).instanced(matrices, 'diffuser')
+
+# DETALHES VISUAIS
+def turquoise_accents_mesh():
+    parts = [box(TURQUOISE, compose(translation(2.5, -0.02, 0), scaling(0.6, 0.02, 0.12)))]
+    for side in [-1, 1]:
+        parts.append(box(TURQUOISE, compose(translation(0.2, 0.10, side * 0.52),
+                                            scaling(1.2, 0.015, 0.02))))
+    return merge_meshes(parts, 'turquoise_accents')
+
+def airbox_mesh():
+    color = SIDEPOD_COLOR
+    parts = [
+        quads([[(0.15, 0, -0.12), (0.15, 0, 0.12), (0.15, 0.25, 0.08), (0.15, 0.25, -0.08)]],
+              color, (1, 0, 0)),
+        quads([[(-0.15, 0, 0.12), (-0.15, 0, -0.12), (-0.15, 0.18, -0.06), (-0.15, 0.18, 0.06)]],
+              color, (-1, 0, 0)),
+        quads([[(0.15, 0.25, -0.08), (0.15, 0.25, 0.08), (-0.15, 0.18, 0.06), (-0.15, 0.18, -0.06)]],
+              color, (0.23, 0.97, 0)),
+    ]
+    for side in [-1, 1]:
+        z1 = side * 0.12
+        z2 = side * 0.08
+        z3 = side * 0.06
+        parts.append(polygon([(0.15, 0, z1), (-0.15, 0, z1), (-0.15, 0.18, z3), (0.15, 0.25, z2)],
+                             color, (0, 0.3, side)))
+    parts.append(box((0.02, 0.02, 0.02), compose(translation(0.16, 0.12, 0), scaling(0.02, 0.12, 0.10))))
+    return merge_meshes(parts, 'airbox').transformed(translation(-0.1, 0.30, 0))
+
+def mirrors_mesh():
+    parts = []
+    for side in [-1, 1]:
+        mount = compose(translation(0.9, 0.22, side * 0.42),
+                        rotation(side * 35, 0, 1, 0), rotation(-15, 0, 0, 1))
+        parts += [
+            cylinder(0.012, 0.012, 0.12, 8, (0.15, 0.15, 0.15)).transformed(mount),
+            box((0.5, 0.5, 0.55), compose(mount, translation(0, 0, 0.12), scaling(0.06, 0.04, 0.015))),
+        ]
+    return merge_meshes(parts, 'mirrors')
+
+# ASA TRASEIRA
+REAR_WING_X = -1.90
+REAR_WING_Y = 0.42
+REAR_WING_HALF_WIDTH = 0.48
+REAR_WING_CHORD = 0.35
+REAR_WING_SECTIONS = 16
+DRS_FLAP_CHORD = 0.12
+DRS_MAX_ANGLE = 25
+DRS_PIVOT = (REAR_WING_X - REAR_WING_CHORD * 0.5, REAR_WING_Y + 0.04, 0.0)
+
+def _rear_wing_span(num_sections):
+    t = np.arange(num_sections + 1) / num_sections
+    z = -REAR_WING_HALF_WIDTH + t * 2 * REAR_WING_HALF_WIDTH
+    t_center = np.abs(t - 0.5) * 2
+    return z, 0.02 * t_center * t_center
+
+def rear_wing_structure_mesh(num_sections=REAR_WING_SECTIONS):
+    x_base = REAR_WING_X
+    y_base = REAR_WING_Y
+    wing_half_width = REAR_WING_HALF_WIDTH
+    main_plane_chord = REAR_WING_CHORD
+    main_thickness = 0.025
+
+    z, arch = _rear_wing_span(num_sections)
+    x_front = np.full_like(z, x_base + main_plane_chord * 0.3)
+    x_back = np.full_like(z, x_base - main_plane_chord * 0.7)
+    y_pos = y_base + arch
+
+    parts = [
+        quad_strip(np.column_stack((x_front, y_pos + 0.08, z)),
+                   np.column_stack((x_back, y_pos, z)), CARBON_DARK, (0, 1, 0)),
+        quad_strip(np.column_stack((x_back, y_pos - main_thickness, z)),
+                   np.column_stack((x_front, y_pos - main_thickness + 0.08, z)), CARBON_DARK, (0, -1, 0)),
+        quad_strip(np.column_stack((x_front, y_pos + 0.08, z)),
+                   np.column_stack((x_front, y_pos + 0.08 - main_thickness, z)), CARBON_DARK, (1, 0, 0)),
+    ]
+
+    endplate_outline = [(0.15, 0.15), (0.15, -0.10), (-0.10, -0.35), (-0.30, -0.35),
+                        (-0.35, -0.20), (-0.35, 0.08), (-0.20, 0.12)]
+    for side in [-1, 1]:
+        z_pos = side * wing_half_width
+        endplate = translation(x_base, y_base, z_pos)
+        t = -side * 0.03
+        parts += [
+            polygon([(x, y, 0) for x, y in endplate_outline], CARBON_DARK, (0, 0, side)).transformed(endplate),
+            polygon([(x, y, t) for x, y in reversed(endplate_outline)], CARBON_DARK,
+                    (0, 0, -side)).transformed(endplate),
+            quads([[(0.15, 0.15, 0), (-0.20, 0.12, 0), (-0.20, 0.12, t), (0.15, 0.15, t)]],
+                  CARBON, (0, 1, 0)).transformed(endplate),
+            box(TURQUOISE, compose(translation(x_base - 0.02, y_base + 0.14, z_pos - side * 0.015),
+                                   scaling(0.32, 0.015, 0.02))),
+        ]
+
+    for side in [-1, 1]:
+        base = np.array((-1.7, 0.10, side * 0.08))
+        top = np.array((x_base - 0.05, y_base - 0.02, side * 0.15))
+        dx, dy, dz = top - base
+        length = math.sqrt(dx * dx + dy * dy + dz * dz)
+        angle_y = math.degrees(math.atan2(dx, dy))
+        angle_horiz = math.degrees(math.atan2(dz, math.sqrt(dx * dx + dy * dy)))
+        pillar = compose(translation(*base), rotation(angle_y, 0, 0, -1),
+                         rotation(angle_horiz * side, 1, 0, 0))
+        parts.append(cylinder(0.025, 0.02, length, 12, CARBON).transformed(pillar))
+
+    beam_y = y_base - 0.32
+    beam_width = wing_half_width * 0.9
+    parts += [
+        quads([[(x_base + 0.05, beam_y, -beam_width), (x_base + 0.05, beam_y, beam_width),
+                (x_base - 0.15, beam_y, beam_width), (x_base - 0.15, beam_y, -beam_width)]],
+              CARBON_DARK, (0, 1, 0)),
+        quads([[(x_base - 0.15, beam_y - 0.015, -beam_width), (x_base - 0.15, beam_y - 0.015, beam_width),
+                (x_base + 0.05, beam_y - 0.015, beam_width), (x_base + 0.05, beam_y - 0.015, -beam_width)]],
+              CARBON_DARK, (0, -1, 0)),
+        # Luz de chuva
+        box((0.3, 0.0, 0.0), compose(translation(x_base - 0.36, y_base - 0.05, 0), scaling(0.02, 0.04, 0.12))),
+    ]
+    return merge_meshes(parts, 'rear_wing')
+
+# Flap do DRS em sua posição fechada; a rotação em torno de DRS_PIVOT é
+# aplicada na hora de desenhar
+def drs_flap_mesh(num_sections=REAR_WING_SECTIONS):
+    x_base = REAR_WING_X
+    y_base = REAR_WING_Y
+    flap_y_offset = 0.06
+    flap_thickness = 0.018
+
+    z, arch = _rear_wing_span(num_sections)
+    x_front = np.full_like(z, x_base - REAR_WING_CHORD * 0.4)
+    x_back = x_front - DRS_FLAP_CHORD
+    y_pos = y_base + flap_y_offset + arch
+
+    mesh = merge_meshes([
+        quad_strip(np.column_stack((x_front, y_pos + 0.03, z)),
+                   np.column_stack((x_back, y_pos, z)), CARBON_DARK, (0, 1, 0)),
+        quad_strip(np.column_stack((x_back, y_pos - flap_thickness, z)),
+                   np.column_stack((x_front, y_pos - flap_thickness + 0.03, z)), CARBON_DARK, (0, -1, 0)),
+    ], 'drs_flap')
+    mesh.metadata.update({'pivot': DRS_PIVOT, 'axis': (0, 0, -1), 'max_angle': DRS_MAX_ANGLE})
+    return mesh
+
+# Todas as posições do flap entre fechado e aberto, para limites de culling
+def drs_flap_sweep_mesh(num_sections=REAR_WING_SECTIONS):
+    flap = drs_flap_mesh(num_sections)
+    return merge_meshes([flap, flap.transformed(drs_flap_matrix(1.0))], 'drs_flap_sweep')
+
+def drs_flap_matrix(drs_open):
+    pivot_x, pivot_y, _ = DRS_PIVOT
+    return compose(translation(pivot_x, pivot_y, 0), rotation(-drs_open * DRS_MAX_ANGLE, 0, 0, 1),
+                   translation(-pivot_x, -pivot_y, 0))
+
+# SUSPENSÃO
+def suspension_bar_mesh(start, end, thickness=0.02, color=(0.15, 0.15, 0.15)):
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    direction = end - start
+    length = np.linalg.norm(direction)
+
+    if length < 0.001:
+        return merge_meshes([], 'suspension_bar')
+
+    dirx, _, dirz = direction / length
+    perp = np.array((-dirz, 0.0, dirx))
+    perp_len = np.linalg.norm(perp)
+    perp = np.array((1.0, 0.0, 0.0)) if perp_len < 0.001 else perp / perp_len
+
+    t = thickness / 2
+    side = perp * t
+    up = np.array((0.0, t, 0.0))
+    corners = [
+        (start - side + up, start + side + up, end + side + up, end - side + up),
+        (start + side - up, start - side - up, end - side - up, end + side - up),
+        (start + side - up, start + side + up, end + side + up, end + side - up),
+        (start - side + up, start - side - up, end - side - up, end - side + up),
+    ]
+    normals = [(0, 1, 0), (0, -1, 0), perp, -perp]
+    return quads(corners, color, normals, 'suspension_bar')
+
+FRONT_UPRIGHT = (1.9, -0.08, 0.70)
+REAR_UPRIGHT = (-1.5, -0.05, 0.65)
+
+def front_suspension_mesh():
+    parts = []
+    for side in [-1, 1]:
+        upright_x, upright_y, upright_z = FRONT_UPRIGHT
+        upright_z *= side
+
+        upright_upper = (upright_x, upright_y + 0.08, upright_z)
+        upright_lower = (upright_x, upright_y - 0.10, upright_z)
+        parts += [
+            suspension_bar_mesh((1.5, 0.05, side * 0.32), upright_upper, 0.025, (0.12, 0.12, 0.12)),
+            suspension_bar_mesh((1.0, 0.03, side * 0.32), upright_upper, 0.025, (0.12, 0.12, 0.12)),
+            suspension_bar_mesh((1.5, -0.18, side * 0.32), upright_lower, 0.028, (0.10, 0.10, 0.10)),
+            suspension_bar_mesh((1.0, -0.18, side * 0.32), upright_lower, 0.028, (0.10, 0.10, 0.10)),
+            # Pushrod
+            suspension_bar_mesh((upright_x - 0.1, upright_y - 0.05, upright_z - side * 0.02),
+                                (1.3, 0.08, side * 0.34), 0.018, CARBON),
+            # Barra de direção
+            suspension_bar_mesh((1.4, -0.05, side * 0.30),
+                                (upright_x, upright_y, upright_z - side * 0.02), 0.015, (0.18, 0.18, 0.18)),
+            box(CARBON, compose(translation(upright_x, upright_y, upright_z), scaling(0.05, 0.22, 0.04))),
+        ]
+    return merge_meshes(parts, 'front_suspension')
+
+def rear_suspension_mesh():
+    parts = []
+    for side in [-1, 1]:
+        upright_x, upright_y, upright_z = REAR_UPRIGHT
+        upright_z *= side
+
+        upright_upper = (upright_x, upright_y + 0.08, upright_z)
+        upright_lower = (upright_x, upright_y - 0.10, upright_z)
+        parts += [
+            suspension_bar_mesh((-1.0, 0.02, side * 0.22), upright_upper, 0.025, (0.12, 0.12, 0.12)),
+            suspension_bar_mesh((-1.6, 0.00, side * 0.18), upright_upper, 0.025, (0.12, 0.12, 0.12)),
+            suspension_bar_mesh((-1.0, -0.15, side * 0.22), upright_lower, 0.028, (0.10, 0.10, 0.10)),
+            suspension_bar_mesh((-1.6, -0.15, side * 0.18), upright_lower, 0.028, (0.10, 0.10, 0.10)),
+            # Pullrod
+            suspension_bar_mesh((upright_x + 0.08, upright_y + 0.06, upright_z - side * 0.02),
+                                (-1.2, -0.12, side * 0.24), 0.018, CARBON),
+            # Barra de convergência
+            suspension_bar_mesh((-1.4, -0.08, side * 0.20),
+                                (upright_x, upright_y - 0.02, upright_z - side * 0.02), 0.015, (0.18, 0.18, 0.18)),
+            # Semieixo
+            suspension_bar_mesh((-1.3, -0.05, side * 0.18),
+                                (upright_x, upright_y, upright_z - side * 0.03), 0.035, (0.22, 0.22, 0.25)),
+            box(CARBON, compose(translation(upright_x, upright_y, upright_z), scaling(0.05, 0.22, 0.05))),
+        ]
+    return merge_meshes(parts, 'rear_suspension')
+
+def suspension_mesh():
+    return merge_meshes([front_suspension_mesh(), rear_suspension_mesh()], 'suspension')
+
+# RODAS
+TIRE_RADIUS = 0.33
+RIM_RADIUS = 0.23
+FRONT_TIRE_WIDTH = 0.28
+REAR_TIRE_WIDTH = 0.34
+WHEEL_SEGMENTS = 48
+RIM_SEGMENTS = 32
+
+# Roda em coordenadas locais (eixo ao longo de z). O lado esquerdo (-1) já
+# vem girado 180° para que a face com a marcação fique voltada para fora.
+# details=False omite letreiro, raios e porca, que somem a poucos pixels
+def wheel_mesh(is_front=False, side=1, num_segments=WHEEL_SEGMENTS, rim_segments=RIM_SEGMENTS, details=True):
+    tire_radius = TIRE_RADIUS
+    tire_width = FRONT_TIRE_WIDTH if is_front else REAR_TIRE_WIDTH
+    rim_radius = RIM_RADIUS
+
+    parts = [cylinder(tire_radius, tire_radius, tire_width, num_segments, CARBON_DARK)
+             .transformed(translation(0, 0, -tire_width * 0.5))]
+
+    stripe_inner_radius = tire_radius * 0.88
+    stripe_outer_radius = tire_radius * 0.96
+    for z_side in [-1, 1]:
+        z_pos = z_side * tire_width * 0.5
+        parts.append(ring(tire_radius, rim_radius, z_pos, z_pos * 0.7, num_segments, CARBON, (0, 0, z_side)))
+        z_pos = z_side * tire_width * 0.48
+        parts.append(ring(stripe_outer_radius, stripe_inner_radius, z_pos, z_pos, num_segments,
+                          (0.95, 0.85, 0.0), (0, 0, z_side)))
+
+    # Letreiro Pirelli
+    if details:
+        letter_angles = np.degrees(math.pi * 0.25 + np.arange(8) * math.pi * 0.1)
+        parts.append(box((0.95, 0.95, 0.95)).instanced([
+            compose(rotation(angle, 0, 0, 1), translation(tire_radius * 0.75, 0, z_side * tire_width * 0.49),
+                    scaling(0.025, 0.008, 0.005))
+            for z_side in [-1, 1] for angle in letter_angles
+        ]))
+
+    cover_radius = rim_radius * 0.98
+    for z_side in [-1, 1]:
+        z_offset = z_side * tire_width * 0.35
+        parts += [
+            disk(0.03, cover_radius, rim_segments, (0.25, 0.25, 0.28), loops=3)
+            .transformed(translation(0, 0, z_offset)),
+            disk(cover_radius * 0.7, cover_radius * 0.85, rim_segments, CARBON)
+            .transformed(translation(0, 0, z_offset * 1.01)),
+        ]
+        if details:
+            parts.append(box((0.12, 0.12, 0.12)).instanced([
+                compose(rotation((360 / 5) * i + 36, 0, 0, 1),
+                        translation(cover_radius * 0.55, 0, z_offset * 1.02), scaling(0.06, 0.025, 0.008))
+                for i in range(5)
+            ]))
+
+    # Porca central
+    for z_side in ([-1, 1] if details else []):
+        nut = translation(0, 0, z_side * tire_width * 0.38)
+        parts += [
+            disk(0, 0.035, 6, (0.7, 0.7, 0.75)).transformed(nut),
+            disk(0, 0.02, 6, (0.5, 0.5, 0.55)).transformed(compose(nut, translation(0, 0, z_side * 0.005))),
+        ]
+
+    for z_side in [-1, 1]:
+        parts.append(cylinder(rim_radius, rim_radius * 1.02, tire_width * 0.15, rim_segments, (0.1, 0.1, 0.1))
+                     .transformed(translation(0, 0, z_side * tire_width * 0.35)))
+
+    mesh = merge_meshes(parts, 'wheel_%s_%s' % ('front' if is_front else 'rear', 'right' if side > 0 else 'left'))
+    if side == -1:
+        mesh = mesh.transformed(rotation(180, 0, 1, 0))
+    mesh.metadata.update({'radius': tire_radius, 'width': tire_width, 'is_front': is_front, 'side': side})
+    return mesh
+
+# Matriz local -> carro de uma roda, na mesma ordem das transformações
+# usadas no modo imediato
+def wheel_matrix(x, y, z, rotation_angle=0, is_front=False, steer_angle=0):
+    matrix = translation(x, y, z)
+    if is_front:
+        matrix = matrix @ rotation(steer_angle, 0, 1, 0)
+    return matrix @ rotation(rotation_angle, 0, 0, 1)
+
+# Centro (x, y, z), dianteira e lado de cada uma das 4 rodas
+def wheel_layout():
+    front_x, front_y, front_z = FRONT_UPRIGHT
+    rear_x, rear_y, rear_z = REAR_UPRIGHT
+    return [
+        (front_x, front_y, front_z, True, 1),
+        (front_x, front_y, -front_z, True, -1),
+        (rear_x, rear_y, rear_z, False, 1),
+        (rear_x, rear_y, -rear_z, False, -1),
+    ]
+
+# CARRO COMPLETO
+# Partes que nunca mudam, na ordem em que eram desenhadas
+STATIC_COMPONENTS = [
+    ('monocoque', monocoque_mesh),
+    ('engine_cover', engine_cover_mesh),
+    ('nose', nose_mesh),
+    ('sidepods', sidepods_mesh),
+    ('halo', halo_mesh),
+    ('floor', floor_mesh),
+    ('diffuser', diffuser_mesh),
+    ('airbox', airbox_mesh),
+    ('front_wing', front_wing_mesh),
+    ('rear_wing', rear_wing_structure_mesh),
+    ('suspension', suspension_mesh),
+    ('turquoise_accents', turquoise_accents_mesh),
+    ('mirrors', mirrors_mesh),
+]
+
+# NÍVEIS DE DETALHE
+# Parâmetros de tesselação de cada componente por nível (0 = mais detalhado,
+# igual aos valores padrão). Componentes fora da tabela não mudam com o nível.
+LOD_LEVELS = [
+    {
+        'halo': {'num_segments': HALO_SEGMENTS},
+        'front_wing': {'num_sections': FRONT_WING_SECTIONS},
+        'rear_wing': {'num_sections': REAR_WING_SECTIONS},
+        'drs_flap': {'num_sections': REAR_WING_SECTIONS},
+        'wheel': {'num_segments': WHEEL_SEGMENTS, 'rim_segments': RIM_SEGMENTS},
+    },
+    {
+        'halo': {'num_segments': 16},
+        'front_wing': {'num_sections': 6},
+        'rear_wing': {'num_sections': 8},
+        'drs_flap': {'num_sections': 8},
+        'wheel': {'num_segments': 24, 'rim_segments': 16},
+    },
+    {
+        'halo': {'num_segments': 8},
+        'front_wing': {'num_sections': 2},
+        'rear_wing': {'num_sections': 4},
+        'drs_flap': {'num_sections': 4},
+        'wheel': {'num_segments': 12, 'rim_segments': 8, 'details': False},
+    },
+]
+
+def lod_parameters(name, lod=0):
+    return LOD_LEVELS[min(lod, len(LOD_LEVELS) - 1)].get(name, {})
+
+def static_chassis_mesh(lod=0):
+    meshes = []
+    for name, generator in STATIC_COMPONENTS:
+        mesh = generator(**lod_parameters(name, lod))
+        mesh.name = name
+        meshes.append(mesh)
+    return merge_meshes(meshes, 'static_chassis')
+
+def lod_drs_flap_mesh(lod=0):
+    return drs_flap_mesh(**lod_parameters('drs_flap', lod))
+
+def lod_wheel_mesh(is_front=False, side=1, lod=0):
+    return wheel_mesh(is_front, side, **lod_parameters('wheel', lod))
+
+
+# Mede o tempo de geração de cada componente, sem precisar de contexto GL
+def benchmark(repeats=20):
+    generators = STATIC_COMPONENTS + [
+        ('drs_flap', drs_flap_mesh),
+        ('wheel_front', lambda: wheel_mesh(True, 1)),
+        ('wheel_rear', lambda: wheel_mesh(False, 1)),
+    ]
+    print("%-20s %8s %10s %10s" % ("componente", "ms", "vertices", "triangulos"))
+    for name, generator in generators:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            mesh = generator()
+        elapsed = (time.perf_counter() - start) / repeats * 1000
+        print("%-20s %8.3f %10d %10d" % (name, elapsed, mesh.vertex_count, mesh.triangle_count))
+
+    print()
+    print("%-20s %10s %10s" % ("nivel de detalhe", "vertices", "triangulos"))
+    for lod in range(len(LOD_LEVELS)):
+        meshes = [static_chassis_mesh(lod), lod_drs_flap_mesh(lod)]
+        meshes += [lod_wheel_mesh(is_front, side, lod) for is_front in (True, False) for side in (1, -1)]
+        print("%-20d %10d %10d" % (lod, sum(m.vertex_count for m in meshes), sum(m.triangle_count for m in meshes)))
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,259 @@
+import argparse
+import time
+
+import numpy as np
+
+import track
+from mesh import compose, merge_meshes, quad_strip, rotation, translation
+
+# CIRCUITO EM SPLINE
+# Um circuito de verdade em vez da reta de TRACK_LENGTH metros: a linha
+# central é uma spline Catmull-Rom centrípeta fechada pelos pontos de
+# controle (do traçado embutido ou de um CSV). A spline é amostrada uma vez
+# em uma tabela de comprimento de arco (distância acumulada de cada
+# amostra), então posição e direção a uma distância da largada saem de uma
+# busca binária e uma interpolação linear: O(log n), vetorizado em NumPy.
+#
+# Asfalto, linhas, grama, tracejado e zebras são gerados em trechos de
+# tamanho fixo ao longo da spline, cada um um componente 'chunk_N' da malha,
+# então gerar e desenhar um circuito de 5 km+ custa por trecho, e o culling
+# descarta os trechos fora da tela. O carro fica na origem: a distância
+# percorrida (-track_offset da simulação) escolhe a matriz que leva o ponto
+# da pista até ele.
+#
+#   python circuit.py                         # traçado embutido: comprimento e tempo de geração
+#   python circuit.py pista.csv               # CSV com colunas x e z (ou x e y de um mapa)
+#   python main.py --circuit [pista.csv]
+
+# Espaçamento das amostras da tabela de comprimento de arco, em metros
+LUT_STEP = 0.5
+# Distância entre seções transversais da malha
+RIBBON_STEP = 1.0
+CHUNK_LENGTH = 25.0
+
+# Traçado embutido (x, z em metros), no sentido da corrida; a largada é o
+# primeiro ponto, com a reta dos boxes seguindo em +x
+DEFAULT_LAYOUT = [
+    (0, 0), (400, 0), (800, 0), (1000, 60), (1060, 250), (950, 420), (700, 450),
+    (560, 600), (600, 800), (800, 900), (900, 1100), (760, 1250), (450, 1200),
+    (250, 1000), (100, 1050), (-150, 1200), (-400, 1100), (-450, 850), (-300, 650),
+    (-350, 400), (-300, 150), (-180, 30),
+]
+
+
+# Pontos (N, 2) da spline fechada; per_segment: amostras de cada trecho
+# entre dois pontos de controle, sem o ponto final (é o primeiro do próximo)
+def _catmull_rom(points, per_segment):
+    count = len(points)
+    segment = np.repeat(np.arange(count), per_segment)
+    t = np.concatenate([np.arange(n) / n for n in per_segment])
+    p0, p1, p2, p3 = (points[(segment + k) % count] for k in (-1, 0, 1, 2))
+
+    # Nós centrípetos: raiz da distância entre pontos vizinhos
+    def knot(a, b):
+        return np.sqrt(np.linalg.norm(b - a, axis=1))[:, None]
+
+    t0 = np.zeros((len(t), 1))
+    t1 = t0 + knot(p0, p1)
+    t2 = t1 + knot(p1, p2)
+    t3 = t2 + knot(p2, p3)
+    u = t1 + (t2 - t1) * t[:, None]
+
+    a1 = ((t1 - u) * p0 + (u - t0) * p1) / (t1 - t0)
+    a2 = ((t2 - u) * p1 + (u - t1) * p2) / (t2 - t1)
+    a3 = ((t3 - u) * p2 + (u - t2) * p3) / (t3 - t2)
+    b1 = ((t2 - u) * a1 + (u - t0) * a2) / (t2 - t0)
+    b2 = ((t3 - u) * a2 + (u - t1) * a3) / (t3 - t1)
+    return ((t2 - u) * b1 + (u - t1) * b2) / (t2 - t1)
+
+
+class Circuit:
+    def __init__(self, points, name='circuito'):
+        points = np.asarray(points, dtype=np.float64)
+        # Pontos repetidos (inclusive o último igual ao primeiro, comum em
+        # traçados fechados) deixariam nós de tamanho zero na spline
+        keep = np.linalg.norm(points - np.roll(points, 1, axis=0), axis=1) > 1e-6
+        points = points[keep]
+        if len(points) < 3:
+            raise ValueError("%s: um circuito precisa de pelo menos 3 pontos" % name)
+        self.name = name
+        self.control_points = points
+
+        chords = np.linalg.norm(np.roll(points, -1, axis=0) - points, axis=1)
+        samples = _catmull_rom(points, np.maximum(4, np.ceil(chords / LUT_STEP).astype(int)))
+        # Tabela fechada: a última amostra repete a primeira
+        self.points = np.vstack((samples, samples[:1]))
+        steps = np.linalg.norm(np.diff(self.points, axis=0), axis=1)
+        self.distances = np.concatenate(([0.0], np.cumsum(steps)))
+        self.length = float(self.distances[-1])
+        self.step_lengths = np.where(steps > 0, steps, 1.0)
+
+        # Direção em cada amostra por diferença central, dando a volta
+        ahead = np.roll(samples, -1, axis=0) - np.roll(samples, 1, axis=0)
+        tangents = ahead / np.linalg.norm(ahead, axis=1, keepdims=True)
+        self.tangents = np.vstack((tangents, tangents[:1]))
+
+        self.chunk_count = max(1, int(np.ceil(self.length / CHUNK_LENGTH)))
+        self.chunk_length = self.length / self.chunk_count
+
+    # Posições (N, 2) e direções unitárias (N, 2) no plano x, z às distâncias
+    # dadas desde a largada (qualquer valor: dá a volta no comprimento)
+    def sample(self, distances):
+        distances = np.mod(np.asarray(distances, dtype=np.float64), self.length)
+        i = np.clip(np.searchsorted(self.distances, distances, 'right') - 1, 0, len(self.step_lengths) - 1)
+        t = ((distances - self.distances[i]) / self.step_lengths[i])[..., None]
+        positions = self.points[i] + (self.points[i + 1] - self.points[i]) * t
+        tangents = self.tangents[i] + (self.tangents[i + 1] - self.tangents[i]) * t
+        return positions, tangents / np.linalg.norm(tangents, axis=-1, keepdims=True)
+
+    # Matriz que leva o ponto da pista a distance metros da largada até a
+    # origem, com a direção da pista em +x (para onde o carro aponta)
+    def car_frame(self, distance):
+        (x, z), (tx, tz) = (value[0] for value in self.sample([distance]))
+        return compose(rotation(np.degrees(np.arctan2(tz, tx)), 0, 1, 0), translation(-x, 0, -z))
+
+    # Matriz inversa de car_frame: do referencial do carro para o circuito
+    def placement(self, distance):
+        (x, z), (tx, tz) = (value[0] for value in self.sample([distance]))
+        return compose(translation(x, 0, z), rotation(-np.degrees(np.arctan2(tz, tx)), 0, 1, 0))
+
+    # Intervalo [início, fim) em metros do trecho index
+    def chunk_range(self, index):
+        return index * self.chunk_length, (index + 1) * self.chunk_length
+
+
+# Esferas (centros (N, 2) no plano x, z e raios) que envolvem cada trecho
+# com a grama, calculadas pela linha central, sem gerar as malhas
+def chunk_spheres(circuit, samples=9):
+    starts = np.arange(circuit.chunk_count) * circuit.chunk_length
+    distances = starts[:, None] + np.linspace(0, circuit.chunk_length, samples)
+    positions, _ = circuit.sample(distances)
+    centers = (positions.min(axis=1) + positions.max(axis=1)) / 2
+    radii = np.linalg.norm(positions - centers[:, None], axis=2).max(axis=1)
+    return centers, radii + track.TRACK_WIDTH / 2 + track.KERB_WIDTH + track.GRASS_WIDTH
+
+
+# Período de uma textura ajustado para caber um número inteiro de vezes na
+# volta: o padrão não emenda torto na largada
+def _lap_period(length, period):
+    return length / max(1, round(length / period))
+
+
+# Faixa entre as distâncias laterais offsets[0] e offsets[1] ao longo das
+# seções dadas (across: perpendicular à pista, +z onde ela segue +x); com u, texturizada como as faixas
+# de track._scrolling_strip
+def _ribbon(positions, across, offsets, y, color, name, u=None):
+    a = positions + across * offsets[0]
+    b = positions + across * offsets[1]
+    strip = quad_strip(np.column_stack((a[:, 0], np.full(len(a), y), a[:, 1])),
+                       np.column_stack((b[:, 0], np.full(len(b), y), b[:, 1])), color, (0, 1, 0), name)
+    if u is not None:
+        quads_u = np.stack((u[:-1], u[:-1], u[1:], u[1:]), axis=1).reshape(-1)
+        quads_v = np.tile((0.0, 1.0, 1.0, 0.0), len(u) - 1)
+        strip = strip.with_uvs(np.column_stack((quads_u, quads_v)))
+        strip.name = name
+    return strip
+
+
+# Malhas 'surface', 'dashes' e 'kerbs' do trecho index, com as mesmas
+# larguras, alturas e cores da reta de track.py
+def chunk_meshes(circuit, index):
+    start, end = circuit.chunk_range(index)
+    count = max(2, int(np.ceil((end - start) / RIBBON_STEP)) + 1)
+    distances = np.linspace(start, end, count)
+    positions, tangents = circuit.sample(distances)
+    across = np.column_stack((-tangents[:, 1], tangents[:, 0]))
+    name = 'chunk_%d' % index
+
+    half_width = track.TRACK_WIDTH / 2
+    y = track.TRACK_Y
+    surface = [_ribbon(positions, across, (-half_width, half_width), y, track.ASPHALT_COLOR, name)]
+    for side in [-1, 1]:
+        z_pos = side * (half_width - track.LINE_WIDTH / 2)
+        surface.append(_ribbon(positions, across, (z_pos - track.LINE_WIDTH / 2, z_pos + track.LINE_WIDTH / 2),
+                               y + 0.01, track.LINE_COLOR, name))
+        z_base = side * (half_width + track.KERB_WIDTH + track.GRASS_WIDTH / 2)
+        surface.append(_ribbon(positions, across, (z_base - track.GRASS_WIDTH / 2, z_base + track.GRASS_WIDTH / 2),
+                               y - 0.01, track.GRASS_COLOR, name))
+    if index == 0:
+        # Quadriculado da reta (em FINISH_X) levado até a largada
+        surface.append(track.finish_line_mesh().transformed(
+            compose(circuit.placement(0.0), translation(-track.FINISH_X, 0, 0)), name))
+
+    dash_u = distances / _lap_period(circuit.length, track.DASH_PERIOD)
+    dashes = _ribbon(positions, across, (-track.DASH_WIDTH / 2, track.DASH_WIDTH / 2), y + 0.01, track.WHITE, name,
+                     dash_u)
+
+    kerb_u = distances / _lap_period(circuit.length, track.KERB_PERIOD)
+    kerbs = [_ribbon(positions, across, (side * half_width + min(0, side * track.KERB_WIDTH),
+                                        side * half_width + max(0, side * track.KERB_WIDTH)),
+                     y + 0.02, track.WHITE, name, kerb_u)
+             for side in [-1, 1]]
+
+    return {
+        'surface': merge_meshes(surface, name),
+        'dashes': dashes,
+        'kerbs': merge_meshes(kerbs, name),
+    }
+
+
+# Malhas do circuito inteiro, uma por parte, com um componente por trecho
+def track_meshes(circuit):
+    chunks = [chunk_meshes(circuit, index) for index in range(circuit.chunk_count)]
+    return {part: merge_meshes([chunk[part] for chunk in chunks], 'circuit_' + part)
+            for part in ('surface', 'dashes', 'kerbs')}
+
+
+# CSV da linha central com cabeçalho: colunas x e z, ou x e y de um mapa
+# visto de cima (y para o norte vira -z). Unidades em metros; nomes como
+# "# x_m" também servem, e as outras colunas são ignoradas.
+def load_centerline(path):
+    with open(path) as f:
+        names = [name.strip().lstrip('#').strip().lower() for name in f.readline().split(',')]
+    names = [name[:-2] if name.endswith('_m') else name for name in names]
+    if 'x' not in names or ('z' not in names and 'y' not in names):
+        raise ValueError("%s: a linha central precisa das colunas x e z (ou x e y)" % path)
+    second = 'z' if 'z' in names else 'y'
+    values = np.loadtxt(path, delimiter=',', skiprows=1, usecols=(names.index('x'), names.index(second)),
+                        ndmin=2)
+    if second == 'y':
+        values[:, 1] = -values[:, 1]
+    return Circuit(values, path)
+
+
+def open_circuit(path=None):
+    return load_centerline(path) if path else Circuit(DEFAULT_LAYOUT, 'traçado embutido')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mede um circuito e a geração da malha em trechos")
+    parser.add_argument("csv", nargs='?', help="linha central (colunas x e z); padrão: o traçado embutido")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    circuit = open_circuit(args.csv)
+    lut = time.perf_counter() - start
+
+    start = time.perf_counter()
+    meshes = track_meshes(circuit)
+    generation = time.perf_counter() - start
+
+    queries = np.random.default_rng(0).uniform(0, circuit.length, 100000)
+    start = time.perf_counter()
+    circuit.sample(queries)
+    query = time.perf_counter() - start
+
+    vertices = sum(mesh.vertex_count for mesh in meshes.values())
+    size = sum(mesh.nbytes for mesh in meshes.values())
+    print("%s: %.0f m, %d amostras na tabela (%.1f ms)" % (circuit.name, circuit.length, len(circuit.distances),
+                                                         lut * 1000))
+    print("%d trechos de %.1f m: %d vértices, %.1f MiB, gerados em %.2f s" % (
+        circuit.chunk_count, circuit.chunk_length, vertices, size / 2 ** 20, generation))
+    print("100000 consultas de posição em %.1f ms" % (query * 1000))
+
+
+if __name__ == "__main__":
+    main()
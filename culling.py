@@ -0,0 +1,122 @@
+import numpy as np
+
+from mesh import look_at, perspective
+
+# CULLING POR FRUSTUM
+# O frustum sai dos mesmos parâmetros de gluPerspective/gluLookAt usados
+# na renderização. Cada malha juntada com merge_meshes guarda o intervalo de
+# índices de seus componentes; aqui cada intervalo ganha uma caixa de
+# limites, e só os componentes visíveis são desenhados (intervalos vizinhos
+# viram um único draw call).
+
+# Contadores do quadro atual (lidos pelo benchmark)
+frame_stats = {'tested': 0, 'culled': 0}
+
+
+def reset_frame_stats():
+    frame_stats['tested'] = 0
+    frame_stats['culled'] = 0
+
+
+def _count(tested, culled):
+    frame_stats['tested'] += tested
+    frame_stats['culled'] += culled
+
+
+# Seis planos (a, b, c, d), normalizados e apontando para dentro:
+# um ponto p está do lado de dentro quando a*x + b*y + c*z + d >= 0
+class Frustum:
+    def __init__(self, planes):
+        planes = np.asarray(planes, dtype=np.float64)
+        self.planes = planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+    # Planos extraídos de projeção @ modelview (Gribb e Hartmann)
+    @classmethod
+    def from_matrix(cls, clip):
+        rows = np.asarray(clip, dtype=np.float64)
+        return cls([
+            rows[3] + rows[0], rows[3] - rows[0],
+            rows[3] + rows[1], rows[3] - rows[1],
+            rows[3] + rows[2], rows[3] - rows[2],
+        ])
+
+    @classmethod
+    def from_camera(cls, eye, target, up, fov_y, aspect, near, far):
+        return cls.from_matrix(perspective(fov_y, aspect, near, far) @ look_at(eye, target, up))
+
+    # O mesmo frustum nas coordenadas locais de uma malha desenhada com a
+    # matriz de modelo matrix (plano @ matrix testa o ponto local)
+    def transformed(self, matrix):
+        return Frustum(self.planes @ np.asarray(matrix, dtype=np.float64))
+
+    def sphere_visible(self, center, radius):
+        distances = self.planes[:, :3] @ np.asarray(center, dtype=np.float64) + self.planes[:, 3]
+        return bool((distances >= -radius).all())
+
+    def spheres_visible(self, centers, radius):
+        distances = np.asarray(centers, dtype=np.float64) @ self.planes[:, :3].T + self.planes[:, 3]
+        return (distances >= -radius).all(axis=1)
+
+    # Caixas alinhadas aos eixos (N, 3): para cada plano testa o canto mais
+    # para dentro; se ele estiver fora de algum plano a caixa está fora
+    def boxes_visible(self, lows, highs):
+        normals = self.planes[:, :3]
+        corners = np.where(normals[None, :, :] >= 0, highs[:, None, :], lows[:, None, :])
+        distances = np.einsum('npk,pk->np', corners, normals) + self.planes[:, 3]
+        return (distances >= 0).all(axis=1)
+
+
+# Caixas e intervalos de índices dos componentes de uma malha juntada
+class ComponentBounds:
+    def __init__(self, mesh):
+        components = mesh.metadata.get('components') or [{
+            'name': mesh.name, 'first_index': 0, 'index_count': len(mesh.indices),
+            'first_vertex': 0, 'vertex_count': mesh.vertex_count,
+        }]
+        positions = mesh.positions
+        self.names = [c['name'] for c in components]
+        self.first_index = np.array([c['first_index'] for c in components], dtype=np.int64)
+        self.index_count = np.array([c['index_count'] for c in components], dtype=np.int64)
+        # Malhas carregadas de um GLB já trazem a caixa de cada componente
+        self.lows = np.array([c['low'] if 'low' in c else
+                              positions[c['first_vertex']:c['first_vertex'] + c['vertex_count']].min(axis=0)
+                              for c in components], dtype=np.float64)
+        self.highs = np.array([c['high'] if 'high' in c else
+                               positions[c['first_vertex']:c['first_vertex'] + c['vertex_count']].max(axis=0)
+                               for c in components], dtype=np.float64)
+        self.low = self.lows.min(axis=0)
+        self.high = self.highs.max(axis=0)
+
+    # Intervalos (first_index, index_count) visíveis, com vizinhos juntados.
+    # Devolve None quando tudo está visível (a malha inteira vai em um draw).
+    def visible_ranges(self, frustum):
+        visible = frustum.boxes_visible(self.lows, self.highs)
+        _count(len(visible), int((~visible).sum()))
+        if visible.all():
+            return None
+
+        ranges = []
+        for first, count in zip(self.first_index[visible], self.index_count[visible]):
+            if ranges and ranges[-1][0] + ranges[-1][1] == first:
+                ranges[-1][1] += int(count)
+            else:
+                ranges.append([int(first), int(count)])
+        return [tuple(r) for r in ranges]
+
+
+def boxes_visible(frustum, lows, highs):
+    visible = frustum.boxes_visible(np.asarray(lows, dtype=np.float64), np.asarray(highs, dtype=np.float64))
+    _count(len(visible), int((~visible).sum()))
+    return visible
+
+
+def spheres_visible(frustum, centers, radius):
+    visible = frustum.spheres_visible(centers, radius)
+    _count(len(visible), int((~visible).sum()))
+    return visible
+
+
+def sphere_visible(frustum, center, radius):
+    visible = frustum.sphere_visible(center, radius)
+    _count(1, 0 if visible else 1)
+    return visible
@@ -0,0 +1,160 @@
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+from mesh import INDEX_DTYPE, VERTEX_DTYPE
+
+# BACKEND OPENGL (PIPELINE FIXO)
+# Envia os Mesh gerados em car_geometry para a GPU. Nenhuma geometria é
+# calculada aqui.
+
+_STRIDE = VERTEX_DTYPE.itemsize
+_POSITION_OFFSET = VERTEX_DTYPE.fields['position'][1]
+_NORMAL_OFFSET = VERTEX_DTYPE.fields['normal'][1]
+_COLOR_OFFSET = VERTEX_DTYPE.fields['color'][1]
+_UV_OFFSET = VERTEX_DTYPE.fields['uv'][1]
+_INDEX_SIZE = np.dtype(INDEX_DTYPE).itemsize
+
+
+# Contadores do quadro atual (lidos pelo benchmark)
+frame_stats = {'draw_calls': 0, 'vertices': 0}
+
+
+def reset_frame_stats():
+    frame_stats['draw_calls'] = 0
+    frame_stats['vertices'] = 0
+
+
+def _count_draw(index_count):
+    frame_stats['draw_calls'] += 1
+    frame_stats['vertices'] += index_count
+
+
+def supports_buffer_objects():
+    return bool(glGenBuffers) and bool(glBindBuffer)
+
+
+def _enable_arrays(base):
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_NORMAL_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+    glVertexPointer(3, GL_FLOAT, _STRIDE, ctypes.c_void_p(base + _POSITION_OFFSET))
+    glNormalPointer(GL_FLOAT, _STRIDE, ctypes.c_void_p(base + _NORMAL_OFFSET))
+    glColorPointer(3, GL_FLOAT, _STRIDE, ctypes.c_void_p(base + _COLOR_OFFSET))
+    glTexCoordPointer(2, GL_FLOAT, _STRIDE, ctypes.c_void_p(base + _UV_OFFSET))
+
+
+def _disable_arrays():
+    glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_NORMAL_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+
+# Envia a malha a partir da memória do processo (vertex arrays do GL 1.1),
+# sem guardar nada na GPU entre quadros. ranges: lista opcional de
+# (first_index, index_count) para desenhar só parte dos triângulos.
+def draw_mesh(mesh, ranges=None):
+    if mesh.triangle_count == 0:
+        return
+    if ranges is None:
+        ranges = [(0, len(mesh.indices))]
+    vertices = np.ascontiguousarray(mesh.vertices)
+    _enable_arrays(vertices.ctypes.data)
+    for first, count in ranges:
+        glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, mesh.indices[first:first + count])
+        _count_draw(count)
+    _disable_arrays()
+
+
+# Malha residente na GPU. Usa vertex/index buffer objects quando o contexto
+# suporta e cai para uma display list em contextos antigos.
+class MeshBuffer:
+    def __init__(self, mesh):
+        self.name = mesh.name
+        self.index_count = len(mesh.indices)
+        self.vertex_count = mesh.vertex_count
+        self.nbytes = mesh.nbytes
+        self.vertex_buffer = None
+        self.index_buffer = None
+        self.display_list = None
+
+        if supports_buffer_objects():
+            self._upload_buffers(mesh)
+        else:
+            self._compile_display_list(mesh)
+
+    def _upload_buffers(self, mesh):
+        vertices = np.ascontiguousarray(mesh.vertices)
+        indices = np.ascontiguousarray(mesh.indices)
+
+        self.vertex_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        self.index_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def _compile_display_list(self, mesh):
+        self.display_list = glGenLists(1)
+        glNewList(self.display_list, GL_COMPILE)
+        draw_mesh(mesh)
+        glEndList()
+
+    # ranges: lista opcional de (first_index, index_count); a display list
+    # não permite desenhar partes e sempre desenha a malha inteira
+    def draw(self, ranges=None):
+        if self.index_count == 0 or ranges == []:
+            return
+        if self.display_list is not None:
+            glCallList(self.display_list)
+            _count_draw(self.index_count)
+            return
+        if ranges is None:
+            ranges = [(0, self.index_count)]
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        _enable_arrays(0)
+        for first, count in ranges:
+            glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT,
+                           ctypes.c_void_p(first * _INDEX_SIZE))
+            _count_draw(count)
+        _disable_arrays()
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        if self.vertex_buffer is not None:
+            glDeleteBuffers(2, [self.vertex_buffer, self.index_buffer])
+            self.vertex_buffer = self.index_buffer = None
+        if self.display_list is not None:
+            glDeleteLists(self.display_list, 1)
+            self.display_list = None
+
+
+# Textura que se repete ao longo de u, com filtro "nearest" para manter as
+# bordas das faixas nítidas. pixels: array (altura, largura, 4) em uint8.
+def create_texture(pixels):
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    height, width = pixels.shape[:2]
+
+    texture = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, texture)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+    glBindTexture(GL_TEXTURE_2D, 0)
+    return texture
+
+
+def release_texture(texture):
+    glDeleteTextures([texture])
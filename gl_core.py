@@ -0,0 +1,407 @@
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+import gl_backend
+from mesh import INDEX_DTYPE, VERTEX_DTYPE, identity
+
+# BACKEND OPENGL 3.3 CORE (SHADERS)
+# Alternativa ao pipeline fixo de gl_backend: um VAO por malha compilada,
+# atributos por vértice (posição, normal, cor, uv) e um único programa de
+# shaders. A iluminação reproduz a do pipeline fixo (duas luzes direcionais
+# em coordenadas de olho, GL_COLOR_MATERIAL em ambiente e difusa, cálculo
+# por vértice) para que os dois caminhos gerem a mesma imagem. O giro das
+# rodas, o esterço e o ângulo do DRS são uniforms aplicados no shader, ou
+# atributos por instância quando vários carros são desenhados de uma vez.
+
+_STRIDE = VERTEX_DTYPE.itemsize
+_INDEX_SIZE = np.dtype(INDEX_DTYPE).itemsize
+_ATTRIBUTES = [
+    (0, 'position', 3),
+    (1, 'normal', 3),
+    (2, 'color', 3),
+    (3, 'uv', 2),
+]
+
+# Atributos por instância (um por carro): posição do carro e
+# (giro da roda, esterço, ângulo do flap)
+INSTANCE_DTYPE = np.dtype([
+    ('offset', np.float32, 3),
+    ('motion', np.float32, 3),
+])
+_INSTANCE_ATTRIBUTES = [
+    (4, 'offset', 3),
+    (5, 'motion', 3),
+]
+
+# Movimento aplicado no shader (uniform u_motion)
+MOTION_STATIC = 0
+MOTION_WHEEL = 1
+MOTION_FLAP = 2
+
+# Ambiente global padrão do OpenGL (GL_LIGHT_MODEL_AMBIENT)
+GLOBAL_AMBIENT = (0.2, 0.2, 0.2)
+
+VERTEX_SHADER = """
+#version 330 core
+
+layout(location = 0) in vec3 a_position;
+layout(location = 1) in vec3 a_normal;
+layout(location = 2) in vec3 a_color;
+layout(location = 3) in vec2 a_uv;
+layout(location = 4) in vec3 a_instance_offset;
+layout(location = 5) in vec3 a_instance_motion;
+
+uniform mat4 u_projection;
+uniform mat4 u_view;
+uniform mat4 u_model;
+
+uniform int u_motion;
+uniform vec3 u_origin;
+uniform float u_spin;
+uniform float u_steer;
+uniform float u_flap_angle;
+uniform vec2 u_uv_offset;
+uniform bool u_instanced;
+uniform bool u_unlit;
+
+uniform vec3 u_ambient;
+uniform vec3 u_light_direction[2];
+uniform vec3 u_light_diffuse[2];
+
+out vec4 v_color;
+out vec2 v_uv;
+
+mat4 translate(vec3 offset) {
+    mat4 m = mat4(1.0);
+    m[3] = vec4(offset, 1.0);
+    return m;
+}
+
+mat4 rotate_y(float degrees) {
+    float a = radians(degrees);
+    return mat4(cos(a), 0.0, -sin(a), 0.0,  0.0, 1.0, 0.0, 0.0,  sin(a), 0.0, cos(a), 0.0,  0.0, 0.0, 0.0, 1.0);
+}
+
+mat4 rotate_z(float degrees) {
+    float a = radians(degrees);
+    return mat4(cos(a), sin(a), 0.0, 0.0,  -sin(a), cos(a), 0.0, 0.0,  0.0, 0.0, 1.0, 0.0,  0.0, 0.0, 0.0, 1.0);
+}
+
+void main() {
+    vec3 car = vec3(0.0);
+    float spin = u_spin;
+    float steer = u_steer;
+    float flap_angle = u_flap_angle;
+    if (u_instanced) {
+        car = a_instance_offset;
+        spin = a_instance_motion.x;
+        steer = a_instance_motion.y * u_steer;
+        flap_angle = a_instance_motion.z;
+    }
+
+    mat4 motion = translate(car);
+    if (u_motion == 1) {
+        motion = motion * translate(u_origin) * rotate_y(steer) * rotate_z(spin);
+    } else if (u_motion == 2) {
+        motion = motion * translate(u_origin) * rotate_z(-flap_angle) * translate(-u_origin);
+    }
+    mat4 model_view = u_view * u_model * motion;
+    vec3 normal = normalize(mat3(model_view) * a_normal);
+
+    vec3 light = u_ambient;
+    for (int i = 0; i < 2; i++) {
+        light += u_light_diffuse[i] * max(dot(normal, u_light_direction[i]), 0.0);
+    }
+    v_color = vec4(u_unlit ? a_color : min(a_color * light, vec3(1.0)), 1.0);
+    v_uv = a_uv + u_uv_offset;
+    gl_Position = u_projection * model_view * vec4(a_position, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330 core
+
+in vec4 v_color;
+in vec2 v_uv;
+
+uniform bool u_textured;
+uniform sampler2D u_texture;
+uniform float u_alpha_cutoff;
+
+out vec4 frag_color;
+
+void main() {
+    vec4 color = v_color;
+    if (u_textured) {
+        color *= texture(u_texture, v_uv);
+        if (color.a <= u_alpha_cutoff) {
+            discard;
+        }
+    }
+    frag_color = color;
+}
+"""
+
+
+def _compile_shader(kind, source):
+    shader = glCreateShader(kind)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        log = glGetShaderInfoLog(shader)
+        glDeleteShader(shader)
+        raise RuntimeError("erro ao compilar shader: %s" % (log.decode(errors='replace') if log else ''))
+    return shader
+
+
+class ShaderProgram:
+    def __init__(self, vertex_source, fragment_source):
+        shaders = [_compile_shader(GL_VERTEX_SHADER, vertex_source),
+                   _compile_shader(GL_FRAGMENT_SHADER, fragment_source)]
+        self.program = glCreateProgram()
+        for shader in shaders:
+            glAttachShader(self.program, shader)
+        glLinkProgram(self.program)
+        for shader in shaders:
+            glDetachShader(self.program, shader)
+            glDeleteShader(shader)
+        if not glGetProgramiv(self.program, GL_LINK_STATUS):
+            log = glGetProgramInfoLog(self.program)
+            glDeleteProgram(self.program)
+            raise RuntimeError("erro ao ligar o programa: %s" % (log.decode(errors='replace') if log else ''))
+        self._locations = {}
+
+    def location(self, name):
+        if name not in self._locations:
+            self._locations[name] = glGetUniformLocation(self.program, name)
+        return self._locations[name]
+
+    def use(self):
+        glUseProgram(self.program)
+
+    # Matrizes NumPy na convenção de mesh.py (vetores coluna)
+    def set_matrix(self, name, matrix):
+        glUniformMatrix4fv(self.location(name), 1, GL_TRUE, np.asarray(matrix, dtype=np.float32))
+
+    def set_int(self, name, value):
+        glUniform1i(self.location(name), value)
+
+    def set_float(self, name, value):
+        glUniform1f(self.location(name), value)
+
+    def set_vec2(self, name, x, y):
+        glUniform2f(self.location(name), x, y)
+
+    def set_vec3_array(self, name, values):
+        values = np.asarray(values, dtype=np.float32).reshape(-1, 3)
+        glUniform3fv(self.location(name), len(values), values)
+
+    def release(self):
+        if self.program:
+            glDeleteProgram(self.program)
+            self.program = 0
+
+
+# Malha residente na GPU com seu próprio VAO. Mesma interface de
+# gl_backend.MeshBuffer (draw(ranges) e release()).
+class CoreMesh:
+    def __init__(self, mesh):
+        self.name = mesh.name
+        self.index_count = len(mesh.indices)
+        self.vertex_count = mesh.vertex_count
+        self.nbytes = mesh.nbytes
+
+        vertices = np.ascontiguousarray(mesh.vertices)
+        indices = np.ascontiguousarray(mesh.indices)
+
+        self.vertex_array = glGenVertexArrays(1)
+        glBindVertexArray(self.vertex_array)
+
+        self.vertex_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        for location, field, size in _ATTRIBUTES:
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, _STRIDE,
+                                  ctypes.c_void_p(VERTEX_DTYPE.fields[field][1]))
+
+        self.index_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def draw(self, ranges=None):
+        if self.index_count == 0 or ranges == []:
+            return
+        if ranges is None:
+            ranges = [(0, self.index_count)]
+        glBindVertexArray(self.vertex_array)
+        for first, count in ranges:
+            glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, ctypes.c_void_p(first * _INDEX_SIZE))
+            gl_backend._count_draw(count)
+        glBindVertexArray(0)
+
+    # Desenha count instâncias lendo os atributos de instance_buffer a partir
+    # do elemento first (sem baseInstance, que só existe no GL 4.2)
+    def draw_instanced(self, instance_buffer, first, count, ranges=None):
+        if self.index_count == 0 or count == 0 or ranges == []:
+            return
+        if ranges is None:
+            ranges = [(0, self.index_count)]
+        glBindVertexArray(self.vertex_array)
+        glBindBuffer(GL_ARRAY_BUFFER, instance_buffer.buffer)
+        for location, field, size in _INSTANCE_ATTRIBUTES:
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, INSTANCE_DTYPE.itemsize,
+                                  ctypes.c_void_p(first * INSTANCE_DTYPE.itemsize + INSTANCE_DTYPE.fields[field][1]))
+            glVertexAttribDivisor(location, 1)
+        for index_first, index_count in ranges:
+            glDrawElementsInstanced(GL_TRIANGLES, index_count, GL_UNSIGNED_INT,
+                                    ctypes.c_void_p(index_first * _INDEX_SIZE), count)
+            gl_backend._count_draw(index_count * count)
+        for location, _, _ in _INSTANCE_ATTRIBUTES:
+            glDisableVertexAttribArray(location)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindVertexArray(0)
+
+    def release(self):
+        if self.vertex_array is not None:
+            glDeleteBuffers(2, [self.vertex_buffer, self.index_buffer])
+            glDeleteVertexArrays(1, [self.vertex_array])
+            self.vertex_array = self.vertex_buffer = self.index_buffer = None
+
+
+# Buffer de atributos por instância, reenviado a cada quadro
+class InstanceBuffer:
+    def __init__(self):
+        self.buffer = glGenBuffers(1)
+        self.capacity = 0
+
+    # instances: array estruturado com INSTANCE_DTYPE
+    def upload(self, instances):
+        instances = np.ascontiguousarray(instances, dtype=INSTANCE_DTYPE)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        if instances.nbytes > self.capacity:
+            self.capacity = instances.nbytes
+            glBufferData(GL_ARRAY_BUFFER, instances.nbytes, instances, GL_STREAM_DRAW)
+        elif instances.nbytes:
+            glBufferSubData(GL_ARRAY_BUFFER, 0, instances.nbytes, instances)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        if self.buffer is not None:
+            glDeleteBuffers(1, [self.buffer])
+            self.buffer = None
+
+
+# Estado do programa de shaders por quadro. main.py chama begin_frame() com
+# as matrizes da câmera e, antes de cada draw, o set_* do tipo de movimento.
+class CoreRenderer:
+    # lights: lista de (posição, ambiente, difusa) como passadas a glLightfv
+    def __init__(self, lights):
+        self.program = ShaderProgram(VERTEX_SHADER, FRAGMENT_SHADER)
+        self.lights = lights
+        self.instances = InstanceBuffer()
+
+    def setup(self, clear_color):
+        glEnable(GL_DEPTH_TEST)
+        glClearColor(*clear_color)
+
+        ambient = np.array(GLOBAL_AMBIENT) + sum(np.array(light[1][:3]) for light in self.lights)
+        directions = [np.array(light[0][:3], dtype=np.float64) / np.linalg.norm(light[0][:3])
+                      for light in self.lights]
+
+        self.program.use()
+        self.program.set_vec3_array('u_ambient', [ambient])
+        self.program.set_vec3_array('u_light_direction', directions)
+        self.program.set_vec3_array('u_light_diffuse', [light[2][:3] for light in self.lights])
+        self.program.set_int('u_texture', 0)
+        glUseProgram(0)
+
+    def begin_frame(self, projection, view):
+        self.program.use()
+        self.program.set_matrix('u_projection', projection)
+        self.program.set_matrix('u_view', view)
+        self.set_model(identity())
+        self.set_static()
+        self.set_texture(None)
+        self.set_instanced(False)
+        self.program.set_int('u_unlit', 0)
+        self.program.set_float('u_alpha_cutoff', 0.5)
+
+    def end_frame(self):
+        glUseProgram(0)
+
+    # HUD: projeção ortográfica em pixels, sem iluminação nem depth test, e
+    # textura (atlas de fonte) misturada pelo alpha
+    def begin_hud(self, projection, texture):
+        self.program.set_matrix('u_projection', projection)
+        self.program.set_matrix('u_view', identity())
+        self.set_model(identity())
+        self.set_static()
+        self.set_instanced(False)
+        self.program.set_int('u_unlit', 1)
+        self.program.set_float('u_alpha_cutoff', 0.0)
+        self.set_texture(texture)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+    def end_hud(self):
+        glDisable(GL_BLEND)
+        glEnable(GL_DEPTH_TEST)
+        self.set_texture(None)
+        self.program.set_int('u_unlit', 0)
+        self.program.set_float('u_alpha_cutoff', 0.5)
+
+    def set_model(self, matrix):
+        self.program.set_matrix('u_model', matrix)
+
+    def set_static(self):
+        self.program.set_int('u_motion', MOTION_STATIC)
+
+    def set_instanced(self, instanced):
+        self.program.set_int('u_instanced', 1 if instanced else 0)
+
+    # Nos draws instanciados, giro, esterço e ângulo do flap vêm das
+    # instâncias; u_steer vira 1 ou 0 (rodas traseiras não esterçam)
+    def set_wheel_origin(self, position, steers=True):
+        self.program.set_int('u_motion', MOTION_WHEEL)
+        self.program.set_vec3_array('u_origin', [position])
+        self.program.set_float('u_steer', 1.0 if steers else 0.0)
+
+    def set_flap_origin(self, pivot):
+        self.program.set_int('u_motion', MOTION_FLAP)
+        self.program.set_vec3_array('u_origin', [pivot])
+
+    def set_wheel(self, position, spin, steer):
+        self.program.set_int('u_motion', MOTION_WHEEL)
+        self.program.set_vec3_array('u_origin', [position])
+        self.program.set_float('u_spin', spin)
+        self.program.set_float('u_steer', steer)
+
+    def set_flap(self, pivot, angle):
+        self.program.set_int('u_motion', MOTION_FLAP)
+        self.program.set_vec3_array('u_origin', [pivot])
+        self.program.set_float('u_flap_angle', angle)
+
+    # Textura com alpha test (> 0.5) e deslocamento em u; None desliga
+    def set_texture(self, texture, u_offset=0.0):
+        if texture is None:
+            self.program.set_int('u_textured', 0)
+            self.program.set_vec2('u_uv_offset', 0.0, 0.0)
+            glBindTexture(GL_TEXTURE_2D, 0)
+        else:
+            glActiveTexture(GL_TEXTURE0)
+            glBindTexture(GL_TEXTURE_2D, texture)
+            self.program.set_int('u_textured', 1)
+            self.program.set_vec2('u_uv_offset', u_offset, 0.0)
+
+    def release(self):
+        self.instances.release()
+        self.program.release()
@@ -0,0 +1,159 @@
+import json
+import mmap
+import struct
+import sys
+import time
+
+import numpy as np
+
+from mesh import INDEX_DTYPE, VERTEX_DTYPE, Mesh
+
+# CARREGAMENTO DO GLB EXPORTADO
+# Lê só o cabeçalho e o JSON do arquivo; o bloco binário é mapeado em
+# memória (mmap) e cada malha vira um Mesh cujos vértices e índices são
+# views NumPy diretamente sobre o mapeamento, sem cópia. O upload para a
+# GPU (MeshBuffer/CoreMesh) lê das páginas do arquivo, então o custo de
+# carregar não depende de gerar geometria, nem cresce com o número de
+# triângulos além do próprio glBufferData.
+#
+# Só entende o layout escrito por gltf_export.py (vértices intercalados como
+# VERTEX_DTYPE, índices uint32); qualquer outro GLB é recusado.
+
+# Chave dos extras que identificam cada malha, e versão do layout: muda
+# quando gltf_export.py passa a gravar algo diferente
+EXTRAS_KEY = 'f1_w16'
+FORMAT_VERSION = 1
+
+_GLB_MAGIC = b'glTF'
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+
+
+# Devolve (documento JSON, offset do bloco binário no arquivo)
+def _read_chunks(data):
+    magic, version, length = struct.unpack_from('<4sII', data, 0)
+    if magic != _GLB_MAGIC or version != 2:
+        raise ValueError("não é um arquivo GLB 2.0")
+    offset = 12
+    document = None
+    binary_offset = None
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        offset += 8
+        if chunk_type == _CHUNK_JSON:
+            document = json.loads(bytes(data[offset:offset + chunk_length]))
+        elif chunk_type == _CHUNK_BIN:
+            binary_offset = offset
+        offset += chunk_length
+    if document is None or binary_offset is None:
+        raise ValueError("GLB sem bloco JSON ou binário")
+    return document, binary_offset
+
+
+class CarAsset:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.document, self.binary_offset = _read_chunks(self.data)
+
+        extras = self.document.get('extras', {}).get(EXTRAS_KEY, {})
+        if extras.get('version') != FORMAT_VERSION:
+            raise ValueError("%s não foi gerado por esta versão de gltf_export.py" % path)
+        self.levels = extras.get('levels', [])
+
+        # ('chassis', nível), ('drs_flap', nível), ('wheel', dianteira, lado, nível) -> Mesh
+        self.meshes = {}
+        # Esferas (centro, raio) com os mesmos nomes usados por main.bounding_sphere
+        self.spheres = {}
+        self._index_meshes()
+
+    def _view(self, accessor, dtype, count=None):
+        view = self.document['bufferViews'][accessor['bufferView']]
+        offset = self.binary_offset + view.get('byteOffset', 0)
+        if count is None:
+            count = view['byteLength'] // np.dtype(dtype).itemsize
+        return np.frombuffer(self.data, dtype=dtype, count=count, offset=offset)
+
+    # Vértices: o accessor POSITION aponta para o início de cada registro
+    # intercalado; o bufferView inteiro é o array de VERTEX_DTYPE
+    def _vertices(self, primitive):
+        accessor = self.document['accessors'][primitive['attributes']['POSITION']]
+        view = self.document['bufferViews'][accessor['bufferView']]
+        if view.get('byteStride') != VERTEX_DTYPE.itemsize:
+            raise ValueError("layout de vértices diferente de VERTEX_DTYPE")
+        return self._view(accessor, VERTEX_DTYPE, accessor['count']), accessor
+
+    def _index_meshes(self):
+        accessors = self.document['accessors']
+        chassis = {}
+        for gltf_mesh in self.document.get('meshes', []):
+            extras = gltf_mesh.get('extras', {}).get(EXTRAS_KEY)
+            if extras is None:
+                continue
+            primitive = gltf_mesh['primitives'][0]
+            index_accessor = accessors[primitive['indices']]
+            part, level = extras['part'], extras['lod']
+
+            if part == 'chassis':
+                # Componentes do chassi: junta de volta em uma malha por nível
+                component = {
+                    'name': gltf_mesh.get('name', ''),
+                    'first_index': index_accessor.get('byteOffset', 0) // np.dtype(INDEX_DTYPE).itemsize,
+                    'index_count': index_accessor['count'],
+                    'first_vertex': extras['first_vertex'],
+                    'vertex_count': extras['vertex_count'],
+                    'low': extras['low'],
+                    'high': extras['high'],
+                }
+                chassis.setdefault(level, (primitive, index_accessor, []))[2].append(component)
+                continue
+
+            vertices, position = self._vertices(primitive)
+            mesh = Mesh(vertices, self._view(index_accessor, INDEX_DTYPE, index_accessor['count']),
+                        gltf_mesh.get('name', ''))
+            if part == 'drs_flap':
+                self.meshes[('drs_flap', level)] = mesh
+                sweep = extras['sweep_sphere']
+                self.spheres.setdefault('drs_flap', (np.array(sweep[:3]), sweep[3]))
+            elif part == 'wheel':
+                self.meshes[('wheel', extras['is_front'], extras['side'], level)] = mesh
+                if extras['side'] == 1 and level == min(self.levels):
+                    self.spheres[('wheel', extras['is_front'])] = _sphere(position)
+
+        for level, (primitive, index_accessor, components) in chassis.items():
+            vertices, position = self._vertices(primitive)
+            self.meshes[('chassis', level)] = Mesh(vertices, self._view(index_accessor, INDEX_DTYPE),
+                                                   'static_chassis', {'components': components})
+            if level == min(self.levels):
+                self.spheres['chassis'] = _sphere(position)
+
+    def mesh(self, key):
+        return self.meshes.get(key)
+
+    def bounding_sphere(self, name):
+        return self.spheres.get(name)
+
+    @property
+    def nbytes(self):
+        return sum(mesh.nbytes for mesh in self.meshes.values())
+
+
+# Esfera que envolve a caixa min/max do accessor (mesma conta de Mesh.bounding_sphere)
+def _sphere(position_accessor):
+    low = np.array(position_accessor['min'], dtype=np.float64)
+    high = np.array(position_accessor['max'], dtype=np.float64)
+    center = (low + high) * 0.5
+    return center, float(np.linalg.norm(high - center))
+
+
+def load_car(path):
+    return CarAsset(path)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    asset = load_car(sys.argv[1] if len(sys.argv) > 1 else 'w16.glb')
+    elapsed = time.perf_counter() - start
+    print("%s: %d malhas, %.1f KiB mapeados em %.2f ms" % (
+        asset.path, len(asset.meshes), asset.nbytes / 1024, elapsed * 1000))
@@ -0,0 +1,228 @@
+import argparse
+import time
+
+import numpy as np
+import pygltflib
+
+import car_geometry
+import lod
+import simulation
+from glb_loader import EXTRAS_KEY, FORMAT_VERSION
+from mesh import INDEX_DTYPE, VERTEX_DTYPE
+
+# EXPORTAÇÃO PARA GLTF BINÁRIO (GLB)
+# Grava o carro em um único .glb: uma cena por nível de detalhe, com o
+# chassi (um nó filho por componente), as quatro rodas como nós próprios e
+# o flap do DRS pendurado em um nó de pivô, animado pela animação
+# "drs_open". Os vértices vão intercalados exatamente como VERTEX_DTYPE
+# (um bufferView com byteStride por malha), então o bloco binário pode ser
+# enviado direto para um VBO sem conversão (ver glb_loader.py).
+#
+#   python gltf_export.py --output w16.glb
+
+DEFAULT_OUTPUT = 'w16.glb'
+
+# Quadros-chave da abertura do DRS (mesma curva de simulation.step_state)
+DRS_KEYFRAMES = 32
+DRS_ANIMATION_SECONDS = 2.0
+
+_ALIGNMENT = 4
+
+# Atributos glTF -> campo de VERTEX_DTYPE
+_ATTRIBUTES = [
+    ('POSITION', 'position', pygltflib.VEC3),
+    ('NORMAL', 'normal', pygltflib.VEC3),
+    ('COLOR_0', 'color', pygltflib.VEC3),
+    ('TEXCOORD_0', 'uv', pygltflib.VEC2),
+]
+
+
+# Monta o bloco binário e os bufferViews/accessors de um GLTF2
+class _GlbBuilder:
+    def __init__(self):
+        self.gltf = pygltflib.GLTF2(asset=pygltflib.Asset(generator='f1-3d-car gltf_export.py'))
+        self.chunks = []
+        self.size = 0
+
+    def _append(self, data, target=None, stride=None):
+        padding = -self.size % _ALIGNMENT
+        if padding:
+            self.chunks.append(b'\0' * padding)
+            self.size += padding
+        data = data.tobytes() if isinstance(data, np.ndarray) else data
+        self.gltf.bufferViews.append(pygltflib.BufferView(
+            buffer=0, byteOffset=self.size, byteLength=len(data), byteStride=stride, target=target))
+        self.chunks.append(data)
+        self.size += len(data)
+        return len(self.gltf.bufferViews) - 1
+
+    def _accessor(self, view, offset, component_type, count, accessor_type, low=None, high=None):
+        self.gltf.accessors.append(pygltflib.Accessor(
+            bufferView=view, byteOffset=offset, componentType=component_type, count=count,
+            type=accessor_type, min=low, max=high))
+        return len(self.gltf.accessors) - 1
+
+    # Vértices intercalados em um bufferView; devolve os accessors por atributo
+    def vertices(self, vertices):
+        view = self._append(np.ascontiguousarray(vertices, dtype=VERTEX_DTYPE), pygltflib.ARRAY_BUFFER,
+                            VERTEX_DTYPE.itemsize)
+        attributes = {}
+        for name, field, accessor_type in _ATTRIBUTES:
+            low = high = None
+            if name == 'POSITION':
+                low = vertices['position'].min(axis=0).tolist()
+                high = vertices['position'].max(axis=0).tolist()
+            attributes[name] = self._accessor(view, VERTEX_DTYPE.fields[field][1], pygltflib.FLOAT,
+                                              len(vertices), accessor_type, low, high)
+        return pygltflib.Attributes(**attributes)
+
+    def index_view(self, indices):
+        return self._append(np.ascontiguousarray(indices, dtype=INDEX_DTYPE), pygltflib.ELEMENT_ARRAY_BUFFER)
+
+    def indices(self, view, first, count):
+        return self._accessor(view, first * np.dtype(INDEX_DTYPE).itemsize, pygltflib.UNSIGNED_INT, count,
+                              pygltflib.SCALAR)
+
+    def floats(self, values, accessor_type, with_bounds=False):
+        values = np.ascontiguousarray(values, dtype=np.float32)
+        view = self._append(values)
+        low = high = None
+        if with_bounds:
+            low = np.atleast_1d(values.min(axis=0)).tolist()
+            high = np.atleast_1d(values.max(axis=0)).tolist()
+        return self._accessor(view, 0, pygltflib.FLOAT, len(values), accessor_type, low, high)
+
+    # Malha glTF com um intervalo [first, first + count) dos índices de view
+    def mesh(self, name, attributes, view, first, count, extras):
+        self.gltf.meshes.append(pygltflib.Mesh(name=name, extras={EXTRAS_KEY: extras}, primitives=[
+            pygltflib.Primitive(attributes=attributes, indices=self.indices(view, first, count), material=0),
+        ]))
+        return len(self.gltf.meshes) - 1
+
+    def whole_mesh(self, mesh, extras):
+        return self.mesh(mesh.name, self.vertices(mesh.vertices), self.index_view(mesh.indices), 0,
+                         len(mesh.indices), extras)
+
+    def node(self, name, mesh=None, children=None, translation=None, rotation=None):
+        self.gltf.nodes.append(pygltflib.Node(name=name, mesh=mesh, children=children or [],
+                                              translation=translation, rotation=rotation))
+        return len(self.gltf.nodes) - 1
+
+    def finish(self):
+        blob = b''.join(self.chunks)
+        self.gltf.buffers.append(pygltflib.Buffer(byteLength=len(blob)))
+        self.gltf.set_binary_blob(blob)
+        return self.gltf
+
+
+# Rotação de -angle graus em torno de z (glRotatef(-angle, 0, 0, 1)) como quaternions (x, y, z, w)
+def drs_rotations(angles):
+    half = -np.radians(angles) * 0.5
+    return np.column_stack((np.zeros_like(half), np.zeros_like(half), np.sin(half), np.cos(half)))
+
+
+def drs_keyframes(count=DRS_KEYFRAMES, seconds=DRS_ANIMATION_SECONDS):
+    times = np.linspace(0.0, seconds, count)
+    drs_open = 1.0 - np.exp(-simulation.DRS_OPEN_RATE * times)
+    return times, drs_rotations(drs_open * car_geometry.DRS_MAX_ANGLE)
+
+
+def _chassis_node(builder, level):
+    # Os componentes dividem os mesmos vértices e índices; cada um é um
+    # intervalo de índices (como em merge_meshes) e vira um nó filho. A
+    # caixa de cada componente vai junto, para o culling não precisar ler
+    # os vértices ao carregar.
+    mesh = car_geometry.static_chassis_mesh(level)
+    attributes = builder.vertices(mesh.vertices)
+    view = builder.index_view(mesh.indices)
+    children = []
+    for component in mesh.metadata['components']:
+        positions = mesh.positions[component['first_vertex']:component['first_vertex'] + component['vertex_count']]
+        extras = {
+            'part': 'chassis', 'lod': level,
+            'first_vertex': component['first_vertex'], 'vertex_count': component['vertex_count'],
+            'low': positions.min(axis=0).tolist(), 'high': positions.max(axis=0).tolist(),
+        }
+        mesh_index = builder.mesh(component['name'], attributes, view, component['first_index'],
+                                  component['index_count'], extras)
+        children.append(builder.node(component['name'], mesh_index))
+    return builder.node('chassis', children=children)
+
+
+def _drs_flap_node(builder, level):
+    pivot = [float(v) for v in car_geometry.DRS_PIVOT]
+    # Esfera que envolve o flap em qualquer abertura (culling do viewer)
+    center, radius = car_geometry.drs_flap_sweep_mesh().bounding_sphere()
+    mesh_index = builder.whole_mesh(car_geometry.lod_drs_flap_mesh(level), {
+        'part': 'drs_flap', 'lod': level, 'sweep_sphere': [float(v) for v in center] + [radius]})
+    flap = builder.node('drs_flap', mesh_index, translation=[-v for v in pivot])
+    return builder.node('drs_pivot', children=[flap], translation=pivot, rotation=[0.0, 0.0, 0.0, 1.0])
+
+
+def _wheel_nodes(builder, level):
+    nodes = []
+    for x, y, z, is_front, side in car_geometry.wheel_layout():
+        mesh = car_geometry.lod_wheel_mesh(is_front, side, level)
+        mesh_index = builder.whole_mesh(mesh, {'part': 'wheel', 'lod': level, 'is_front': is_front, 'side': side})
+        nodes.append(builder.node(mesh.name, mesh_index, translation=[float(x), float(y), float(z)]))
+    return nodes
+
+
+def build_car_gltf(levels=None):
+    levels = range(lod.LEVELS) if levels is None else levels
+    builder = _GlbBuilder()
+    builder.gltf.materials.append(pygltflib.Material(
+        name='vertex_color', doubleSided=True,
+        pbrMetallicRoughness=pygltflib.PbrMetallicRoughness(
+            baseColorFactor=[1.0, 1.0, 1.0, 1.0], metallicFactor=0.0, roughnessFactor=0.6)))
+
+    times, rotations = drs_keyframes()
+    time_accessor = builder.floats(times, pygltflib.SCALAR, with_bounds=True)
+    rotation_accessor = builder.floats(rotations, pygltflib.VEC4)
+    animation = pygltflib.Animation(name='drs_open')
+
+    for level in levels:
+        chassis = _chassis_node(builder, level)
+        pivot = _drs_flap_node(builder, level)
+        wheels = _wheel_nodes(builder, level)
+        car = builder.node('car_lod%d' % level, children=[chassis, pivot] + wheels)
+        builder.gltf.scenes.append(pygltflib.Scene(name='lod%d' % level, nodes=[car]))
+
+        animation.samplers.append(pygltflib.AnimationSampler(
+            input=time_accessor, output=rotation_accessor, interpolation=pygltflib.ANIM_LINEAR))
+        animation.channels.append(pygltflib.AnimationChannel(
+            sampler=len(animation.samplers) - 1,
+            target=pygltflib.AnimationChannelTarget(node=pivot, path=pygltflib.ROTATION)))
+
+    builder.gltf.animations.append(animation)
+    builder.gltf.scene = 0
+    builder.gltf.extras = {EXTRAS_KEY: {'version': FORMAT_VERSION, 'levels': list(levels)}}
+    return builder.finish()
+
+
+def export_car(path=DEFAULT_OUTPUT, levels=None):
+    gltf = build_car_gltf(levels)
+    gltf.save_binary(path)
+    return gltf
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta o carro para glTF binário (.glb)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="arquivo .glb de saída")
+    parser.add_argument("--lod", type=int, action='append',
+                        help="nível de detalhe a exportar (repetível; padrão: todos)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    gltf = export_car(args.output, args.lod)
+    elapsed = time.perf_counter() - start
+    size = len(gltf.binary_blob())
+    print("%s: %d cenas, %d malhas, %d nós, %.1f KiB de buffers em %.2f s" % (
+        args.output, len(gltf.scenes), len(gltf.meshes), len(gltf.nodes), size / 1024, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import numpy as np
+
+import simulation
+
+# GRID DE LARGADA (VÁRIOS CARROS)
+# O estado de cada carro (posição, giro das rodas, direção, DRS) fica em
+# arrays NumPy, um elemento por carro, e avança junto com a simulação em
+# passo fixo. Todos os carros usam as mesmas malhas compiladas; o caminho
+# core desenha cada componente com um único draw instanciado.
+
+GRID_SIZE = 20
+# Duas colunas, uma posição a cada GRID_SPACING metros, alternando o lado
+GRID_SPACING = 3.5
+GRID_COLUMN_Z = 1.8
+GRID_FRONT_X = 30.0
+
+# Variação entre carros (determinística, a partir de GRID_SEED)
+GRID_SEED = 16
+SPEED_VARIATION = 0.04
+# Quanto cada carro avança e recua em relação à sua posição no grid
+POSITION_SWAY = 0.6
+
+
+# Campos de cada carro como linhas de um array (STATE_ROWS, carros), para
+# arquivos de sessão e memória compartilhada
+STATE_FIELDS = (('position', 3), ('wheel_rotation', 1), ('steer_angle', 1), ('drs_open', 1))
+STATE_ROWS = sum(size for _, size in STATE_FIELDS)
+
+
+def grid_positions(count=GRID_SIZE):
+    i = np.arange(count)
+    x = GRID_FRONT_X - i * GRID_SPACING
+    z = np.where(i % 2 == 0, GRID_COLUMN_Z, -GRID_COLUMN_Z)
+    return np.column_stack((x, np.zeros(count), z))
+
+
+class CarGrid:
+    def __init__(self, count=GRID_SIZE, seed=GRID_SEED):
+        random = np.random.default_rng(seed)
+        self.count = count
+        self.base_positions = grid_positions(count)
+        self.speed_factor = 1.0 + random.uniform(-SPEED_VARIATION, SPEED_VARIATION, count)
+        self.steer_phase = random.uniform(0, 2 * np.pi, count)
+        self.sway_phase = random.uniform(0, 2 * np.pi, count)
+        self.drs_rate = simulation.DRS_OPEN_RATE * random.uniform(0.6, 1.4, count)
+
+        self.current = self._initial_state()
+        self.previous = self.current
+
+    def _initial_state(self):
+        return {
+            'position': self.base_positions.copy(),
+            'wheel_rotation': np.zeros(self.count),
+            'steer_angle': np.zeros(self.count),
+            'drs_open': np.zeros(self.count),
+        }
+
+    # Chamado pela simulação a cada passo fixo, depois do passo do carro principal
+    def step(self, state, dt):
+        self.previous = self.current
+        if not state.running:
+            return
+
+        speed = simulation.CAR_SPEED * self.speed_factor
+        position = self.base_positions.copy()
+        position[:, 0] += np.sin(state.time * 0.5 + self.sway_phase) * POSITION_SWAY
+        drs_open = self.current['drs_open']
+        self.current = {
+            'position': position,
+            'wheel_rotation': (self.current['wheel_rotation'] - speed * simulation.WHEEL_DEGREES_PER_METER * dt) % 360,
+            'steer_angle': np.sin(state.time * simulation.STEER_FREQUENCY + self.steer_phase)
+                           * simulation.STEER_AMPLITUDE,
+            'drs_open': drs_open + (1.0 - drs_open) * self.drs_rate * dt,
+        }
+
+    def interpolated(self, alpha):
+        return interpolate(self.previous, self.current, alpha)
+
+    def reset(self):
+        self.current = self.previous = self._initial_state()
+
+    # Ao parar a animação, DRS e direção voltam a zero na hora (como no carro principal)
+    def reset_motion(self):
+        self.current = dict(self.current, drs_open=np.zeros(self.count), steer_angle=np.zeros(self.count))
+        self.previous = self.current
+
+
+def interpolate(previous, current, alpha):
+    if previous is current or alpha >= 1:
+        return current
+    delta = (current['wheel_rotation'] - previous['wheel_rotation'] + 180) % 360 - 180
+    return {
+        'position': previous['position'] + (current['position'] - previous['position']) * alpha,
+        'wheel_rotation': (previous['wheel_rotation'] + delta * alpha) % 360,
+        'steer_angle': previous['steer_angle'] + (current['steer_angle'] - previous['steer_angle']) * alpha,
+        'drs_open': previous['drs_open'] + (current['drs_open'] - previous['drs_open']) * alpha,
+    }
+
+
+def state_rows(state):
+    count = len(state['drs_open'])
+    return np.vstack([np.asarray(state[name], dtype=np.float64).reshape(count, size).T
+                      for name, size in STATE_FIELDS])
+
+
+# Views sobre as linhas, sem copiar (ex.: direto na memória compartilhada)
+def state_views(rows):
+    state = {}
+    row = 0
+    for name, size in STATE_FIELDS:
+        values = rows[row:row + size].T
+        state[name] = values if size > 1 else values[:, 0]
+        row += size
+    return state
+
+
+def state_from_rows(rows):
+    return {name: values.copy() for name, values in state_views(rows).items()}
@@ -0,0 +1,138 @@
+import ctypes
+import os
+
+import numpy as np
+
+# RENDERIZAÇÃO SEM JANELA
+# Cria um contexto OpenGL fora da tela pelo Mesa, sem display e sem GPU:
+#   egl    - EGL na plataforma "surfaceless" (llvmpipe), com um pbuffer
+#   osmesa - OSMesa, renderizando direto em um buffer na memória
+# PYOPENGL_PLATFORM precisa ser definido antes do primeiro import de
+# OpenGL, por isso main.py chama configure_platform() antes de tudo.
+# profile='core' pede um contexto OpenGL 3.3 core (só com EGL), usado
+# pelo caminho de shaders de gl_core.py.
+
+BACKENDS = ('egl', 'osmesa')
+PROFILES = ('compatibility', 'core')
+
+
+def configure_platform(backend='egl'):
+    if backend not in BACKENDS:
+        raise ValueError("backend headless desconhecido: %s" % backend)
+    os.environ.setdefault('PYOPENGL_PLATFORM', backend)
+    if backend == 'egl':
+        os.environ.setdefault('EGL_PLATFORM', 'surfaceless')
+
+
+class HeadlessContext:
+    def __init__(self, width, height, backend='egl', profile='compatibility'):
+        if profile not in PROFILES:
+            raise ValueError("perfil OpenGL desconhecido: %s" % profile)
+        if profile == 'core' and backend != 'egl':
+            raise ValueError("o perfil core só está disponível com EGL")
+        self.width = width
+        self.height = height
+        self.backend = backend
+        self.profile = profile
+        self._display = None
+        self._surface = None
+        self._context = None
+        self._buffer = None
+
+        if backend == 'egl':
+            self._create_egl()
+        elif backend == 'osmesa':
+            self._create_osmesa()
+        else:
+            raise ValueError("backend headless desconhecido: %s" % backend)
+
+    def _create_egl(self):
+        from OpenGL import EGL
+
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not display:
+            raise RuntimeError("EGL: nenhum display disponível")
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("EGL: falha em eglInitialize")
+
+        config_attribs = (EGL.EGLint * 15)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8,
+            EGL.EGL_GREEN_SIZE, 8,
+            EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_ALPHA_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE,
+        )
+        config = EGL.EGLConfig()
+        num_configs = EGL.EGLint()
+        if not EGL.eglChooseConfig(display, config_attribs, ctypes.pointer(config), 1,
+                                   ctypes.pointer(num_configs)) or num_configs.value == 0:
+            raise RuntimeError("EGL: nenhuma configuração compatível")
+
+        surface_attribs = (EGL.EGLint * 5)(EGL.EGL_WIDTH, self.width, EGL.EGL_HEIGHT, self.height, EGL.EGL_NONE)
+        surface = EGL.eglCreatePbufferSurface(display, config, surface_attribs)
+        # Os handles opacos do PyOpenGL não são iguais (==) a EGL_NO_*; nulo é falso
+        if not surface:
+            raise RuntimeError("EGL: falha ao criar a superfície %dx%d (erro 0x%x)"
+                               % (self.width, self.height, EGL.eglGetError()))
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attribs = None
+        if self.profile == 'core':
+            context_attribs = (EGL.EGLint * 7)(
+                EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+                EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+                EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+                EGL.EGL_NONE,
+            )
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, context_attribs)
+        if not context:
+            raise RuntimeError("EGL: falha ao criar o contexto (erro 0x%x)" % EGL.eglGetError())
+        EGL.eglMakeCurrent(display, surface, surface, context)
+
+        self._display = display
+        self._surface = surface
+        self._context = context
+
+    def _create_osmesa(self):
+        from OpenGL import GL, arrays, osmesa
+
+        context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not context:
+            raise RuntimeError("OSMesa: falha ao criar o contexto")
+        self._buffer = arrays.GLubyteArray.zeros((self.height, self.width, 4))
+        if not osmesa.OSMesaMakeCurrent(context, self._buffer, GL.GL_UNSIGNED_BYTE, self.width, self.height):
+            raise RuntimeError("OSMesa: falha em OSMesaMakeCurrent")
+        self._context = context
+
+    # Pixels RGB do quadro atual, com a primeira linha no topo da imagem
+    def read_pixels(self):
+        from OpenGL.GL import GL_RGB, GL_UNSIGNED_BYTE, glFinish, glPixelStorei, glReadPixels, GL_PACK_ALIGNMENT
+
+        glFinish()
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        data = glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE)
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 3)
+        return pixels[::-1].copy()
+
+    def release(self):
+        if self.backend == 'egl' and self._display is not None:
+            from OpenGL import EGL
+
+            EGL.eglMakeCurrent(self._display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self._display, self._context)
+            EGL.eglDestroySurface(self._display, self._surface)
+            EGL.eglTerminate(self._display)
+            self._display = None
+        elif self.backend == 'osmesa' and self._context is not None:
+            from OpenGL import osmesa
+
+            osmesa.OSMesaDestroyContext(self._context)
+            self._context = None
+
+
+def parse_size(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
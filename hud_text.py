@@ -0,0 +1,112 @@
+import numpy as np
+import pygame
+
+from mesh import INDEX_DTYPE, VERTEX_DTYPE, Mesh
+
+# TEXTO DO HUD
+# Os caracteres ASCII imprimíveis são rasterizados uma única vez (com
+# pygame.font) em um atlas RGBA: branco com a cobertura do glifo no alpha.
+# Cada string vira uma malha de quads texturizados, montada com NumPy e
+# guardada na GPU; ela só é refeita quando o texto (ou a cor, ou a posição)
+# muda. Assim o HUD custa um draw call por string, sem GLUT.
+
+FONT_SIZE = 22
+FIRST_CHAR = 32
+LAST_CHAR = 126
+# Caracteres fora do atlas (acentos, por exemplo) aparecem como '?'
+REPLACEMENT_CHAR = '?'
+ATLAS_WIDTH = 512
+# Espaço entre glifos no atlas, para a amostragem não pegar o vizinho
+_PADDING = 1
+
+_QUAD_INDICES = np.array([0, 1, 2, 0, 2, 3], dtype=INDEX_DTYPE)
+
+
+def _next_power_of_two(value):
+    return 1 << max(int(value) - 1, 0).bit_length()
+
+
+class FontAtlas:
+    def __init__(self, size=FONT_SIZE, font_path=None):
+        pygame.font.init()
+        font = pygame.font.Font(font_path, size)
+        self.line_height = font.get_linesize()
+        self.descent = font.get_descent()
+
+        glyphs = [font.render(chr(code), True, (255, 255, 255)) for code in range(FIRST_CHAR, LAST_CHAR + 1)]
+        placements = []
+        x = y = row_height = 0
+        for glyph in glyphs:
+            width, height = glyph.get_size()
+            if x + width > ATLAS_WIDTH:
+                x, y, row_height = 0, y + row_height + _PADDING, 0
+            placements.append((x, y, width, height))
+            x += width + _PADDING
+            row_height = max(row_height, height)
+
+        atlas_height = _next_power_of_two(y + row_height)
+        self.pixels = np.zeros((atlas_height, ATLAS_WIDTH, 4), dtype=np.uint8)
+        self.pixels[..., :3] = 255
+        for glyph, (x, y, width, height) in zip(glyphs, placements):
+            self.pixels[y:y + height, x:x + width, 3] = pygame.surfarray.array_alpha(glyph).T
+
+        # Por glifo: tamanho em pixels e cantos no atlas (linha 0 do atlas é v = 0)
+        placements = np.array(placements, dtype=np.float64)
+        scale = np.array([ATLAS_WIDTH, atlas_height], dtype=np.float64)
+        self.sizes = placements[:, 2:4]
+        self.uv_low = placements[:, 0:2] / scale
+        self.uv_high = (placements[:, 0:2] + placements[:, 2:4]) / scale
+
+    def glyph_indices(self, text):
+        codes = np.frombuffer(text.encode('ascii', 'replace'), dtype=np.uint8).astype(np.int64)
+        codes[(codes < FIRST_CHAR) | (codes > LAST_CHAR)] = ord(REPLACEMENT_CHAR)
+        return codes - FIRST_CHAR
+
+
+# Quads de uma string com a linha de base em y (coordenadas de tela em
+# pixels, y para cima, como em glRasterPos)
+def text_mesh(atlas, text, x, y, color=(1, 1, 1)):
+    glyphs = atlas.glyph_indices(text)
+    count = len(glyphs)
+    widths, heights = atlas.sizes[glyphs].T
+    lefts = x + np.concatenate(([0.0], np.cumsum(widths)[:-1]))
+    bottom = y + atlas.descent
+    (u0, v0), (u1, v1) = atlas.uv_low[glyphs].T, atlas.uv_high[glyphs].T
+
+    vertices = np.zeros((count, 4), dtype=VERTEX_DTYPE)
+    vertices['position'][:, :, 0] = np.column_stack((lefts, lefts + widths, lefts + widths, lefts))
+    vertices['position'][:, :, 1] = np.column_stack((np.full(count, bottom), np.full(count, bottom),
+                                                     bottom + heights, bottom + heights))
+    vertices['uv'][:, :, 0] = np.column_stack((u0, u1, u1, u0))
+    vertices['uv'][:, :, 1] = np.column_stack((v1, v1, v0, v0))
+    vertices['normal'] = (0.0, 0.0, 1.0)
+    vertices['color'] = color
+
+    indices = (_QUAD_INDICES[None, :] + (np.arange(count, dtype=INDEX_DTYPE) * 4)[:, None]).reshape(-1)
+    return Mesh(vertices.reshape(-1), indices.astype(INDEX_DTYPE), text)
+
+
+# Uma malha na GPU por posição do HUD; new_buffer é MeshBuffer ou CoreMesh
+class TextCache:
+    def __init__(self, atlas, new_buffer):
+        self.atlas = atlas
+        self.new_buffer = new_buffer
+        self.entries = {}
+        self.rebuilds = 0
+
+    def buffer(self, x, y, text, color=(1, 1, 1)):
+        key = (text, tuple(color))
+        entry = self.entries.get((x, y))
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        if entry is not None:
+            entry[1].release()
+        buffer = self.new_buffer(text_mesh(self.atlas, text, x, y, color))
+        self.entries[(x, y)] = (key, buffer)
+        self.rebuilds += 1
+        return buffer
+
+    def release(self):
+        for _, buffer in self.entries.values():
+            buffer.release()
+        self.entries.clear()
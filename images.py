@@ -0,0 +1,35 @@
+import struct
+import zlib
+
+import numpy as np
+
+# ESCRITA DE IMAGENS
+# PNG mínimo (RGB de 8 bits) escrito só com zlib, para não depender de
+# bibliotecas de imagem nos servidores de renderização.
+
+
+def encode_png(pixels, compress_level=6):
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    height, width = pixels.shape[:2]
+
+    # Cada linha começa com o byte de filtro 0 (nenhum)
+    raw = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 0
+    raw[:, 1:] = pixels.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', header),
+        chunk(b'IDAT', zlib.compress(raw.tobytes(), compress_level)),
+        chunk(b'IEND', b''),
+    ))
+
+
+def write_png(path, pixels, compress_level=6):
+    with open(path, 'wb') as f:
+        f.write(encode_png(pixels, compress_level))
@@ -0,0 +1,175 @@
+import collections
+import functools
+
+# INSTRUMENTAÇÃO DE CHAMADAS OPENGL
+# Quando ligada, troca as funções GL importadas com "from OpenGL.GL import *"
+# nos módulos indicados por versões que contam cada chamada, e embrulha as
+# funções draw_* do módulo da cena para saber qual componente está
+# desenhando. Desligada, nada fica instalado e o custo é zero.
+
+# Chamadas contadas e a categoria de cada uma no resumo
+COUNTED_CALLS = {
+    'glBegin': 'begin',
+    'glVertex2f': 'vertex',
+    'glVertex3f': 'vertex',
+    'glNormal3f': 'normal',
+    'glColor3f': 'color',
+    'glColor4f': 'color',
+    'glPushMatrix': 'matrix',
+    'glPopMatrix': 'matrix',
+    'glTranslatef': 'matrix',
+    'glRotatef': 'matrix',
+    'glScalef': 'matrix',
+    'glLoadIdentity': 'matrix',
+    'glMultMatrixf': 'matrix',
+    'glMultMatrixd': 'matrix',
+    'glMatrixMode': 'matrix',
+    'gluLookAt': 'matrix',
+    'gluNewQuadric': 'quadric',
+    'glBindTexture': 'state',
+    'glBindBuffer': 'state',
+    'glBindVertexArray': 'state',
+    'glUseProgram': 'state',
+    'glUniform1i': 'uniform',
+    'glUniform1f': 'uniform',
+    'glUniform2f': 'uniform',
+    'glUniform3fv': 'uniform',
+    'glUniformMatrix4fv': 'uniform',
+}
+
+CATEGORIES = ('begin', 'vertex', 'normal', 'color', 'matrix', 'quadric', 'state', 'uniform', 'draw_calls',
+              'vertices')
+
+# draw_* que só repassam para outro componente e não devem receber a conta
+PASSTHROUGH = {'draw_track_part', 'draw_scrolling_track_part', 'draw_text_opengl'}
+
+OTHER = 'other'
+
+enabled = False
+_patches = []
+_stack = []
+_current = collections.defaultdict(collections.Counter)
+_last_frame = {}
+
+
+def _component():
+    return _stack[-1] if _stack else OTHER
+
+
+def _counted(name, category, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        counter = _current[_component()]
+        counter[name] += 1
+        counter[category] += 1
+        if category == 'vertex':
+            counter['vertices'] += 1
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def _component_scope(name, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        _stack.append(name)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _stack.pop()
+    return wrapper
+
+
+# Substitui o _count_draw do gl_backend para atribuir draw calls e vértices
+# ao componente atual
+def _draw_counter(original):
+    @functools.wraps(original)
+    def wrapper(index_count):
+        counter = _current[_component()]
+        counter['draw_calls'] += 1
+        counter['vertices'] += index_count
+        return original(index_count)
+    return wrapper
+
+
+def _patch(module, name, replacement):
+    _patches.append((module, name, module.__dict__[name]))
+    setattr(module, name, replacement)
+
+
+# scene_module: módulo com as funções draw_* (main);
+# gl_modules: módulos cujas chamadas GL devem ser contadas
+def enable(scene_module, gl_modules=()):
+    global enabled
+
+    if enabled:
+        return
+    import gl_backend
+
+    for module in (scene_module,) + tuple(gl_modules):
+        for name, category in COUNTED_CALLS.items():
+            if callable(module.__dict__.get(name)):
+                _patch(module, name, _counted(name, category, module.__dict__[name]))
+
+    for name, value in list(scene_module.__dict__.items()):
+        if (name.startswith('draw_') and name not in PASSTHROUGH and callable(value)
+                and getattr(value, '__module__', None) == scene_module.__name__):
+            _patch(scene_module, name, _component_scope(name, value))
+
+    _patch(gl_backend, '_count_draw', _draw_counter(gl_backend._count_draw))
+    enabled = True
+    reset()
+
+
+def disable():
+    global enabled
+
+    while _patches:
+        module, name, original = _patches.pop()
+        setattr(module, name, original)
+    enabled = False
+
+
+def toggle(scene_module, gl_modules=()):
+    if enabled:
+        disable()
+    else:
+        enable(scene_module, gl_modules)
+
+
+def reset():
+    _current.clear()
+    _last_frame.clear()
+
+
+def begin_frame():
+    _current.clear()
+
+
+def end_frame():
+    _last_frame.clear()
+    _last_frame.update({name: collections.Counter(counter) for name, counter in _current.items()})
+    _current.clear()
+
+
+# Contagens do último quadro completo, por componente
+def last_frame():
+    return {name: dict(counter) for name, counter in _last_frame.items()}
+
+
+# Totais do último quadro por categoria (begin, vertex, matrix, ...)
+def frame_totals():
+    totals = collections.Counter()
+    for counter in _last_frame.values():
+        for category in CATEGORIES:
+            totals[category] += counter.get(category, 0)
+    return {category: totals[category] for category in CATEGORIES}
+
+
+# Componentes ordenados pelo total de chamadas GL contadas
+def ranked_components(limit=None):
+    def calls(counter):
+        return sum(counter.get(category, 0) for category in CATEGORIES if category != 'vertices')
+
+    ranked = sorted(_last_frame.items(), key=lambda item: calls(item[1]), reverse=True)
+    rows = [(name, calls(counter), counter.get('vertices', 0)) for name, counter in ranked]
+    return rows[:limit] if limit else rows
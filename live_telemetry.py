@@ -0,0 +1,188 @@
+import argparse
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+# TELEMETRIA AO VIVO POR UDP
+# Uma fonte local (simulador, equipamento de corrida ou telemetry_sender.py)
+# manda pacotes binários de tamanho fixo para uma porta UDP. Uma thread
+# recebe cada pacote direto (recv_into) no próximo slot de um buffer circular
+# NumPy pré-alocado e só então publica o slot, avançando o contador de
+# escrita. O loop de desenho lê o slot mais recente sem trava: há um único
+# escritor e um único leitor, e o escritor nunca mexe em um slot publicado
+# até dar a volta no buffer inteiro.
+#
+#   python telemetry_sender.py --rate 5000           # fonte de teste
+#   python main.py --live-telemetry                  # porta DEFAULT_PORT
+#   python live_telemetry.py --seconds 5             # só recebe e mede
+
+DEFAULT_PORT = 20777
+DEFAULT_HOST = '127.0.0.1'
+MAGIC = 0xF116
+VERSION = 1
+RING_CAPACITY = 4096
+# Sem pacotes por mais que isso, o HUD mostra a fonte como parada
+STALE_SECONDS = 0.5
+# Sequência que volta mais que isso é uma fonte reiniciada, não um pacote atrasado
+RESTART_GAP = 1024
+# Buffer do socket no kernel: segura as rajadas enquanto a thread espera o GIL
+SOCKET_BUFFER = 1 << 20
+
+PACKET_DTYPE = np.dtype([
+    ('magic', '<u2'),
+    ('version', 'u1'),
+    ('drs', 'u1'),        # 0 fechado, 1 aberto
+    ('sequence', '<u4'),  # crescente; buracos são pacotes perdidos
+    ('time', '<f8'),      # relógio da fonte, em segundos
+    ('speed', '<f4'),     # km/h
+    ('steer', '<f4'),     # graus das rodas dianteiras
+    ('throttle', '<f4'),  # 0 a 1
+])
+PACKET_SIZE = PACKET_DTYPE.itemsize
+# magic, version, drs, sequence: o que a thread confere em cada pacote
+_HEADER = struct.Struct('<HBBI')
+
+
+# Pacotes prontos para enviar, um por linha de um array de PACKET_DTYPE
+def make_packets(sequence, times, speed, steer, throttle, drs):
+    packets = np.zeros(len(times), dtype=PACKET_DTYPE)
+    packets['magic'] = MAGIC
+    packets['version'] = VERSION
+    packets['sequence'] = sequence + np.arange(len(times))
+    packets['time'] = times
+    packets['speed'] = speed
+    packets['steer'] = steer
+    packets['throttle'] = throttle
+    packets['drs'] = drs
+    return packets
+
+
+class TelemetryReceiver:
+    def __init__(self, port=DEFAULT_PORT, host=DEFAULT_HOST, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self.ring = np.zeros(capacity, dtype=PACKET_DTYPE)
+        # Cada slot como bytes, para o socket escrever direto nele
+        self.slots = self.ring.view(np.uint8).reshape(capacity, PACKET_SIZE)
+        self.arrival = np.zeros(capacity, dtype=np.float64)
+        # Pacotes publicados; o mais recente está em (written - 1) % capacity
+        self.written = 0
+        self.lost = 0
+        self.rejected = 0
+        self.last_sequence = None
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER)
+        self.socket.bind((host, port))
+        self.socket.settimeout(0.1)
+        self.address = self.socket.getsockname()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._receive, name='telemetry-receiver', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.socket.close()
+
+    def _receive(self):
+        recv_into = self.socket.recv_into
+        unpack_header = _HEADER.unpack_from
+        while self.running:
+            slot = self.written % self.capacity
+            buffer = self.slots[slot]
+            try:
+                size = recv_into(buffer)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            # O cabeçalho é lido do próprio slot; nada é copiado
+            magic, version, _, sequence = unpack_header(buffer)
+            if size != PACKET_SIZE or magic != MAGIC or version != VERSION:
+                self.rejected += 1
+                continue
+            now = time.perf_counter()
+            if self.last_sequence is not None and sequence <= self.last_sequence:
+                # A fonte recomeçou (do zero, em telemetry_sender.py) depois de
+                # ficar parada ou bem atrás da anterior: vale como fluxo novo
+                if self.last_sequence - sequence > RESTART_GAP or self.stale(now):
+                    self.last_sequence = None
+            if self.last_sequence is not None:
+                if sequence <= self.last_sequence:
+                    # Atrasado ou repetido: já há um pacote mais novo publicado
+                    self.rejected += 1
+                    continue
+                self.lost += sequence - self.last_sequence - 1
+            self.last_sequence = sequence
+            self.arrival[slot] = now
+            self.written += 1
+
+    # Cópia do pacote mais recente (ou None antes do primeiro)
+    def latest(self):
+        written = self.written
+        if not written:
+            return None
+        return self.ring[(written - 1) % self.capacity].copy()
+
+    # Até count pacotes mais recentes, do mais antigo para o mais novo
+    def recent(self, count):
+        written = self.written
+        count = min(count, written, self.capacity - 1)
+        slots = np.arange(written - count, written) % self.capacity
+        return self.ring[slots]
+
+    def stale(self, now=None):
+        if not self.written:
+            return True
+        now = time.perf_counter() if now is None else now
+        return now - self.arrival[(self.written - 1) % self.capacity] > STALE_SECONDS
+
+
+# Entradas da simulação (Simulation.driver) tiradas do pacote mais recente.
+# Sem nenhum pacote ainda, ou com a fonte parada, o carro fica parado.
+class LiveTelemetryDriver:
+    def __init__(self, receiver):
+        self.receiver = receiver
+
+    def inputs(self, seconds):
+        packet = self.receiver.latest()
+        if packet is None or self.receiver.stale():
+            return 0.0, 0.0, False
+        return float(packet['speed']) / 3.6, float(packet['steer']), bool(packet['drs'])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recebe telemetria por UDP e mede a taxa de pacotes")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--seconds", type=float, default=5.0, help="tempo recebendo")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    receiver = TelemetryReceiver(args.port, args.host).start()
+    print("ouvindo em %s:%d por %.0f s" % (receiver.address[0], receiver.address[1], args.seconds))
+    time.sleep(args.seconds)
+    receiver.stop()
+    packet = receiver.latest()
+    print("%d pacotes (%.0f/s), %d perdidos, %d recusados" % (
+        receiver.written, receiver.written / args.seconds, receiver.lost, receiver.rejected))
+    if packet is not None:
+        print("último: %.1f km/h, direção %.2f°, acelerador %.0f%%, DRS %s" % (
+            packet['speed'], packet['steer'], packet['throttle'] * 100, 'aberto' if packet['drs'] else 'fechado'))
+
+
+if __name__ == "__main__":
+    main()
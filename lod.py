@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+
+# NÍVEIS DE DETALHE (LOD)
+# Cada componente com geometria curva (rodas, halo, asas) é gerado em
+# alguns níveis de tesselação. O nível usado em cada quadro sai do tamanho
+# projetado na tela (em pixels) da esfera que envolve o componente. Para o
+# nível não ficar trocando quando o tamanho está perto de um limiar, subir
+# ou descer de nível exige passar o limiar com uma folga (histerese).
+
+# Nível 0 é o mais detalhado
+LEVELS = 3
+
+# Diâmetro projetado mínimo (em pixels) para usar cada nível, do mais
+# detalhado para o menos; abaixo do último limiar usa o último nível
+THRESHOLDS = {
+    'chassis': (500.0, 200.0),
+    'wheel': (96.0, 32.0),
+}
+
+# Folga relativa em torno de cada limiar
+HYSTERESIS = 0.15
+
+
+# Diâmetro em pixels de uma esfera de raio radius a distance da câmera
+# (distance pode ser um array)
+def projected_size(radius, distance, viewport_height, fov_y):
+    distance = np.maximum(np.maximum(distance, radius), 1e-6)
+    return viewport_height * radius / (distance * math.tan(math.radians(fov_y) * 0.5))
+
+
+# Nível para um tamanho, sem histerese
+def level_for_size(size, thresholds):
+    for level, threshold in enumerate(thresholds):
+        if size >= threshold:
+            return level
+    return len(thresholds)
+
+
+# Guarda o último nível de cada componente (chave livre, ex.: ('wheel', True, 1))
+# e só troca quando o tamanho passa do limiar com a folga de HYSTERESIS
+class LodSelector:
+    def __init__(self, thresholds=None, hysteresis=HYSTERESIS):
+        self.thresholds = dict(THRESHOLDS if thresholds is None else thresholds)
+        self.hysteresis = hysteresis
+        self.levels = {}
+        self.enabled = True
+        self.eye = (0.0, 0.0, 0.0)
+        self.viewport_height = 1
+        self.fov_y = 45.0
+
+    def set_view(self, eye, viewport_height, fov_y):
+        self.eye = eye
+        self.viewport_height = viewport_height
+        self.fov_y = fov_y
+
+    def select(self, key, kind, size):
+        thresholds = self.thresholds[kind]
+        level = self.levels.get(key)
+        if level is None:
+            level = level_for_size(size, thresholds)
+        else:
+            while level > 0 and size >= thresholds[level - 1] * (1 + self.hysteresis):
+                level -= 1
+            while level < len(thresholds) and size < thresholds[level] * (1 - self.hysteresis):
+                level += 1
+        self.levels[key] = level
+        return level
+
+    # Nível de uma esfera (centro em coordenadas do mundo) vista da câmera atual
+    def level(self, key, kind, center, radius):
+        if not self.enabled:
+            return 0
+        distance = math.dist(self.eye, center)
+        return self.select(key, kind, float(projected_size(radius, distance, self.viewport_height, self.fov_y)))
+
+    # Versão vetorizada de select para um array de tamanhos (um por carro do
+    # grid, por exemplo). O nível fica entre o que os limiares com folga
+    # permitem subir e descer, partindo do nível anterior de cada elemento.
+    def select_many(self, key, kind, sizes):
+        thresholds = np.asarray(self.thresholds[kind])
+        sizes = np.asarray(sizes)[:, None]
+        coarsest = (sizes < thresholds * (1 + self.hysteresis)).sum(axis=1)
+        finest = (sizes < thresholds * (1 - self.hysteresis)).sum(axis=1)
+        previous = self.levels.get(key)
+        if previous is None or len(previous) != len(sizes):
+            levels = (sizes < thresholds).sum(axis=1)
+        else:
+            levels = np.clip(previous, finest, coarsest)
+        self.levels[key] = levels
+        return levels
+
+    def levels_many(self, key, kind, centers, radius):
+        if not self.enabled:
+            return np.zeros(len(centers), dtype=np.int64)
+        distances = np.linalg.norm(np.asarray(centers) - np.asarray(self.eye), axis=1)
+        return self.select_many(key, kind, projected_size(radius, distances, self.viewport_height, self.fov_y))
+
+    def reset(self):
+        self.levels.clear()
@@ -1,12 +1,43 @@
 
 
+import argparse
+import math
+import sys
+
+import headless
+
+# O PyOpenGL escolhe a plataforma no primeiro import, então o modo sem
+# janela precisa ser configurado antes dele
+if '--headless' in sys.argv:
+    headless.configure_platform('osmesa' if '--osmesa' in sys.argv else 'egl')
+
 from OpenGL.GL import *
 from OpenGL.GLU import *
-from OpenGL.GLUT import *
+import numpy as np
 import pygame
 from pygame.locals import *
-import math
-import sys
+
+import capture
+import car_geometry
+import circuit
+import culling
+import gl_backend
+import gl_core
+import glb_loader
+import grid
+import hud_text
+import instrumentation
+import live_telemetry
+import lod
+import mesh_cache
+import replay
+import sim_process
+import simulation
+import telemetry
+import track
+import track_streaming
+from gl_backend import MeshBuffer, create_texture, draw_mesh, release_texture
+from mesh import identity, look_at, orthographic, perspective, transform_points
 
 # VARIÁVEIS GLOBAIS DE ANIMAÇÃO
 animation_running = False
@@ -17,357 +48,30 @@ track_line_offset = 0.0
 camera_angle_y = 25.0
 camera_angle_x = 15.0
 camera_distance = 8.0
+FIELD_OF_VIEW = 45.0
+NEAR_PLANE = 0.1
+FAR_PLANE = 200.0
+# Luzes direcionais em coordenadas de olho: (posição, ambiente, difusa)
+LIGHTS = [
+    ([5, 10, 5, 0], [0.5, 0.5, 0.5, 1], [0.9, 0.9, 0.9, 1]),
+    ([-5, 8, -5, 0], [0, 0, 0, 1], [0.6, 0.6, 0.6, 1]),
+]
+SKY_COLOR = (0.4, 0.6, 0.9, 1)
 
-# FUNÇÕES AUXILIARES DE DESENHO
-def draw_solid_cube(size=1.0):
-    h = size / 2.0
-    
-    glBegin(GL_QUADS)
-    
-    glNormal3f(0, 0, 1)
-    glVertex3f(-h, -h, h)
-    glVertex3f(h, -h, h)
-    glVertex3f(h, h, h)
-    glVertex3f(-h, h, h)
-    
-    glNormal3f(0, 0, -1)
-    glVertex3f(h, -h, -h)
-    glVertex3f(-h, -h, -h)
-    glVertex3f(-h, h, -h)
-    glVertex3f(h, h, -h)
-    
-    glNormal3f(0, 1, 0)
-    glVertex3f(-h, h, -h)
-    glVertex3f(-h, h, h)
-    glVertex3f(h, h, h)
-    glVertex3f(h, h, -h)
-    
-    glNormal3f(0, -1, 0)
-    glVertex3f(-h, -h, -h)
-    glVertex3f(h, -h, -h)
-    glVertex3f(h, -h, h)
-    glVertex3f(-h, -h, h)
-    
-    glNormal3f(1, 0, 0)
-    glVertex3f(h, -h, -h)
-    glVertex3f(h, h, -h)
-    glVertex3f(h, h, h)
-    glVertex3f(h, -h, h)
-    
-    glNormal3f(-1, 0, 0)
-    glVertex3f(-h, -h, h)
-    glVertex3f(-h, h, h)
-    glVertex3f(-h, h, -h)
-    glVertex3f(-h, -h, -h)
-    
-    glEnd()
-
-# FUNÇÕES AUXILIARES DE DESENHO
-def draw_quad(v1, v2, v3, v4, normal=None):
-    if normal:
-        glNormal3f(*normal)
-    glBegin(GL_QUADS)
-    glVertex3f(*v1)
-    glVertex3f(*v2)
-    glVertex3f(*v3)
-    glVertex3f(*v4)
-    glEnd()
-
-def draw_polygon(vertices, normal=None):
-    if normal:
-        glNormal3f(*normal)
-    glBegin(GL_POLYGON)
-    for v in vertices:
-        glVertex3f(*v)
-    glEnd()
-
-def draw_extruded_shape(profile_left, profile_right, close_ends=True):
-    n = len(profile_left)
-    glBegin(GL_QUAD_STRIP)
-    for i in range(n):
-        glVertex3f(*profile_left[i])
-        glVertex3f(*profile_right[i])
-    glVertex3f(*profile_left[0])
-    glVertex3f(*profile_right[0])
-    glEnd()
-    
-    if close_ends:
-        glBegin(GL_POLYGON)
-        for v in profile_left:
-            glVertex3f(*v)
-        glEnd()
-        glBegin(GL_POLYGON)
-        for v in reversed(profile_right):
-            glVertex3f(*v)
-        glEnd()
-
-# MONOCOQUE / CHASSI PRINCIPAL
+# COMPONENTES DO CARRO
+# A geometria vem de car_geometry (malhas NumPy); aqui ela só é enviada.
 def draw_monocoque():
-    glColor3f(0.08, 0.08, 0.08)  # Preto carbono
-
-    y_top = 0.12
-    y_bottom = -0.22
-    
-    profile_top_right = [
-        (1.5, 0.28),   # Frente (conexão com bico)
-        (0.8, 0.32),   # Cockpit (mais largo)
-        (0.2, 0.30),   # Atrás do cockpit
-        (-0.3, 0.25),  # Início sidepods
-        (-0.8, 0.22),  # Meio
-        (-1.4, 0.18),  # Afunilando
-        (-1.8, 0.12),  # Traseira estreita
-    ]
-    
-    top_left = [(x, y_top, -z) for x, z in profile_top_right]
-    top_right = [(x, y_top, z) for x, z in profile_top_right]
-    bottom_left = [(x, y_bottom, -z * 0.9) for x, z in profile_top_right]
-    bottom_right = [(x, y_bottom, z * 0.9) for x, z in profile_top_right]
-    
-    glNormal3f(0, 1, 0)
-    glBegin(GL_QUAD_STRIP)
-    for i in range(len(top_left)):
-        glVertex3f(*top_left[i])
-        glVertex3f(*top_right[i])
-    glEnd()
-    
-    glNormal3f(0, -1, 0)
-    glBegin(GL_QUAD_STRIP)
-    for i in range(len(bottom_left)):
-        glVertex3f(*bottom_right[i])
-        glVertex3f(*bottom_left[i])
-    glEnd()
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(len(top_right)):
-        glVertex3f(*top_right[i])
-        glVertex3f(*bottom_right[i])
-    glEnd()
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(len(top_left)):
-        glVertex3f(*bottom_left[i])
-        glVertex3f(*top_left[i])
-    glEnd()
+    draw_mesh(car_geometry.monocoque_mesh())
 
 def draw_engine_cover():
-    glColor3f(0.08, 0.08, 0.08)
-
-    profile_side = [
-        (0.2, 0.15),    # Início (atrás do cockpit)
-        (0.0, 0.28),    # Subindo
-        (-0.15, 0.42),  # Subindo mais (base do airbox)
-        (-0.3, 0.52),   # Pico máximo (topo do airbox)
-        (-0.5, 0.48),   # Começando a descer
-        (-0.7, 0.40),   # Descendo
-        (-0.9, 0.32),   # Descendo mais
-        (-1.1, 0.24),   # Continuando
-        (-1.3, 0.18),   # Quase no fim
-        (-1.5, 0.14),   # Baixo
-        (-1.7, 0.10),   # Mais baixo
-        (-1.9, 0.06),   # Traseira
-    ]
-    
-    widths = [
-        0.28,   # Início
-        0.26,   # 
-        0.22,   # Base airbox
-        0.18,   # Topo airbox (mais estreito)
-        0.16,   #
-        0.15,   #
-        0.14,   #
-        0.13,   #
-        0.12,   #
-        0.11,   #
-        0.10,   #
-        0.08,   # Traseira (bem estreito)
-    ]
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(len(profile_side)):
-        x, y = profile_side[i]
-        w = widths[i]
-        glNormal3f(0, 1, 0)
-        glVertex3f(x, y, -w)
-        glVertex3f(x, y, w)
-    glEnd()
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(len(profile_side)):
-        x, y = profile_side[i]
-        w = widths[i]
-        y_base = 0.12 if x > -0.5 else 0.10 - (x + 0.5) * 0.05
-        glNormal3f(0, 0, 1)
-        glVertex3f(x, y, w)
-        glVertex3f(x, y_base, w)
-    glEnd()
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(len(profile_side)):
-        x, y = profile_side[i]
-        w = widths[i]
-        y_base = 0.12 if x > -0.5 else 0.10 - (x + 0.5) * 0.05
-        glNormal3f(0, 0, -1)
-        glVertex3f(x, y_base, -w)
-        glVertex3f(x, y, -w)
-    glEnd()
-    
-    glColor3f(0.06, 0.06, 0.06)
-    x_back = profile_side[-1][0]
-    y_back = profile_side[-1][1]
-    w_back = widths[-1]
-    glBegin(GL_QUADS)
-    glNormal3f(-1, 0, 0)
-    glVertex3f(x_back, y_back, -w_back)
-    glVertex3f(x_back, y_back, w_back)
-    glVertex3f(x_back, -0.05, w_back)
-    glVertex3f(x_back, -0.05, -w_back)
-    glEnd()
+    draw_mesh(car_geometry.engine_cover_mesh())
 
 def draw_nose():
-    glColor3f(0.08, 0.08, 0.08)
-
-    sections = [
-        (1.5,   0.22,  0.20,  0.08,  -0.20),  # Base (conexão com chassi)
-        (1.8,   0.18,  0.17,  0.04,  -0.20),  # Transição
-        (2.1,   0.15,  0.14,  0.00,  -0.19),  # 
-        (2.4,   0.12,  0.11, -0.04,  -0.18),  # Meio do bico
-        (2.7,   0.09,  0.08, -0.06,  -0.17),  # Afunilando
-        (3.0,   0.06,  0.05, -0.08,  -0.16),  # Mais fino
-        (3.2,   0.04,  0.03, -0.10,  -0.15),  # Quase na ponta
-        (3.4,   0.02,  0.015, -0.12,  -0.14),  # Ponta
-    ]
-    
-    for i in range(len(sections) - 1):
-        x1, wt1, wb1, yt1, yb1 = sections[i]
-        x2, wt2, wb2, yt2, yb2 = sections[i + 1]
-        
-        glColor3f(0.08, 0.08, 0.08)
-        glNormal3f(0, 1, 0)
-        glBegin(GL_QUADS)
-        glVertex3f(x1, yt1, -wt1)
-        glVertex3f(x1, yt1, wt1)
-        glVertex3f(x2, yt2, wt2)
-        glVertex3f(x2, yt2, -wt2)
-        glEnd()
-        
-        glNormal3f(0, -1, 0)
-        glBegin(GL_QUADS)
-        glVertex3f(x1, yb1, wt1)
-        glVertex3f(x1, yb1, -wt1)
-        glVertex3f(x2, yb2, -wt2)
-        glVertex3f(x2, yb2, wt2)
-        glEnd()
-        
-        glNormal3f(0, 0, 1)
-        glBegin(GL_QUADS)
-        glVertex3f(x1, yt1, wt1)
-        glVertex3f(x1, yb1, wb1)
-        glVertex3f(x2, yb2, wb2)
-        glVertex3f(x2, yt2, wt2)
-        glEnd()
-        
-        glNormal3f(0, 0, -1)
-        glBegin(GL_QUADS)
-        glVertex3f(x1, yt1, -wt1)
-        glVertex3f(x2, yt2, -wt2)
-        glVertex3f(x2, yb2, -wb2)
-        glVertex3f(x1, yb1, -wb1)
-        glEnd()
-    
-    x_tip = sections[-1][0]
-    wt_tip = sections[-1][1]
-    yt_tip = sections[-1][3]
-    yb_tip = sections[-1][4]
-    
-    glColor3f(0.06, 0.06, 0.06)
-    glNormal3f(1, 0, 0)
-    glBegin(GL_QUADS)
-    glVertex3f(x_tip, yt_tip, -wt_tip)
-    glVertex3f(x_tip, yt_tip, wt_tip)
-    glVertex3f(x_tip, yb_tip, wt_tip)
-    glVertex3f(x_tip, yb_tip, -wt_tip)
-    glEnd()
+    draw_mesh(car_geometry.nose_mesh())
 
 # SIDEPODS
 def draw_sidepod(side):
-    glColor3f(0.10, 0.10, 0.10)
-    
-    z_offset = side * 0.22
-
-    widths = [
-        (0.8, 0.55),    # Frente - largo
-        (0.5, 0.60),    # Máxima largura
-        (0.0, 0.55),    # Meio
-        (-0.4, 0.45),   # Começando undercut
-        (-0.8, 0.30),   # Undercut forte
-        (-1.2, 0.18),   # Traseira estreita
-    ]
-    
-    y_top = 0.18
-    y_bottom = -0.20
-    
-    for i in range(len(widths) - 1):
-        x1, w1 = widths[i]
-        x2, w2 = widths[i + 1]
-        
-        h1 = y_top * (1.0 if i < 2 else 0.85)
-        h2 = y_top * (1.0 if i + 1 < 2 else 0.85)
-        
-        z_inner = z_offset
-        z_outer1 = z_offset + side * w1
-        z_outer2 = z_offset + side * w2
-        
-        glNormal3f(0, 1, 0)
-        draw_quad(
-            (x1, h1, z_inner),
-            (x1, h1, z_outer1),
-            (x2, h2, z_outer2),
-            (x2, h2, z_inner)
-        )
-        
-        nx = 0
-        nz = side
-        glNormal3f(nx, 0, nz)
-        draw_quad(
-            (x1, h1, z_outer1),
-            (x1, y_bottom, z_outer1),
-            (x2, y_bottom, z_outer2),
-            (x2, h2, z_outer2)
-        )
-        
-        glNormal3f(0, -1, 0)
-        draw_quad(
-            (x1, y_bottom, z_outer1),
-            (x1, y_bottom, z_inner),
-            (x2, y_bottom, z_inner),
-            (x2, y_bottom, z_outer2)
-        )
-    
-    x_front, w_front = widths[0]
-    h_front = y_top
-    z_inner_front = z_offset
-    z_outer_front = z_offset + side * w_front
-    
-    glNormal3f(1, 0, 0)
-    draw_quad(
-        (x_front, h_front, z_inner_front),
-        (x_front, h_front, z_outer_front),
-        (x_front, y_bottom, z_outer_front),
-        (x_front, y_bottom, z_inner_front)
-    )
-    
-    x_back, w_back = widths[-1]
-    h_back = y_top * 0.85 
-    z_inner_back = z_offset
-    z_outer_back = z_offset + side * w_back
-    
-    glNormal3f(-1, 0, 0)
-    draw_quad(
-        (x_back, h_back, z_outer_back),
-        (x_back, h_back, z_inner_back),
-        (x_back, y_bottom, z_inner_back),
-        (x_back, y_bottom, z_outer_back)
-    )
+    draw_mesh(car_geometry.sidepod_mesh(side))
 
 def draw_sidepods():
     draw_sidepod(1)
@@ -377,723 +81,87 @@ def draw_sidepods():
 def draw_cockpit():
     pass
 
-def draw_halo():
-    glColor3f(0.08, 0.08, 0.08)
-    
-    cockpit_x = 0.55
-    cockpit_y = 0.12
-    
-    front_base_x = 1.05
-    front_base_y = 0.02
-    front_top_x = 0.70
-    front_top_y = 0.38
-    pillar_width_base = 0.06
-    pillar_width_top = 0.04
-    pillar_depth = 0.035
-    
-    glBegin(GL_QUADS)
-    glNormal3f(0.7, 0.7, 0)
-    glVertex3f(front_base_x, front_base_y, -pillar_width_base)
-    glVertex3f(front_base_x, front_base_y, pillar_width_base)
-    glVertex3f(front_top_x, front_top_y, pillar_width_top)
-    glVertex3f(front_top_x, front_top_y, -pillar_width_top)
-    glEnd()
-    
-    glBegin(GL_QUADS)
-    glNormal3f(-0.7, -0.7, 0)
-    glVertex3f(front_base_x - pillar_depth, front_base_y, pillar_width_base)
-    glVertex3f(front_base_x - pillar_depth, front_base_y, -pillar_width_base)
-    glVertex3f(front_top_x - pillar_depth * 0.7, front_top_y, -pillar_width_top)
-    glVertex3f(front_top_x - pillar_depth * 0.7, front_top_y, pillar_width_top)
-    glEnd()
-    
-    for side in [-1, 1]:
-        glBegin(GL_QUADS)
-        glNormal3f(0, 0, side)
-        glVertex3f(front_base_x, front_base_y, side * pillar_width_base)
-        glVertex3f(front_base_x - pillar_depth, front_base_y, side * pillar_width_base)
-        glVertex3f(front_top_x - pillar_depth * 0.7, front_top_y, side * pillar_width_top)
-        glVertex3f(front_top_x, front_top_y, side * pillar_width_top)
-        glEnd()
-    
-    arc_center_x = 0.35
-    arc_center_y = 0.38
-    arc_radius_x = 0.38
-    arc_radius_z = 0.28
-    arc_thickness = 0.032
-    arc_height = 0.025
-    num_segments = 32
-    
-    for i in range(num_segments):
-        angle1 = 2 * math.pi * i / num_segments
-        angle2 = 2 * math.pi * (i + 1) / num_segments
-        
-        x1 = arc_center_x + math.cos(angle1) * arc_radius_x
-        z1 = math.sin(angle1) * arc_radius_z
-        x2 = arc_center_x + math.cos(angle2) * arc_radius_x
-        z2 = math.sin(angle2) * arc_radius_z
-        
-        height_var1 = 0.015 * abs(math.sin(angle1))
-        height_var2 = 0.015 * abs(math.sin(angle2))
-        y1 = arc_center_y + height_var1
-        y2 = arc_center_y + height_var2
-        
-        glBegin(GL_QUADS)
-        glNormal3f(0, 1, 0)
-        glVertex3f(x1, y1 + arc_height, z1 - arc_thickness * 0.5)
-        glVertex3f(x1, y1 + arc_height, z1 + arc_thickness * 0.5)
-        glVertex3f(x2, y2 + arc_height, z2 + arc_thickness * 0.5)
-        glVertex3f(x2, y2 + arc_height, z2 - arc_thickness * 0.5)
-        glEnd()
-        
-        glBegin(GL_QUADS)
-        glNormal3f(0, -1, 0)
-        glVertex3f(x1, y1, z1 + arc_thickness * 0.5)
-        glVertex3f(x1, y1, z1 - arc_thickness * 0.5)
-        glVertex3f(x2, y2, z2 - arc_thickness * 0.5)
-        glVertex3f(x2, y2, z2 + arc_thickness * 0.5)
-        glEnd()
-        
-        glBegin(GL_QUADS)
-        nx1 = math.cos(angle1)
-        nz1 = math.sin(angle1)
-        nx2 = math.cos(angle2)
-        nz2 = math.sin(angle2)
-        glNormal3f((nx1 + nx2) * 0.5, 0, (nz1 + nz2) * 0.5)
-        glVertex3f(x1, y1, z1 + arc_thickness * 0.5)
-        glVertex3f(x1, y1 + arc_height, z1 + arc_thickness * 0.5)
-        glVertex3f(x2, y2 + arc_height, z2 + arc_thickness * 0.5)
-        glVertex3f(x2, y2, z2 + arc_thickness * 0.5)
-        glEnd()
-        
-        glBegin(GL_QUADS)
-        glNormal3f(-(nx1 + nx2) * 0.5, 0, -(nz1 + nz2) * 0.5)
-        glVertex3f(x1, y1 + arc_height, z1 - arc_thickness * 0.5)
-        glVertex3f(x1, y1, z1 - arc_thickness * 0.5)
-        glVertex3f(x2, y2, z2 - arc_thickness * 0.5)
-        glVertex3f(x2, y2 + arc_height, z2 - arc_thickness * 0.5)
-        glEnd()
-    
-    for side in [-1, 1]:
-        back_base_x = 0.05
-        back_base_y = 0.12
-        back_base_z = side * 0.22
-        back_top_x = arc_center_x - arc_radius_x * 0.95
-        back_top_y = arc_center_y
-        back_top_z = side * arc_radius_z * 0.95
-        back_width = 0.025
-        back_depth = 0.030
-
-        glBegin(GL_QUADS)
-        glNormal3f(0, 0, side)
-        glVertex3f(back_base_x, back_base_y, back_base_z)
-        glVertex3f(back_base_x - back_depth, back_base_y, back_base_z)
-        glVertex3f(back_top_x - back_depth * 0.8, back_top_y, back_top_z)
-        glVertex3f(back_top_x, back_top_y, back_top_z)
-        glEnd()
-        
-        glBegin(GL_QUADS)
-        glNormal3f(0, 0, -side)
-        glVertex3f(back_base_x - back_depth, back_base_y, back_base_z - side * back_width)
-        glVertex3f(back_base_x, back_base_y, back_base_z - side * back_width)
-        glVertex3f(back_top_x, back_top_y, back_top_z - side * back_width * 0.8)
-        glVertex3f(back_top_x - back_depth * 0.8, back_top_y, back_top_z - side * back_width * 0.8)
-        glEnd()
-        
-        glBegin(GL_QUADS)
-        glNormal3f(1, 0, 0)
-        glVertex3f(back_base_x, back_base_y, back_base_z - side * back_width)
-        glVertex3f(back_base_x, back_base_y, back_base_z)
-        glVertex3f(back_top_x, back_top_y, back_top_z)
-        glVertex3f(back_top_x, back_top_y, back_top_z - side * back_width * 0.8)
-        glEnd()
-        
-        glBegin(GL_QUADS)
-        glNormal3f(-1, 0, 0)
-        glVertex3f(back_base_x - back_depth, back_base_y, back_base_z)
-        glVertex3f(back_base_x - back_depth, back_base_y, back_base_z - side * back_width)
-        glVertex3f(back_top_x - back_depth * 0.8, back_top_y, back_top_z - side * back_width * 0.8)
-        glVertex3f(back_top_x - back_depth * 0.8, back_top_y, back_top_z)
-        glEnd()
+def draw_halo(lod=0):
+    draw_mesh(car_geometry.halo_mesh(**car_geometry.lod_parameters('halo', lod)))
 
 # ASA DIANTEIRA
-def draw_front_wing():
-    x_base = 3.2
-    y_base = -0.16
-    wing_half_width = 0.95
-    
-    def draw_wing_element(y_offset, thickness, chord_front, chord_back, angle, color):
-        glColor3f(*color)
-        
-        num_sections = 12
-        
-        glBegin(GL_QUAD_STRIP)
-        for i in range(num_sections + 1):
-            t = i / num_sections
-            z = -wing_half_width + t * 2 * wing_half_width
-            t_center = abs(t - 0.5) * 2
-            arch = -0.06 * (1 - t_center ** 1.2)
-            x_trailing = x_base + chord_back
-            x_leading = x_base - chord_front * (1 + t_center * 0.4)
-            y_top = y_base + y_offset + arch
-            y_leading_adj = y_top + math.sin(math.radians(angle)) * chord_front
-            glNormal3f(0, 1, 0)
-            glVertex3f(x_trailing, y_top, z)
-            glVertex3f(x_leading, y_leading_adj, z)
-        glEnd()
-        
-        glBegin(GL_QUAD_STRIP)
-        for i in range(num_sections + 1):
-            t = i / num_sections
-            z = -wing_half_width + t * 2 * wing_half_width
-            
-            t_center = abs(t - 0.5) * 2
-            arch = -0.06 * (1 - t_center ** 1.2)
-            
-            x_trailing = x_base + chord_back
-            x_leading = x_base - chord_front * (1 + t_center * 0.4)
-            
-            y_top = y_base + y_offset + arch
-            y_bot = y_top - thickness
-            y_leading_adj = y_bot + math.sin(math.radians(angle)) * chord_front
-            
-            glNormal3f(0, -1, 0)
-            glVertex3f(x_leading, y_leading_adj, z)
-            glVertex3f(x_trailing, y_bot, z)
-        glEnd()
-    
-    draw_wing_element(0, 0.025, 0.25, 0.35, 5, (0.08, 0.08, 0.08))
-    draw_wing_element(0.045, 0.02, 0.18, 0.28, 12, (0.08, 0.08, 0.08))
-    draw_wing_element(0.085, 0.018, 0.12, 0.22, 20, (0.08, 0.08, 0.08))
-    draw_wing_element(0.12, 0.015, 0.08, 0.15, 28, (0.08, 0.08, 0.08))
-    
-    for side in [-1, 1]:
-        glColor3f(0.06, 0.06, 0.06)
-        z_pos = side * wing_half_width
-        
-        glPushMatrix()
-        glTranslatef(x_base - 0.05, y_base + 0.08, z_pos)
-        
-        glBegin(GL_QUADS)
-        glNormal3f(0, 0, side)
-        glVertex3f(0.35, 0.12, 0)
-        glVertex3f(0.35, -0.08, 0)
-        glVertex3f(-0.40, -0.08, 0)
-        glVertex3f(-0.40, 0.18, 0)
-        glEnd()
-        
-        glBegin(GL_QUADS)
-        glNormal3f(0, 0, -side)
-        glVertex3f(-0.40, 0.18, -side * 0.02)
-        glVertex3f(-0.40, -0.08, -side * 0.02)
-        glVertex3f(0.35, -0.08, -side * 0.02)
-        glVertex3f(0.35, 0.12, -side * 0.02)
-        glEnd()
-        
-        glColor3f(0.10, 0.10, 0.10)
-        glBegin(GL_QUADS)
-        glNormal3f(0, 1, 0)
-        glVertex3f(0.35, 0.12, 0)
-        glVertex3f(-0.40, 0.18, 0)
-        glVertex3f(-0.40, 0.18, -side * 0.02)
-        glVertex3f(0.35, 0.12, -side * 0.02)
-        glEnd()
-        
-        glBegin(GL_QUADS)
-        glNormal3f(1, 0, 0)
-        glVertex3f(0.35, 0.12, 0)
-        glVertex3f(0.35, 0.12, -side * 0.02)
-        glVertex3f(0.35, -0.08, -side * 0.02)
-        glVertex3f(0.35, -0.08, 0)
-        glEnd()
-        
-        glPopMatrix()
-        
-        glColor3f(0, 0.85, 0.80)
-        glPushMatrix()
-        glTranslatef(x_base - 0.05, y_base + 0.22, z_pos - side * 0.01)
-        glScalef(0.70, 0.02, 0.025)
-        draw_solid_cube(1)
-        glPopMatrix()
-    
-    glColor3f(0.08, 0.08, 0.08)
-    
-    for side in [-1, 1]:
-        glPushMatrix()
-        glTranslatef(x_base - 0.15, y_base + 0.02, side * 0.06)
-        glScalef(0.08, 0.06, 0.03)
-        draw_solid_cube(1)
-        glPopMatrix()
-    
-    glPushMatrix()
-    glTranslatef(x_base - 0.1, y_base + 0.02, 0)
-    glScalef(0.12, 0.06, 0.04)
-    draw_solid_cube(1)
-    glPopMatrix()
-    
-    glColor3f(0, 0.85, 0.80)
-    glPushMatrix()
-    glTranslatef(x_base - 0.05, y_base + 0.005, 0)
-    glScalef(0.50, 0.008, 0.30)
-    draw_solid_cube(1)
-    glPopMatrix()
+def draw_front_wing(lod=0):
+    draw_mesh(car_geometry.front_wing_mesh(**car_geometry.lod_parameters('front_wing', lod)))
 
 # ASSOALHO E DIFUSOR
 def draw_floor():
-    glColor3f(0.06, 0.06, 0.06)
-    y = -0.22
-    
-    glNormal3f(0, -1, 0)
-    glBegin(GL_QUADS)
-    glVertex3f(2.0, y, -0.55)
-    glVertex3f(2.0, y, 0.55)
-    glVertex3f(-1.5, y, 0.55)
-    glVertex3f(-1.5, y, -0.55)
-    glEnd()
-    
-    glColor3f(0.08, 0.08, 0.08)
-    for side in [-1, 1]:
-        glBegin(GL_QUADS)
-        glVertex3f(1.8, y, side * 0.55)
-        glVertex3f(1.8, y, side * 0.75)
-        glVertex3f(-0.5, y, side * 0.75)
-        glVertex3f(-0.5, y, side * 0.55)
-        glEnd()
+    draw_mesh(car_geometry.floor_mesh())
 
 def draw_diffuser():
-    glColor3f(0.05, 0.05, 0.05)
-    
-    for i in range(7):
-        offset = (i - 3) * 0.12
-        glPushMatrix()
-        glTranslatef(-1.6, -0.15, offset)
-        glRotatef(25, 0, 0, 1)
-        glScalef(0.35, 0.02, 0.08)
-        draw_solid_cube(1)
-        glPopMatrix()
+    draw_mesh(car_geometry.diffuser_mesh())
 
 # DETALHES VISUAIS
 def draw_turquoise_accents():
-    glColor3f(0, 0.85, 0.80)
-    
-    glPushMatrix()
-    glTranslatef(2.5, -0.02, 0)
-    glScalef(0.6, 0.02, 0.12)
-    draw_solid_cube(1)
-    glPopMatrix()
-    
-    for side in [-1, 1]:
-        glPushMatrix()
-        glTranslatef(0.2, 0.10, side * 0.52)
-        glScalef(1.2, 0.015, 0.02)
-        draw_solid_cube(1)
-        glPopMatrix()
+    draw_mesh(car_geometry.turquoise_accents_mesh())
 
 def draw_airbox():
-    glColor3f(0.10, 0.10, 0.10)
-    
-    glPushMatrix()
-    glTranslatef(-0.1, 0.30, 0)
-    
-    glBegin(GL_QUADS)
-    glVertex3f(0.15, 0, -0.12)
-    glVertex3f(0.15, 0, 0.12)
-    glVertex3f(0.15, 0.25, 0.08)
-    glVertex3f(0.15, 0.25, -0.08)
-    glVertex3f(-0.15, 0, 0.12)
-    glVertex3f(-0.15, 0, -0.12)
-    glVertex3f(-0.15, 0.18, -0.06)
-    glVertex3f(-0.15, 0.18, 0.06)
-    glEnd()
-    
-    glBegin(GL_QUADS)
-    glVertex3f(0.15, 0.25, -0.08)
-    glVertex3f(0.15, 0.25, 0.08)
-    glVertex3f(-0.15, 0.18, 0.06)
-    glVertex3f(-0.15, 0.18, -0.06)
-    glEnd()
-    
-    for side in [-1, 1]:
-        z1 = side * 0.12
-        z2 = side * 0.08
-        z3 = side * 0.06
-        glBegin(GL_POLYGON)
-        glVertex3f(0.15, 0, z1)
-        glVertex3f(-0.15, 0, z1)
-        glVertex3f(-0.15, 0.18, z3)
-        glVertex3f(0.15, 0.25, z2)
-        glEnd()
-    
-    glColor3f(0.02, 0.02, 0.02)
-    glPushMatrix()
-    glTranslatef(0.16, 0.12, 0)
-    glScalef(0.02, 0.12, 0.10)
-    draw_solid_cube(1)
-    glPopMatrix()
-    
-    glPopMatrix()
+    draw_mesh(car_geometry.airbox_mesh())
 
 def draw_mirrors():
-    for side in [-1, 1]:
-        glPushMatrix()
-        glTranslatef(0.9, 0.22, side * 0.42)
-        
-        glColor3f(0.15, 0.15, 0.15)
-        glRotatef(side * 35, 0, 1, 0)
-        glRotatef(-15, 0, 0, 1)
-        
-        quadric = gluNewQuadric()
-        gluCylinder(quadric, 0.012, 0.012, 0.12, 8, 1)
-        gluDeleteQuadric(quadric)
-        
-        # Espelho
-        glTranslatef(0, 0, 0.12)
-        glColor3f(0.5, 0.5, 0.55)
-        glScalef(0.06, 0.04, 0.015)
-        draw_solid_cube(1)
-        
-        glPopMatrix()
+    draw_mesh(car_geometry.mirrors_mesh())
 
 # ASA TRASEIRA
-def draw_rear_wing(drs_open=0):
-    x_base = -1.90
-    y_base = 0.42
-    wing_half_width = 0.48
-    main_plane_chord = 0.35
-    flap_chord = 0.12
-    drs_angle = drs_open * 25
-    
-    glColor3f(0.06, 0.06, 0.06)
-    num_sections = 16
-    main_thickness = 0.025
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(num_sections + 1):
-        t = i / num_sections
-        z = -wing_half_width + t * 2 * wing_half_width
-        t_center = abs(t - 0.5) * 2
-        arch = 0.02 * t_center * t_center
-        x_front = x_base + main_plane_chord * 0.3
-        x_back = x_base - main_plane_chord * 0.7
-        y_pos = y_base + arch
-        y_front = y_pos + 0.08
-        y_back = y_pos
-        glNormal3f(0, 1, 0)
-        glVertex3f(x_front, y_front, z)
-        glVertex3f(x_back, y_back, z)
-    glEnd()
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(num_sections + 1):
-        t = i / num_sections
-        z = -wing_half_width + t * 2 * wing_half_width
-        t_center = abs(t - 0.5) * 2
-        arch = 0.02 * t_center * t_center
-        x_front = x_base + main_plane_chord * 0.3
-        x_back = x_base - main_plane_chord * 0.7
-        y_pos = y_base + arch - main_thickness
-        y_front = y_pos + 0.08
-        y_back = y_pos
-        glNormal3f(0, -1, 0)
-        glVertex3f(x_back, y_back, z)
-        glVertex3f(x_front, y_front, z)
-    glEnd()
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(num_sections + 1):
-        t = i / num_sections
-        z = -wing_half_width + t * 2 * wing_half_width
-        t_center = abs(t - 0.5) * 2
-        arch = 0.02 * t_center * t_center
-        x_front = x_base + main_plane_chord * 0.3
-        y_top = y_base + arch + 0.08
-        y_bot = y_top - main_thickness
-        glNormal3f(1, 0, 0)
-        glVertex3f(x_front, y_top, z)
-        glVertex3f(x_front, y_bot, z)
-    glEnd()
+def draw_rear_wing(drs_open=0, lod=0):
+    draw_rear_wing_structure(lod)
+    draw_drs_flap(drs_open, lod)
+
+def draw_rear_wing_structure(lod=0):
+    draw_mesh(car_geometry.rear_wing_structure_mesh(**car_geometry.lod_parameters('rear_wing', lod)))
+
+# Flap móvel do DRS, girado em torno do pivô a cada quadro. No grid o
+# carro inteiro já passou pelo culling (cull=False).
+def draw_drs_flap(drs_open=0, lod=0, cull=True):
+    center, radius = bounding_sphere('drs_flap', mesh_source.drs_flap_sweep_mesh)
+    if cull and not sphere_in_view(center, radius):
+        return
+    
+    pivot_x, pivot_y, _ = car_geometry.DRS_PIVOT
+    drs_angle = drs_open * car_geometry.DRS_MAX_ANGLE
+    
+    if core_renderer is not None:
+        core_renderer.set_flap(car_geometry.DRS_PIVOT, drs_angle)
+        drs_flap_buffers[lod].draw()
+        core_renderer.set_static()
+        return
     
     glPushMatrix()
-    pivot_x = x_base - main_plane_chord * 0.5
-    pivot_y = y_base + 0.04
     glTranslatef(pivot_x, pivot_y, 0)
     glRotatef(-drs_angle, 0, 0, 1)
     glTranslatef(-pivot_x, -pivot_y, 0)
-    
-    flap_y_offset = 0.06
-    flap_thickness = 0.018
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(num_sections + 1):
-        t = i / num_sections
-        z = -wing_half_width + t * 2 * wing_half_width
-        t_center = abs(t - 0.5) * 2
-        arch = 0.02 * t_center * t_center
-        x_front = x_base - main_plane_chord * 0.4
-        x_back = x_base - main_plane_chord * 0.4 - flap_chord
-        y_pos = y_base + flap_y_offset + arch
-        y_front = y_pos + 0.03
-        y_back = y_pos
-        glNormal3f(0, 1, 0)
-        glVertex3f(x_front, y_front, z)
-        glVertex3f(x_back, y_back, z)
-    glEnd()
-    
-    glBegin(GL_QUAD_STRIP)
-    for i in range(num_sections + 1):
-        t = i / num_sections
-        z = -wing_half_width + t * 2 * wing_half_width
-        t_center = abs(t - 0.5) * 2
-        arch = 0.02 * t_center * t_center
-        x_front = x_base - main_plane_chord * 0.4
-        x_back = x_base - main_plane_chord * 0.4 - flap_chord
-        y_pos = y_base + flap_y_offset + arch - flap_thickness
-        y_front = y_pos + 0.03
-        y_back = y_pos
-        glNormal3f(0, -1, 0)
-        glVertex3f(x_back, y_back, z)
-        glVertex3f(x_front, y_front, z)
-    glEnd()
-    glPopMatrix()
-    
-    for side in [-1, 1]:
-        glColor3f(0.06, 0.06, 0.06)
-        z_pos = side * wing_half_width
-        
-        glPushMatrix()
-        glTranslatef(x_base, y_base, z_pos)
-        
-        glBegin(GL_POLYGON)
-        glNormal3f(0, 0, side)
-        glVertex3f(0.15, 0.15, 0)
-        glVertex3f(0.15, -0.10, 0)
-        glVertex3f(-0.10, -0.35, 0)
-        glVertex3f(-0.30, -0.35, 0)
-        glVertex3f(-0.35, -0.20, 0)
-        glVertex3f(-0.35, 0.08, 0)
-        glVertex3f(-0.20, 0.12, 0)
-        glEnd()
-        
-        glBegin(GL_POLYGON)
-        glNormal3f(0, 0, -side)
-        glVertex3f(-0.20, 0.12, -side * 0.03)
-        glVertex3f(-0.35, 0.08, -side * 0.03)
-        glVertex3f(-0.35, -0.20, -side * 0.03)
-        glVertex3f(-0.30, -0.35, -side * 0.03)
-        glVertex3f(-0.10, -0.35, -side * 0.03)
-        glVertex3f(0.15, -0.10, -side * 0.03)
-        glVertex3f(0.15, 0.15, -side * 0.03)
-        glEnd()
-        
-        glColor3f(0.08, 0.08, 0.08)
-        glBegin(GL_QUADS)
-        glNormal3f(0, 1, 0)
-        glVertex3f(0.15, 0.15, 0)
-        glVertex3f(-0.20, 0.12, 0)
-        glVertex3f(-0.20, 0.12, -side * 0.03)
-        glVertex3f(0.15, 0.15, -side * 0.03)
-        glEnd()
-        
-        glPopMatrix()
-        
-        glColor3f(0, 0.85, 0.80)
-        glPushMatrix()
-        glTranslatef(x_base - 0.02, y_base + 0.14, z_pos - side * 0.015)
-        glScalef(0.32, 0.015, 0.02)
-        draw_solid_cube(1)
-        glPopMatrix()
-    
-    glColor3f(0.08, 0.08, 0.08)
-    
-    for side in [-1, 1]:
-        glPushMatrix()
-        base_x = -1.7
-        base_y = 0.10
-        base_z = side * 0.08
-        top_x = x_base - 0.05
-        top_y = y_base - 0.02
-        top_z = side * 0.15
-        dx = top_x - base_x
-        dy = top_y - base_y
-        dz = top_z - base_z
-        length = math.sqrt(dx*dx + dy*dy + dz*dz)
-        glTranslatef(base_x, base_y, base_z)
-        angle_y = math.degrees(math.atan2(dx, dy))
-        angle_horiz = math.degrees(math.atan2(dz, math.sqrt(dx*dx + dy*dy)))
-        glRotatef(angle_y, 0, 0, -1)
-        glRotatef(angle_horiz * side, 1, 0, 0)
-        quadric = gluNewQuadric()
-        gluCylinder(quadric, 0.025, 0.02, length, 12, 1)
-        gluDeleteQuadric(quadric)
-        glPopMatrix()
-    
-    glColor3f(0.06, 0.06, 0.06)
-    beam_y = y_base - 0.32
-    beam_width = wing_half_width * 0.9
-    
-    glBegin(GL_QUADS)
-    glNormal3f(0, 1, 0)
-    glVertex3f(x_base + 0.05, beam_y, -beam_width)
-    glVertex3f(x_base + 0.05, beam_y, beam_width)
-    glVertex3f(x_base - 0.15, beam_y, beam_width)
-    glVertex3f(x_base - 0.15, beam_y, -beam_width)
-    glEnd()
-    
-    glBegin(GL_QUADS)
-    glNormal3f(0, -1, 0)
-    glVertex3f(x_base - 0.15, beam_y - 0.015, -beam_width)
-    glVertex3f(x_base - 0.15, beam_y - 0.015, beam_width)
-    glVertex3f(x_base + 0.05, beam_y - 0.015, beam_width)
-    glVertex3f(x_base + 0.05, beam_y - 0.015, -beam_width)
-    glEnd()
-    
-    glColor3f(0.3, 0.0, 0.0)
-    glPushMatrix()
-    glTranslatef(x_base - 0.36, y_base - 0.05, 0)
-    glScalef(0.02, 0.04, 0.12)
-    draw_solid_cube(1)
+    buffer = drs_flap_buffers.get(lod) if use_compiled_geometry() else None
+    if buffer is not None:
+        buffer.draw()
+    else:
+        draw_mesh(car_geometry.lod_drs_flap_mesh(lod))
     glPopMatrix()
 
 # SUSPENSÃO
 def draw_suspension_bar(start, end, thickness=0.02):
-    dx = end[0] - start[0]
-    dy = end[1] - start[1]
-    dz = end[2] - start[2]
-    length = math.sqrt(dx*dx + dy*dy + dz*dz)
-    
-    if length < 0.001:
-        return
-    
-    dirx, diry, dirz = dx/length, dy/length, dz/length
-
-    perpx = diry * 0 - dirz * 1
-    perpy = dirz * 0 - dirx * 0  
-    perpz = dirx * 1 - diry * 0
-    perp_len = math.sqrt(perpx*perpx + perpy*perpy + perpz*perpz)
-    
-    if perp_len < 0.001:
-        perpx, perpy, perpz = 1, 0, 0
-    else:
-        perpx, perpy, perpz = perpx/perp_len, perpy/perp_len, perpz/perp_len
-    
-    t = thickness / 2
-    
-    glBegin(GL_QUADS)
-    
-    glNormal3f(0, 1, 0)
-    glVertex3f(start[0] - perpx*t, start[1] + t, start[2] - perpz*t)
-    glVertex3f(start[0] + perpx*t, start[1] + t, start[2] + perpz*t)
-    glVertex3f(end[0] + perpx*t, end[1] + t, end[2] + perpz*t)
-    glVertex3f(end[0] - perpx*t, end[1] + t, end[2] - perpz*t)
-    
-    glNormal3f(0, -1, 0)
-    glVertex3f(start[0] + perpx*t, start[1] - t, start[2] + perpz*t)
-    glVertex3f(start[0] - perpx*t, start[1] - t, start[2] - perpz*t)
-    glVertex3f(end[0] - perpx*t, end[1] - t, end[2] - perpz*t)
-    glVertex3f(end[0] + perpx*t, end[1] - t, end[2] + perpz*t)
-    
-    glVertex3f(start[0] + perpx*t, start[1] - t, start[2] + perpz*t)
-    glVertex3f(start[0] + perpx*t, start[1] + t, start[2] + perpz*t)
-    glVertex3f(end[0] + perpx*t, end[1] + t, end[2] + perpz*t)
-    glVertex3f(end[0] + perpx*t, end[1] - t, end[2] + perpz*t)
-    
-    glVertex3f(start[0] - perpx*t, start[1] + t, start[2] - perpz*t)
-    glVertex3f(start[0] - perpx*t, start[1] - t, start[2] - perpz*t)
-    glVertex3f(end[0] - perpx*t, end[1] - t, end[2] - perpz*t)
-    glVertex3f(end[0] - perpx*t, end[1] + t, end[2] - perpz*t)
-    
-    glEnd()
+    draw_mesh(car_geometry.suspension_bar_mesh(start, end, thickness))
 
 def draw_front_suspension():
-    glColor3f(0.15, 0.15, 0.15)
-    
-    for side in [-1, 1]:
-        upright_x = 1.9
-        upright_y = -0.08
-        upright_z = side * 0.70
-        
-        chassis_upper_front = (1.5, 0.05, side * 0.32)
-        chassis_upper_rear = (1.0, 0.03, side * 0.32)
-        upright_upper = (upright_x, upright_y + 0.08, upright_z)
-        glColor3f(0.12, 0.12, 0.12)
-        draw_suspension_bar(chassis_upper_front, upright_upper, 0.025)
-        draw_suspension_bar(chassis_upper_rear, upright_upper, 0.025)
-        
-        chassis_lower_front = (1.5, -0.18, side * 0.32)
-        chassis_lower_rear = (1.0, -0.18, side * 0.32)
-        upright_lower = (upright_x, upright_y - 0.10, upright_z)
-        
-        glColor3f(0.10, 0.10, 0.10)
-        draw_suspension_bar(chassis_lower_front, upright_lower, 0.028)
-        draw_suspension_bar(chassis_lower_rear, upright_lower, 0.028)
-        
-        pushrod_bottom = (upright_x - 0.1, upright_y - 0.05, upright_z - side * 0.02)
-        pushrod_top = (1.3, 0.08, side * 0.34)
-        glColor3f(0.08, 0.08, 0.08)
-        draw_suspension_bar(pushrod_bottom, pushrod_top, 0.018)
-        
-        glColor3f(0.18, 0.18, 0.18)
-        tie_rod_inner = (1.4, -0.05, side * 0.30)
-        tie_rod_outer = (upright_x, upright_y, upright_z - side * 0.02)
-        draw_suspension_bar(tie_rod_inner, tie_rod_outer, 0.015)
-        
-        glColor3f(0.08, 0.08, 0.08)
-        glPushMatrix()
-        glTranslatef(upright_x, upright_y, upright_z)
-        glScalef(0.05, 0.22, 0.04)
-        draw_solid_cube(1)
-        glPopMatrix()
+    draw_mesh(car_geometry.front_suspension_mesh())
 
 def draw_rear_suspension():
-    glColor3f(0.15, 0.15, 0.15)
-    
-    for side in [-1, 1]:
-        upright_x = -1.5
-        upright_y = -0.05
-        upright_z = side * 0.65
-        
-        gearbox_upper_front = (-1.0, 0.02, side * 0.22)
-        gearbox_upper_rear = (-1.6, 0.00, side * 0.18)
-        upright_upper = (upright_x, upright_y + 0.08, upright_z)
-        glColor3f(0.12, 0.12, 0.12)
-        draw_suspension_bar(gearbox_upper_front, upright_upper, 0.025)
-        draw_suspension_bar(gearbox_upper_rear, upright_upper, 0.025)
-        
-        gearbox_lower_front = (-1.0, -0.15, side * 0.22)
-        gearbox_lower_rear = (-1.6, -0.15, side * 0.18)
-        upright_lower = (upright_x, upright_y - 0.10, upright_z)
-        glColor3f(0.10, 0.10, 0.10)
-        draw_suspension_bar(gearbox_lower_front, upright_lower, 0.028)
-        draw_suspension_bar(gearbox_lower_rear, upright_lower, 0.028)
-        
-        pullrod_wheel = (upright_x + 0.08, upright_y + 0.06, upright_z - side * 0.02)
-        pullrod_gearbox = (-1.2, -0.12, side * 0.24)
-        glColor3f(0.08, 0.08, 0.08)
-        draw_suspension_bar(pullrod_wheel, pullrod_gearbox, 0.018)
-        
-        glColor3f(0.18, 0.18, 0.18)
-        toe_inner = (-1.4, -0.08, side * 0.20)
-        toe_outer = (upright_x, upright_y - 0.02, upright_z - side * 0.02)
-        draw_suspension_bar(toe_inner, toe_outer, 0.015)
-        
-        glColor3f(0.22, 0.22, 0.25)
-        shaft_inner = (-1.3, -0.05, side * 0.18)
-        shaft_outer = (upright_x, upright_y, upright_z - side * 0.03)
-        draw_suspension_bar(shaft_inner, shaft_outer, 0.035)
-        
-        glColor3f(0.08, 0.08, 0.08)
-        glPushMatrix()
-        glTranslatef(upright_x, upright_y, upright_z)
-        glScalef(0.05, 0.22, 0.05)
-        draw_solid_cube(1)
-        glPopMatrix()
+    draw_mesh(car_geometry.rear_suspension_mesh())
 
 def draw_suspension():
     draw_front_suspension()
     draw_rear_suspension()
 
 # RODAS
-def draw_wheel(x, y, z, rotation=0, is_front=False, steer_angle=0, side=1):
+def draw_wheel(x, y, z, rotation=0, is_front=False, steer_angle=0, side=1, lod=0):
+    if core_renderer is not None:
+        core_renderer.set_wheel((x, y, z), rotation, steer_angle if is_front else 0)
+        wheel_buffers[(is_front, side, lod)].draw()
+        core_renderer.set_static()
+        return
+    
     glPushMatrix()
     glTranslatef(x, y, z)
 
@@ -1101,331 +169,583 @@ def draw_wheel(x, y, z, rotation=0, is_front=False, steer_angle=0, side=1):
         glRotatef(steer_angle, 0, 1, 0)
     glRotatef(rotation, 0, 0, 1)
 
-    tire_radius = 0.33
-    tire_width = 0.28 if is_front else 0.34
-    rim_radius = 0.23
-    
-    if side == -1:
-        glRotatef(180, 0, 1, 0)
-
-    num_segments = 48
+    buffer = wheel_buffers.get((is_front, side, lod)) if use_compiled_geometry() else None
+    if buffer is not None:
+        buffer.draw()
+    else:
+        draw_mesh(car_geometry.lod_wheel_mesh(is_front, side, lod))
 
-    glColor3f(0.06, 0.06, 0.06)
-    glPushMatrix()
-    glTranslatef(0, 0, -tire_width * 0.5)
-    quadric = gluNewQuadric()
-    gluCylinder(quadric, tire_radius, tire_radius, tire_width, 48, 1)
-    gluDeleteQuadric(quadric)
     glPopMatrix()
 
-    glColor3f(0.08, 0.08, 0.08)
-    
-    for z_side in [-1, 1]:
-        z_pos = z_side * tire_width * 0.5
-        glBegin(GL_QUAD_STRIP)
-        for i in range(num_segments + 1):
-            angle = (2 * math.pi * i) / num_segments
-            x_outer = tire_radius * math.cos(angle)
-            y_outer = tire_radius * math.sin(angle)
-            x_inner = rim_radius * math.cos(angle)
-            y_inner = rim_radius * math.sin(angle)
-            glNormal3f(0, 0, z_side)
-            glVertex3f(x_outer, y_outer, z_pos)
-            glVertex3f(x_inner, y_inner, z_pos * 0.7)
-        glEnd()
-
-    glColor3f(0.95, 0.85, 0.0)
-    stripe_inner_radius = tire_radius * 0.88
-    stripe_outer_radius = tire_radius * 0.96
-    
-    for z_side in [-1, 1]:
-        z_pos = z_side * tire_width * 0.48
-        glBegin(GL_QUAD_STRIP)
-        for i in range(num_segments + 1):
-            angle = (2 * math.pi * i) / num_segments
-            x_outer = stripe_outer_radius * math.cos(angle)
-            y_outer = stripe_outer_radius * math.sin(angle)
-            x_inner = stripe_inner_radius * math.cos(angle)
-            y_inner = stripe_inner_radius * math.sin(angle)
-            glNormal3f(0, 0, z_side)
-            glVertex3f(x_outer, y_outer, z_pos)
-            glVertex3f(x_inner, y_inner, z_pos)
-        glEnd()
-
-    glColor3f(0.95, 0.95, 0.95)
-    for z_side in [-1, 1]:
-        for i in range(8):
-            angle = (math.pi * 0.25) + (i * math.pi * 0.1)
-            glPushMatrix()
-            glRotatef(math.degrees(angle), 0, 0, 1)
-            glTranslatef(tire_radius * 0.75, 0, z_side * tire_width * 0.49)
-            glScalef(0.025, 0.008, 0.005)
-            draw_solid_cube(1)
-            glPopMatrix()
 
-    cover_radius = rim_radius * 0.98
-    
-    for z_side in [-1, 1]:
-        z_offset = z_side * tire_width * 0.35
-        
-        glColor3f(0.25, 0.25, 0.28)
-        glPushMatrix()
-        glTranslatef(0, 0, z_offset)
-        quadric = gluNewQuadric()
-        gluDisk(quadric, 0.03, cover_radius, 32, 3)
-        gluDeleteQuadric(quadric)
-        glPopMatrix()
-        
-        glColor3f(0.08, 0.08, 0.08)
-        glPushMatrix()
-        glTranslatef(0, 0, z_offset * 1.01)
-        quadric = gluNewQuadric()
-        gluDisk(quadric, cover_radius * 0.7, cover_radius * 0.85, 32, 1)
-        gluDeleteQuadric(quadric)
-        glPopMatrix()
-        
-        glColor3f(0.12, 0.12, 0.12)
-        for i in range(5):
-            vent_angle = (360 / 5) * i + 36
-            glPushMatrix()
-            glRotatef(vent_angle, 0, 0, 1)
-            glTranslatef(cover_radius * 0.55, 0, z_offset * 1.02)
-            glScalef(0.06, 0.025, 0.008)
-            draw_solid_cube(1)
-            glPopMatrix()
+def draw_wheels_on_suspension(wheel_rotation=0, steer_angle=0):
+    for x, y, z, is_front, side in car_geometry.wheel_layout():
+        _, radius = bounding_sphere(('wheel', is_front), lambda: mesh_source.wheel_mesh(is_front))
+        if not sphere_in_view((x, y, z), radius):
+            continue
+        draw_wheel(x, y, z, wheel_rotation, is_front=is_front, steer_angle=steer_angle if is_front else 0,
+                   side=side, lod=wheel_lod(x, y, z, is_front, side))
 
-    glColor3f(0.7, 0.7, 0.75)
-    for z_side in [-1, 1]:
-        glPushMatrix()
-        glTranslatef(0, 0, z_side * tire_width * 0.38)
-        quadric = gluNewQuadric()
-        gluDisk(quadric, 0, 0.035, 6, 1)
-        gluDeleteQuadric(quadric)
-        glColor3f(0.5, 0.5, 0.55)
-        glTranslatef(0, 0, z_side * 0.005)
-        quadric = gluNewQuadric()
-        gluDisk(quadric, 0, 0.02, 6, 1)
-        gluDeleteQuadric(quadric)
-        glPopMatrix()
 
-    glColor3f(0.1, 0.1, 0.1)
-    for z_side in [-1, 1]:
-        glPushMatrix()
-        glTranslatef(0, 0, z_side * tire_width * 0.35)
-        quadric = gluNewQuadric()
-        gluCylinder(quadric, rim_radius, rim_radius * 1.02, tire_width * 0.15 * abs(z_side), 32, 1)
-        gluDeleteQuadric(quadric)
-        glPopMatrix()
+# NÍVEIS DE DETALHE
+# O chassi (com halo e asas) usa um nível para o carro inteiro, pelo tamanho
+# na tela da esfera que o envolve; cada roda escolhe o seu. Ver lod.py.
+lod_selector = lod.LodSelector()
+bounding_spheres = {}
 
-    glPopMatrix()
+# Esfera (centro, raio) de um componente, calculada uma vez a partir da malha
+def bounding_sphere(name, generator):
+    if name not in bounding_spheres:
+        sphere = car_asset.bounding_sphere(name) if car_asset is not None else None
+        bounding_spheres[name] = sphere or generator().bounding_sphere()
+    return bounding_spheres[name]
 
+def chassis_lod():
+    center, radius = bounding_sphere('chassis', mesh_source.static_chassis_mesh)
+    return lod_selector.level('chassis', 'chassis', center, radius)
 
-def draw_wheels_on_suspension(wheel_rotation=0, steer_angle=0):
-    front_x = 1.9
-    front_y = -0.08
-    front_z = 0.70
+def wheel_lod(x, y, z, is_front, side):
+    _, radius = bounding_sphere(('wheel', is_front), lambda: mesh_source.wheel_mesh(is_front))
+    return lod_selector.level(('wheel', is_front, side), 'wheel', (x, y, z), radius)
+
+def toggle_lod():
+    lod_selector.enabled = not lod_selector.enabled
+    lod_selector.reset()
+
+# CULLING POR FRUSTUM
+# O frustum é recalculado em render_frame com os mesmos parâmetros de
+# gluPerspective/gluLookAt. Malhas compiladas guardam caixas por componente
+# (partes do chassi, trechos da pista) e só os intervalos visíveis são
+# desenhados; rodas e flap do DRS são testados pela esfera que os envolve.
+culling_enabled = True
+view_frustum = None
+# Caixas por componente de cada malha compilada: ('chassis', nível), 'dashes', ...
+component_bounds = {}
+
+def visible_ranges(key):
+    bounds = component_bounds.get(key)
+    if not culling_enabled or view_frustum is None or bounds is None:
+        return None
+    return bounds.visible_ranges(view_frustum)
+
+def sphere_in_view(center, radius):
+    if not culling_enabled or view_frustum is None:
+        return True
+    return culling.sphere_visible(view_frustum, center, radius)
+
+def toggle_culling():
+    global culling_enabled
     
-    rear_x = -1.5
-    rear_y = -0.05
-    rear_z = 0.65
+    culling_enabled = not culling_enabled
+
+# GEOMETRIA COMPILADA
+# As partes fixas do carro são juntadas em uma única malha e enviadas uma
+# vez para a GPU (VBO, ou display list em contextos antigos). A cada quadro
+# basta um draw call para o chassi, um para o flap do DRS e um por roda.
+# Cada nível de detalhe tem seus próprios buffers, todos criados no início.
+compiled_geometry = True
+static_chassis_buffers = {}
+drs_flap_buffers = {}
+# Uma malha por variante de roda (dianteira/traseira, direita/esquerda) e
+# nível; cada uma das 4 rodas só envia sua matriz de transformação
+wheel_buffers = {}
+
+# Com --asset as malhas vêm de um GLB exportado (glb_loader.py), mapeado em
+# memória e enviado direto para a GPU, sem gerar geometria; o que faltar no
+# arquivo é gerado normalmente
+car_asset = None
+
+def load_car_asset(path):
+    global car_asset
     
-    draw_wheel(front_x, front_y, front_z, wheel_rotation, is_front=True, steer_angle=steer_angle, side=1)
-    draw_wheel(front_x, front_y, -front_z, wheel_rotation, is_front=True, steer_angle=steer_angle, side=-1)
+    car_asset = glb_loader.load_car(path)
+    bounding_spheres.clear()
+
+# Malhas do carro geradas na hora (car_geometry) ou passando pelo cache em
+# disco (mesh_cache.MeshCache, com as mesmas funções)
+mesh_source = car_geometry
+
+def enable_mesh_cache(directory=None):
+    global mesh_source
     
-    draw_wheel(rear_x, rear_y, rear_z, wheel_rotation, is_front=False, steer_angle=0, side=1)
-    draw_wheel(rear_x, rear_y, -rear_z, wheel_rotation, is_front=False, steer_angle=0, side=-1)
+    mesh_source = mesh_cache.MeshCache(directory)
 
+def car_mesh(key, generator, *args):
+    mesh = car_asset.mesh(key) if car_asset is not None else None
+    return mesh if mesh is not None else generator(*args)
 
-# FUNÇÃO PRINCIPAL
-def draw_chassis(wheel_rotation=0, steer_angle=0, drs_open=0, rear_wing_vibration=0):
+# No perfil core não há vertex arrays do lado do cliente: só buffers compilados
+def use_compiled_geometry():
+    return compiled_geometry or core_renderer is not None
+
+def new_buffer(mesh):
+    return gl_core.CoreMesh(mesh) if core_renderer is not None else MeshBuffer(mesh)
+
+def draw_static_chassis(lod=0):
     draw_monocoque()
     draw_engine_cover()
     draw_nose()
     draw_sidepods()
     draw_cockpit()
-    draw_halo()
+    draw_halo(lod)
     draw_floor()
     draw_diffuser()
     draw_airbox()
-    draw_front_wing()
-    draw_rear_wing(drs_open)
+    draw_front_wing(lod)
+    draw_rear_wing_structure(lod)
     draw_suspension()
-    draw_wheels_on_suspension(wheel_rotation, steer_angle)
     draw_turquoise_accents()
     draw_mirrors()
 
+def compile_static_chassis():
+    release_static_chassis()
+    for level in range(lod.LEVELS):
+        mesh = car_mesh(('chassis', level), mesh_source.static_chassis_mesh, level)
+        static_chassis_buffers[level] = new_buffer(mesh)
+        component_bounds[('chassis', level)] = culling.ComponentBounds(mesh)
+        drs_flap_buffers[level] = new_buffer(car_mesh(('drs_flap', level), mesh_source.lod_drs_flap_mesh, level))
+
+def release_static_chassis():
+    for buffer in list(static_chassis_buffers.values()) + list(drs_flap_buffers.values()):
+        buffer.release()
+    static_chassis_buffers.clear()
+    drs_flap_buffers.clear()
+    for level in range(lod.LEVELS):
+        component_bounds.pop(('chassis', level), None)
+
+def compile_wheels():
+    release_wheels()
+    for level in range(lod.LEVELS):
+        for is_front in (True, False):
+            for side in (1, -1):
+                wheel_buffers[(is_front, side, level)] = new_buffer(
+                    car_mesh(('wheel', is_front, side, level), mesh_source.lod_wheel_mesh, is_front, side, level))
+
+def release_wheels():
+    for buffer in wheel_buffers.values():
+        buffer.release()
+    wheel_buffers.clear()
+
+def compile_car_geometry():
+    compile_static_chassis()
+    compile_wheels()
+
+def release_car_geometry():
+    release_static_chassis()
+    release_wheels()
+
+def toggle_compiled_geometry():
+    global compiled_geometry
+    
+    compiled_geometry = not compiled_geometry
+
+# FUNÇÃO PRINCIPAL
+def draw_chassis(wheel_rotation=0, steer_angle=0, drs_open=0, rear_wing_vibration=0):
+    level = chassis_lod()
+    buffer = static_chassis_buffers.get(level) if use_compiled_geometry() else None
+    if buffer is not None:
+        buffer.draw(visible_ranges(('chassis', level)))
+    else:
+        draw_static_chassis(level)
+    draw_drs_flap(drs_open, level)
+    draw_wheels_on_suspension(wheel_rotation, steer_angle)
+
 def draw_chassis_standalone():
     draw_chassis()
 
+# GRID DE CARROS
+# Com --cars N (ou a tecla G) o carro único dá lugar a um grid de N carros
+# (grid.py). Culling e LOD são feitos para todos os carros de uma vez, com
+# arrays NumPy. No caminho core os carros visíveis são ordenados por nível
+# de detalhe e cada componente vira um draw instanciado por nível; no
+# pipeline fixo cada carro é desenhado com sua própria matriz.
+car_grid = None
+grid_state = None
+
+def enable_grid(count=grid.GRID_SIZE):
+    global car_grid, grid_state
+    
+    disable_grid()
+    car_grid = grid.CarGrid(count)
+    grid_state = car_grid.current
+    if sim_client is not None:
+        sim_client.set_grid(count)
+    else:
+        car_simulation.step_callbacks.append(car_grid.step)
+
+def disable_grid():
+    global car_grid, grid_state
+    
+    if car_grid is not None:
+        if sim_client is not None:
+            sim_client.set_grid(0)
+        else:
+            car_simulation.step_callbacks.remove(car_grid.step)
+    car_grid = grid_state = None
+    lod_selector.reset()
+
+def toggle_grid():
+    if car_grid is None:
+        enable_grid()
+    else:
+        disable_grid()
+
+# Índices dos carros visíveis e nível de detalhe de chassi e rodas de cada um
+def grid_visibility(positions):
+    chassis_center, chassis_radius = bounding_sphere('chassis', mesh_source.static_chassis_mesh)
+    centers = positions + chassis_center
+    if culling_enabled and view_frustum is not None:
+        cars = np.flatnonzero(culling.spheres_visible(view_frustum, centers, chassis_radius))
+    else:
+        cars = np.arange(len(positions))
+    
+    _, wheel_radius = bounding_sphere(('wheel', True), lambda: mesh_source.wheel_mesh(True))
+    chassis_levels = lod_selector.levels_many('grid_chassis', 'chassis', centers, chassis_radius)
+    wheel_levels = lod_selector.levels_many('grid_wheels', 'wheel', centers, wheel_radius)
+    return cars, chassis_levels[cars], wheel_levels[cars]
+
+def draw_grid():
+    state = grid_state
+    cars, chassis_levels, wheel_levels = grid_visibility(state['position'])
+    if core_renderer is not None:
+        draw_grid_instanced(state, cars, chassis_levels, wheel_levels)
+        return
+    
+    for car, level, wheel_level in zip(cars, chassis_levels, wheel_levels):
+        glPushMatrix()
+        glTranslatef(*state['position'][car])
+        buffer = static_chassis_buffers.get(level) if use_compiled_geometry() else None
+        if buffer is not None:
+            buffer.draw()
+        else:
+            draw_static_chassis(level)
+        draw_drs_flap(state['drs_open'][car], level, cull=False)
+        for x, y, z, is_front, side in car_geometry.wheel_layout():
+            draw_wheel(x, y, z, state['wheel_rotation'][car], is_front, state['steer_angle'][car], side, wheel_level)
+        glPopMatrix()
+
+# Sequências (nível, primeira instância, quantidade) de um array de níveis ordenado
+def level_runs(levels, start=0):
+    values, firsts, counts = np.unique(levels, return_index=True, return_counts=True)
+    return [(int(level), start + int(first), int(count)) for level, first, count in zip(values, firsts, counts)]
+
+# Um bloco de instâncias ordenado pelo nível do chassi e outro pelo nível das
+# rodas, enviados juntos; cada draw lê só o seu trecho do buffer
+def draw_grid_instanced(state, cars, chassis_levels, wheel_levels):
+    count = len(cars)
+    if count == 0:
+        return
+    
+    chassis_order = np.argsort(chassis_levels, kind='stable')
+    wheel_order = np.argsort(wheel_levels, kind='stable')
+    instances = np.empty(2 * count, dtype=gl_core.INSTANCE_DTYPE)
+    for block, order in ((instances[:count], cars[chassis_order]), (instances[count:], cars[wheel_order])):
+        block['offset'] = state['position'][order]
+        block['motion'][:, 0] = state['wheel_rotation'][order]
+        block['motion'][:, 1] = state['steer_angle'][order]
+        block['motion'][:, 2] = state['drs_open'][order] * car_geometry.DRS_MAX_ANGLE
+    core_renderer.instances.upload(instances)
+    
+    core_renderer.set_instanced(True)
+    for level, first, level_count in level_runs(chassis_levels[chassis_order]):
+        core_renderer.set_static()
+        static_chassis_buffers[level].draw_instanced(core_renderer.instances, first, level_count)
+        core_renderer.set_flap_origin(car_geometry.DRS_PIVOT)
+        drs_flap_buffers[level].draw_instanced(core_renderer.instances, first, level_count)
+    for level, first, level_count in level_runs(wheel_levels[wheel_order], count):
+        for x, y, z, is_front, side in car_geometry.wheel_layout():
+            core_renderer.set_wheel_origin((x, y, z), steers=is_front)
+            wheel_buffers[(is_front, side, level)].draw_instanced(core_renderer.instances, first, level_count)
+    core_renderer.set_static()
+    core_renderer.set_instanced(False)
+
 # PISTA DE CORRIDA
-def draw_track(track_offset=0):
-    track_length = 80.0
-    track_width = 8.0
-    track_y = -0.56
-    
-    glColor3f(0.15, 0.15, 0.17)
-    glBegin(GL_QUADS)
-    glNormal3f(0, 1, 0)
-    glVertex3f(-track_length/2, track_y, -track_width/2)
-    glVertex3f(-track_length/2, track_y, track_width/2)
-    glVertex3f(track_length/2, track_y, track_width/2)
-    glVertex3f(track_length/2, track_y, -track_width/2)
-    glEnd()
-    
-    glColor3f(0.95, 0.95, 0.95)
-    line_width = 0.15
-    
-    for side in [-1, 1]:
-        z_pos = side * (track_width/2 - line_width/2)
-        glBegin(GL_QUADS)
-        glNormal3f(0, 1, 0)
-        glVertex3f(-track_length/2, track_y + 0.01, z_pos - line_width/2)
-        glVertex3f(-track_length/2, track_y + 0.01, z_pos + line_width/2)
-        glVertex3f(track_length/2, track_y + 0.01, z_pos + line_width/2)
-        glVertex3f(track_length/2, track_y + 0.01, z_pos - line_width/2)
-        glEnd()
-    
-    glColor3f(0.9, 0.9, 0.9)
-    dash_length = 2.0
-    dash_gap = 2.0
-    dash_width = 0.12
-    
-    x = -track_length/2 + (track_offset % (dash_length + dash_gap))
-    while x < track_length/2:
-        if x + dash_length > -track_length/2:
-            glBegin(GL_QUADS)
-            glNormal3f(0, 1, 0)
-            glVertex3f(x, track_y + 0.01, -dash_width/2)
-            glVertex3f(x, track_y + 0.01, dash_width/2)
-            glVertex3f(min(x + dash_length, track_length/2), track_y + 0.01, dash_width/2)
-            glVertex3f(min(x + dash_length, track_length/2), track_y + 0.01, -dash_width/2)
-            glEnd()
-        x += dash_length + dash_gap
-    
-    kerb_width = 0.4
-    kerb_segment_length = 1.5
-    
-    for side in [-1, 1]:
-        z_base = side * (track_width/2 + kerb_width/2)
-        x = -track_length/2 + (track_offset % (kerb_segment_length * 2))
-        color_index = int((track_offset / kerb_segment_length)) % 2
-        
-        while x < track_length/2:
-            if color_index % 2 == 0:
-                glColor3f(0.9, 0.1, 0.1)
-            else:
-                glColor3f(0.95, 0.95, 0.95)
-            
-            end_x = min(x + kerb_segment_length, track_length/2)
-            
-            glBegin(GL_QUADS)
-            glNormal3f(0, 1, 0)
-            glVertex3f(x, track_y + 0.02, z_base - kerb_width/2)
-            glVertex3f(x, track_y + 0.02, z_base + kerb_width/2)
-            glVertex3f(end_x, track_y + 0.02, z_base + kerb_width/2)
-            glVertex3f(end_x, track_y + 0.02, z_base - kerb_width/2)
-            glEnd()
-            
-            x += kerb_segment_length
-            color_index += 1
-    
-    glColor3f(0.15, 0.45, 0.15)
-    grass_width = 15.0
-    
-    for side in [-1, 1]:
-        z_base = side * (track_width/2 + kerb_width + grass_width/2)
-        glBegin(GL_QUADS)
-        glNormal3f(0, 1, 0)
-        glVertex3f(-track_length/2, track_y - 0.01, z_base - grass_width/2)
-        glVertex3f(-track_length/2, track_y - 0.01, z_base + grass_width/2)
-        glVertex3f(track_length/2, track_y - 0.01, z_base + grass_width/2)
-        glVertex3f(track_length/2, track_y - 0.01, z_base - grass_width/2)
-        glEnd()
-    
-    glColor3f(0.95, 0.95, 0.95)
-    start_x = -25.0
-    start_width = 0.5
-    
-    glBegin(GL_QUADS)
-    glNormal3f(0, 1, 0)
-    glVertex3f(start_x, track_y + 0.02, -track_width/2 + line_width)
-    glVertex3f(start_x, track_y + 0.02, track_width/2 - line_width)
-    glVertex3f(start_x + start_width, track_y + 0.02, track_width/2 - line_width)
-    glVertex3f(start_x + start_width, track_y + 0.02, -track_width/2 + line_width)
-    glEnd()
-    
-    finish_x = 25.0
-    checker_size = 0.3
-    num_checkers_z = int((track_width - 2*line_width) / checker_size)
-    num_checkers_x = 3
-    
-    for i in range(num_checkers_x):
-        for j in range(num_checkers_z):
-            if (i + j) % 2 == 0:
-                glColor3f(0.1, 0.1, 0.1)
+# Três malhas fixas (superfície, tracejado central e zebras). O tracejado e
+# as zebras são quads texturizados; na reta o movimento vem da matriz de
+# textura. Com --circuit os trechos do circuito (circuit.py) entram e saem
+# da GPU conforme o carro anda (track_streaming.py), e o movimento vem da
+# matriz de modelo que leva o ponto da pista na distância percorrida até o
+# carro.
+track_buffers = {}
+track_textures = {}
+race_circuit = None
+track_streamer = None
+# Bytes de trechos do circuito mantidos na GPU (--track-budget)
+track_budget = track_streaming.DEFAULT_BUDGET
+# Trechos do circuito desenhados no quadro atual
+circuit_chunks = []
+
+def load_circuit(path=None):
+    global race_circuit
+    
+    race_circuit = circuit.open_circuit(path)
+    car_simulation.track_period = race_circuit.length
+    if track_textures:
+        compile_track()
+
+def compile_track():
+    global track_streamer
+    
+    release_track()
+    if race_circuit is not None:
+        track_streamer = track_streaming.ChunkStreamer(race_circuit, new_buffer, track_budget)
+    else:
+        for name, generator in [('surface', track.track_surface_mesh), ('dashes', track.track_dashes_mesh),
+                                ('kerbs', track.track_kerbs_mesh)]:
+            mesh = generator()
+            track_buffers[name] = new_buffer(mesh)
+            component_bounds[name] = culling.ComponentBounds(mesh)
+    track_textures['dashes'] = create_texture(track.dash_texture_pixels())
+    track_textures['kerbs'] = create_texture(track.kerb_texture_pixels())
+
+def release_track():
+    global track_streamer
+    
+    if track_streamer is not None:
+        track_streamer.release()
+        track_streamer = None
+        circuit_chunks.clear()
+    for buffer in track_buffers.values():
+        buffer.release()
+    for texture in track_textures.values():
+        release_texture(texture)
+    for name in track_buffers:
+        component_bounds.pop(name, None)
+    track_buffers.clear()
+    track_textures.clear()
+
+def draw_track_part(name, generator):
+    if track_streamer is not None:
+        for chunk in circuit_chunks:
+            if use_compiled_geometry():
+                chunk.buffers[name].draw()
             else:
-                glColor3f(0.95, 0.95, 0.95)
-            
-            x1 = finish_x + i * checker_size
-            z1 = -track_width/2 + line_width + j * checker_size
-            
-            glBegin(GL_QUADS)
-            glNormal3f(0, 1, 0)
-            glVertex3f(x1, track_y + 0.02, z1)
-            glVertex3f(x1, track_y + 0.02, z1 + checker_size)
-            glVertex3f(x1 + checker_size, track_y + 0.02, z1 + checker_size)
-            glVertex3f(x1 + checker_size, track_y + 0.02, z1)
-            glEnd()
+                draw_mesh(chunk.meshes[name])
+        return
+    if use_compiled_geometry() and name in track_buffers:
+        track_buffers[name].draw(visible_ranges(name))
+    else:
+        draw_mesh(generator())
+
+def draw_scrolling_track_part(name, generator, period, track_offset):
+    if core_renderer is not None:
+        core_renderer.set_texture(track_textures[name], track.track_texture_offset(track_offset, period))
+        draw_track_part(name, generator)
+        core_renderer.set_texture(None)
+        return
+    
+    glBindTexture(GL_TEXTURE_2D, track_textures[name])
+    glMatrixMode(GL_TEXTURE)
+    glLoadIdentity()
+    glTranslatef(track.track_texture_offset(track_offset, period), 0, 0)
+    glMatrixMode(GL_MODELVIEW)
+    
+    draw_track_part(name, generator)
+    
+    glMatrixMode(GL_TEXTURE)
+    glLoadIdentity()
+    glMatrixMode(GL_MODELVIEW)
+
+def draw_track(track_offset=0):
+    if not track_textures:
+        compile_track()
+    
+    fixed_function = core_renderer is None
+    if race_circuit is not None:
+        # A distância percorrida é -track_offset; as texturas ficam paradas na pista
+        distance = -track_offset
+        matrix = race_circuit.car_frame(distance)
+        eye = transform_points(race_circuit.placement(distance), [camera_position()])[0]
+        track_streamer.update(distance, eye[[0, 2]])
+        frustum = view_frustum.transformed(matrix) if culling_enabled and view_frustum is not None else None
+        circuit_chunks[:] = track_streamer.visible(frustum)
+        track_offset = 0
+        if fixed_function:
+            glPushMatrix()
+            glMultMatrixd(matrix.T)
+        else:
+            core_renderer.set_model(matrix)
+    
+    draw_track_part('surface', track.track_surface_mesh)
+    
+    if fixed_function:
+        glEnable(GL_TEXTURE_2D)
+        glEnable(GL_ALPHA_TEST)
+        glAlphaFunc(GL_GREATER, 0.5)
+    draw_scrolling_track_part('dashes', track.track_dashes_mesh, track.DASH_PERIOD, track_offset)
+    draw_scrolling_track_part('kerbs', track.track_kerbs_mesh, track.KERB_PERIOD, track_offset)
+    if fixed_function:
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_ALPHA_TEST)
+        glDisable(GL_TEXTURE_2D)
+    
+    if race_circuit is not None:
+        if fixed_function:
+            glPopMatrix()
+        else:
+            core_renderer.set_model(identity())
 
 def draw_scene():
     global track_line_offset
     
     draw_track(track_line_offset)
     
-    draw_chassis(wheel_rotation, steer_angle, drs_open, 0)
+    if car_grid is not None:
+        draw_grid()
+    else:
+        draw_chassis(wheel_rotation, steer_angle, drs_open, 0)
 
 # CONTROLES E ANIMAÇÃO
-def update_animation(dt):
+# O estado da animação pertence à simulação em passo fixo (simulation.py);
+# as variáveis globais acima guardam só o estado interpolado que é desenhado
+car_simulation = simulation.Simulation()
+
+def apply_simulation_state(state):
     global animation_running, wheel_rotation, track_line_offset
     global drs_open, steer_angle
     
-    if not animation_running:
-        return
+    animation_running = state.running
+    wheel_rotation = state.wheel_rotation
+    track_line_offset = state.track_offset
+    drs_open = state.drs_open
+    steer_angle = state.steer_angle
+
+# Com --telemetry a simulação segue uma volta gravada (telemetry.py) em vez
+# do movimento sintético
+def load_telemetry(path):
+    car_simulation.driver = telemetry.TelemetryDriver(telemetry.open_telemetry(path), car_simulation.step_dt)
+
+# Com --live-telemetry a simulação segue o último pacote recebido por UDP
+# (live_telemetry.py); a thread de recepção nunca bloqueia o desenho
+live_receiver = None
+
+def start_live_telemetry(port=live_telemetry.DEFAULT_PORT):
+    global live_receiver
+    
+    live_receiver = live_telemetry.TelemetryReceiver(port).start()
+    car_simulation.driver = live_telemetry.LiveTelemetryDriver(live_receiver)
+
+def stop_live_telemetry():
+    global live_receiver
     
-    car_speed = 15.0
+    if live_receiver is not None:
+        live_receiver.stop()
+        car_simulation.driver = None
+        live_receiver = None
+
+# Com --sim-process a simulação roda em outro processo (sim_process.py) e o
+# estado desenhado vem da memória compartilhada, interpolado pelo relógio
+sim_client = None
+live_status = None
+
+def start_simulation_process(grid_capacity=grid.GRID_SIZE, telemetry_path=None, live_port=None):
+    global sim_client
     
-    wheel_rotation -= car_speed * 50 * dt
-    if wheel_rotation < 0:
-        wheel_rotation += 360
+    sim_client = sim_process.SimulationClient(car_simulation.rate, 0, grid_capacity, telemetry_path, live_port,
+                                              car_simulation.track_period)
+
+def stop_simulation_process():
+    global sim_client
     
-    track_line_offset -= car_speed * dt
-    if track_line_offset < -100:
-        track_line_offset += 100
+    if sim_client is not None:
+        sim_client.stop()
+        sim_client = None
+
+def read_simulation_process():
+    global grid_state, live_status
     
-    drs_open += (1.0 - drs_open) * 3.0 * dt
+    state, shared_grid_state, live_status = sim_client.read()
+    apply_simulation_state(state)
+    if car_grid is not None:
+        grid_state = shared_grid_state if shared_grid_state is not None else car_grid.current
+
+# (porta, com sinal, km/h, acelerador) da telemetria ao vivo, recebida aqui
+# ou no processo da simulação; None sem --live-telemetry
+def live_telemetry_status():
+    if sim_client is not None:
+        return live_status
+    if live_receiver is None:
+        return None
+    packet = live_receiver.latest()
+    if packet is None or live_receiver.stale():
+        return live_receiver.address[1], False, 0.0, 0.0
+    return live_receiver.address[1], True, float(packet['speed']), float(packet['throttle'])
+
+def update_animation(dt):
+    global grid_state
     
-    steer_angle = math.sin(pygame.time.get_ticks() * 0.015) * 2.0
+    if sim_client is not None:
+        read_simulation_process()
+        return
+    alpha = car_simulation.advance(dt)
+    apply_simulation_state(car_simulation.interpolated(alpha))
+    if car_grid is not None:
+        grid_state = car_grid.interpolated(alpha)
 
 def toggle_animation():
-    global animation_running, drs_open, steer_angle
+    global grid_state
+    
+    if sim_client is not None:
+        sim_client.toggle()
+        read_simulation_process()
+        return
+    car_simulation.toggle()
+    apply_simulation_state(car_simulation.current)
+    if car_grid is not None:
+        if not car_simulation.running:
+            car_grid.reset_motion()
+        grid_state = car_grid.current
+
+# Estado da animação seconds segundos depois de ligada, igual ao que o loop
+# com passo fixo chega. Avança a partir da última busca quando o tempo pedido
+# é maior e a simulação não andou por outro caminho desde então.
+seek_steps = None
+
+def seek_animation(seconds):
+    global grid_state, seek_steps
+    
+    steps = int(round(seconds * car_simulation.rate))
+    if seek_steps != car_simulation.steps or steps < seek_steps:
+        car_simulation.reset()
+        if car_grid is not None:
+            car_grid.reset()
+        car_simulation.set_running(True)
+    car_simulation.run(steps - car_simulation.steps)
+    seek_steps = car_simulation.steps
+    apply_simulation_state(car_simulation.current)
+    if car_grid is not None:
+        grid_state = car_grid.current
+
+# TEXTO DO HUD
+# Atlas de fonte rasterizado uma vez em setup_gl; cada string do HUD fica
+# em um buffer na GPU e só é refeita quando o texto muda (hud_text.py)
+hud_font = None
+hud_font_texture = None
+hud_texts = None
+
+def setup_hud():
+    global hud_font, hud_font_texture, hud_texts
     
-    animation_running = not animation_running
+    if hud_font is None:
+        hud_font = hud_text.FontAtlas()
+    hud_font_texture = create_texture(hud_font.pixels)
+    hud_texts = hud_text.TextCache(hud_font, new_buffer)
+
+def release_hud():
+    global hud_font_texture, hud_texts
     
-    if not animation_running:
-        drs_open = 0.0
-        steer_angle = 0.0
+    if hud_texts is not None:
+        hud_texts.release()
+        release_texture(hud_font_texture)
+    hud_font_texture = hud_texts = None
 
 def draw_text_opengl(x, y, text, color=(1, 1, 1)):
-    glColor3f(*color)
-    glRasterPos2f(x, y)
-    try:
-        for char in text:
-            glutBitmapCharacter(GLUT_BITMAP_HELVETICA_18, ord(char))
-    except:
-        pass
+    hud_texts.buffer(x, y, text, color).draw()
 
-def draw_hud_opengl(width, height):
-    global animation_running, drs_open
+def begin_hud(width, height):
+    if core_renderer is not None:
+        core_renderer.begin_hud(orthographic(0, width, 0, height, -1, 1), hud_font_texture)
+        return
     
     glMatrixMode(GL_PROJECTION)
     glPushMatrix()
@@ -1437,6 +757,30 @@ def draw_hud_opengl(width, height):
     
     glDisable(GL_DEPTH_TEST)
     glDisable(GL_LIGHTING)
+    glEnable(GL_TEXTURE_2D)
+    glBindTexture(GL_TEXTURE_2D, hud_font_texture)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+def end_hud():
+    if core_renderer is not None:
+        core_renderer.end_hud()
+        return
+    
+    glDisable(GL_BLEND)
+    glBindTexture(GL_TEXTURE_2D, 0)
+    glDisable(GL_TEXTURE_2D)
+    glEnable(GL_LIGHTING)
+    glEnable(GL_DEPTH_TEST)
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    glPopMatrix()
+
+def draw_hud_opengl(width, height):
+    global animation_running, drs_open
+    
+    begin_hud(width, height)
     
     if animation_running:
         status = "CORRENDO! Pressione SPACE para parar"
@@ -1454,50 +798,351 @@ def draw_hud_opengl(width, height):
         drs_color = (0, 1, 0) if drs_open > 0.5 else (1, 0.8, 0)
         draw_text_opengl(width - 180, height - 30, drs_status, drs_color)
     
-    glEnable(GL_LIGHTING)
-    glEnable(GL_DEPTH_TEST)
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
-    glPopMatrix()
-
-# FUNÇÃO PRINCIPAL
-def main():
-    global camera_angle_y, camera_angle_x, camera_distance
-    global animation_running
+    if car_grid is not None:
+        draw_text_opengl(width - 180, height - 60, "GRID: %d carros" % car_grid.count, (0.7, 0.7, 0.7))
     
-    glutInit(sys.argv)
+    if race_circuit is not None:
+        draw_text_opengl(width - 240, height - 90, "VOLTA: %.0f / %.0f m" % (
+            -track_line_offset % race_circuit.length, race_circuit.length), (0.7, 0.7, 0.7))
     
-    pygame.init()
+    live = live_telemetry_status()
+    if live is not None:
+        port, signal, speed, throttle = live
+        if not signal:
+            draw_text_opengl(20, 20, "AO VIVO: sem sinal na porta %d" % port, (1, 0.3, 0.3))
+        else:
+            draw_text_opengl(20, 20, "AO VIVO: %3.0f km/h | acelerador %3.0f%%" % (speed, throttle * 100), (0, 1, 0.4))
     
-    display = (1200, 800)
-    pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
-    pygame.display.set_caption("F1 Mercedes W16 - Animacao na Pista")
+    if instrumentation.enabled:
+        # Acima da linha da telemetria ao vivo, quando ela aparece
+        draw_instrumentation_overlay(width, height, 20 if live is None else 42)
+    
+    end_hud()
+
+# Contagem de chamadas GL do último quadro, por componente (tecla I); a
+# última linha fica em bottom
+def draw_instrumentation_overlay(width, height, bottom=20):
+    totals = instrumentation.frame_totals()
+    lines = [
+        "GL: %d draw calls | %d vertices | %d glVertex | %d matriz | %d quadricas" % (
+            totals['draw_calls'], totals['vertices'], totals['vertex'], totals['matrix'], totals['quadric']),
+    ]
+    for name, calls, vertices in instrumentation.ranked_components(8):
+        lines.append("%-28s %6d chamadas %8d vertices" % (name, calls, vertices))
+    if track_streamer is not None:
+        stats = track_streamer.stats
+        lines.append("PISTA: %d trechos na GPU (%.1f MiB), %d enviados, %d liberados, %d esperados" % (
+            len(track_streamer.resident), track_streamer.resident_bytes / 2 ** 20, stats['uploads'],
+            stats['evictions'], stats['waited']))
+    
+    y = bottom + 22 * (len(lines) - 1)
+    for line in lines:
+        draw_text_opengl(20, y, line, (1, 1, 1))
+        y -= 22
+
+# CONFIGURAÇÃO DO OPENGL
+# core=True usa o caminho de shaders (gl_core.py) em um contexto 3.3 core;
+# senão, o pipeline fixo com iluminação e pilha de matrizes do OpenGL
+core_renderer = None
+
+def setup_gl(width, height, core=False):
+    global core_renderer
+    
+    glViewport(0, 0, width, height)
+    
+    if core:
+        core_renderer = gl_core.CoreRenderer(LIGHTS)
+        core_renderer.setup(SKY_COLOR)
+    else:
+        setup_fixed_function(width, height)
     
+    compile_car_geometry()
+    compile_track()
+    setup_hud()
+
+def setup_fixed_function(width, height):
     glEnable(GL_DEPTH_TEST)
     glEnable(GL_LIGHTING)
-    glEnable(GL_LIGHT0)
-    glEnable(GL_LIGHT1)
     glEnable(GL_COLOR_MATERIAL)
     glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
     glShadeModel(GL_SMOOTH)
     
-    glLightfv(GL_LIGHT0, GL_POSITION, [5, 10, 5, 0])
-    glLightfv(GL_LIGHT0, GL_AMBIENT, [0.5, 0.5, 0.5, 1])
-    glLightfv(GL_LIGHT0, GL_DIFFUSE, [0.9, 0.9, 0.9, 1])
-    
-    glLightfv(GL_LIGHT1, GL_POSITION, [-5, 8, -5, 0])
-    glLightfv(GL_LIGHT1, GL_DIFFUSE, [0.6, 0.6, 0.6, 1])
+    for light, (position, ambient, diffuse) in zip((GL_LIGHT0, GL_LIGHT1), LIGHTS):
+        glEnable(light)
+        glLightfv(light, GL_POSITION, position)
+        glLightfv(light, GL_AMBIENT, ambient)
+        glLightfv(light, GL_DIFFUSE, diffuse)
     
-    glClearColor(0.4, 0.6, 0.9, 1)  # Céu azul
+    glClearColor(*SKY_COLOR)  # Céu azul
     
     glMatrixMode(GL_PROJECTION)
-    gluPerspective(45, display[0]/display[1], 0.1, 200)
+    glLoadIdentity()
+    gluPerspective(FIELD_OF_VIEW, width/height, NEAR_PLANE, FAR_PLANE)
     glMatrixMode(GL_MODELVIEW)
+
+def release_gl():
+    global core_renderer
+    
+    release_car_geometry()
+    release_track()
+    release_hud()
+    if core_renderer is not None:
+        core_renderer.release()
+        core_renderer = None
+
+def camera_position():
+    cam_offset_x = camera_distance * math.cos(math.radians(camera_angle_x)) * math.sin(math.radians(camera_angle_y))
+    cam_offset_y = camera_distance * math.sin(math.radians(camera_angle_x))
+    cam_offset_z = camera_distance * math.cos(math.radians(camera_angle_x)) * math.cos(math.radians(camera_angle_y))
+    return cam_offset_x, abs(cam_offset_y) + 2, cam_offset_z
+
+def render_frame(width, height, hud=True):
+    global view_frustum
+    
+    if instrumentation.enabled:
+        instrumentation.begin_frame()
+    
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    
+    eye = camera_position()
+    if core_renderer is not None:
+        core_renderer.begin_frame(perspective(FIELD_OF_VIEW, width / height, NEAR_PLANE, FAR_PLANE),
+                                  look_at(eye, (0, 0, 0), (0, 1, 0)))
+    else:
+        glLoadIdentity()
+        gluLookAt(
+            *eye,
+            0, 0, 0,
+            0, 1, 0
+        )
+    lod_selector.set_view(eye, height, FIELD_OF_VIEW)
+    view_frustum = culling.Frustum.from_camera(eye, (0, 0, 0), (0, 1, 0), FIELD_OF_VIEW, width / height,
+                                               NEAR_PLANE, FAR_PLANE)
+    
+    draw_scene()
+    if hud:
+        draw_hud_opengl(width, height)
+    if core_renderer is not None:
+        core_renderer.end_frame()
+    if frame_capture is not None:
+        frame_capture.capture()
+    
+    if instrumentation.enabled:
+        instrumentation.end_frame()
+
+# GRAVAÇÃO
+# Com --record (ou a tecla R) cada quadro desenhado é lido por PBOs e
+# codificado em segundo plano (capture.py): .y4m grava vídeo, outro caminho
+# vira uma pasta de PNGs
+frame_capture = None
+
+def start_recording(path, width, height):
+    global frame_capture
+    
+    stop_recording()
+    frame_capture = capture.FrameCapture(width, height, capture.open_writer(path, width, height))
+
+def stop_recording():
+    global frame_capture
+    
+    if frame_capture is not None:
+        frame_capture.finish()
+        print("%d quadros gravados" % frame_capture.frames)
+        frame_capture = None
+
+def toggle_recording(path, width, height):
+    if frame_capture is None:
+        start_recording(path, width, height)
+    else:
+        stop_recording()
+
+def toggle_instrumentation():
+    instrumentation.toggle(sys.modules[__name__], (gl_backend, gl_core))
+
+# GRAVAÇÃO DA SESSÃO
+# Com --record-session o loop da janela grava dt, câmera e teclas de cada
+# volta em um arquivo binário (replay.py), que reproduz a sessão depois
+session_recorder = None
+
+def start_session_recording(path, size):
+    global session_recorder
+    
+    capacity = max(grid.GRID_SIZE, car_grid.count if car_grid is not None else 0)
+    session_recorder = replay.SessionRecorder(path, sys.modules[__name__], size, grid_capacity=capacity)
+
+def stop_session_recording():
+    global session_recorder
+    
+    if session_recorder is not None:
+        session_recorder.close()
+        print("%d quadros da sessao gravados" % session_recorder.frames)
+        session_recorder = None
+
+# Teclas que mudam a cena passam por aqui para entrar na gravação da sessão
+def apply_toggle(name):
+    globals()['toggle_' + name]()
+    if session_recorder is not None:
+        session_recorder.event(name)
+
+# DESENHO SOB DEMANDA
+# A janela só é redesenhada quando algo visível mudou: câmera, estado da
+# animação, opções ligadas por tecla ou um evento da própria janela
+# (exposta, restaurada, redimensionada). Com a animação parada e a câmera
+# quieta o loop dorme em pygame.event.wait() em vez de desenhar a 60 fps.
+REDRAW_EVENTS = (
+    pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED,
+    pygame.WINDOWMAXIMIZED, pygame.WINDOWSIZECHANGED,
+)
+CAMERA_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+# Parado com telemetria ao vivo, a espera por eventos acorda nesse intervalo
+# (ms) para o HUD acompanhar o sinal da porta
+LIVE_POLL_MS = 100
+
+# Tudo o que muda a imagem desenhada; quadro igual ao anterior não é redesenhado
+def view_state():
+    return (
+        camera_angle_x, camera_angle_y, camera_distance,
+        animation_running, wheel_rotation, steer_angle, drs_open, track_line_offset,
+        compiled_geometry, lod_selector.enabled, culling_enabled,
+        car_grid.count if car_grid is not None else 0,
+        instrumentation.enabled, frame_capture is not None,
+        live_telemetry_status(),
+    )
+
+# Animação rodando, câmera girando pelas setas ou gravação: um quadro a cada tick
+def needs_continuous_redraw(keys):
+    return animation_running or frame_capture is not None or any(keys[key] for key in CAMERA_KEYS)
+
+# MODO SEM JANELA
+# Renderiza quadros em um contexto fora da tela (EGL/OSMesa) com passo de
+# tempo fixo. render_headless_frames devolve cada quadro lido de forma
+# síncrona; run_headless grava em disco pela captura assíncrona.
+def render_headless_frames(context, frames, dt=1.0 / 60):
+    if not animation_running:
+        toggle_animation()
+    
+    for _ in range(frames):
+        update_animation(dt)
+        render_frame(context.width, context.height)
+        yield context.read_pixels()
+
+# output: pasta de PNGs ou arquivo .y4m, gravados pela mesma captura
+# assíncrona da janela
+def run_headless(frames, size, output=None, backend='egl', core=False, cars=0, dt=1.0 / 60):
+    width, height = size
+    context = headless.HeadlessContext(width, height, backend, 'core' if core else 'compatibility')
+    setup_gl(width, height, core)
+    if cars:
+        enable_grid(cars)
+    
+    if output:
+        start_recording(output, width, height)
+    if not animation_running:
+        toggle_animation()
+    for _ in range(frames):
+        update_animation(dt)
+        render_frame(width, height)
+    stop_recording()
+    
+    release_gl()
+    context.release()
+    print("%d quadros %dx%d renderizados (%s%s)" % (frames, width, height, backend, ', core' if core else ''))
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="F1 Mercedes W16 - Animacao na Pista")
+    parser.add_argument("--headless", action="store_true",
+                        help="renderiza sem janela (EGL surfaceless ou OSMesa)")
+    parser.add_argument("--osmesa", action="store_true",
+                        help="usa OSMesa em vez de EGL no modo --headless")
+    parser.add_argument("--core", action="store_true",
+                        help="usa o caminho de shaders em um contexto OpenGL 3.3 core")
+    parser.add_argument("--asset",
+                        help="carrega as malhas do carro de um .glb gerado por gltf_export.py")
+    parser.add_argument("--geometry-cache", default=None,
+                        help="diretorio do cache de malhas (padrao: %s)" % mesh_cache.default_directory())
+    parser.add_argument("--no-geometry-cache", action="store_true",
+                        help="gera toda a geometria, sem ler nem gravar o cache")
+    parser.add_argument("--cars", type=int, default=0,
+                        help="desenha um grid com N carros em vez de um só (0 = carro unico)")
+    parser.add_argument("--live-telemetry", type=int, nargs='?', const=live_telemetry.DEFAULT_PORT,
+                        metavar="PORTA", help="segue a telemetria recebida por UDP (padrao: porta %d)"
+                        % live_telemetry.DEFAULT_PORT)
+    parser.add_argument("--telemetry",
+                        help="velocidade, direcao e DRS de uma volta gravada (.f1tel ou .csv, ver telemetry.py)")
+    parser.add_argument("--circuit", nargs='?', const='', metavar="CSV",
+                        help="corre em um circuito (linha central em CSV, ver circuit.py); sem CSV, o tracado embutido")
+    parser.add_argument("--track-budget", type=float, default=track_streaming.DEFAULT_BUDGET / 2 ** 20,
+                        metavar="MIB", help="memoria de GPU para os trechos do circuito (padrao: %(default).0f MiB)")
+    parser.add_argument("--frames", type=int, default=120,
+                        help="quantidade de quadros no modo --headless")
+    parser.add_argument("--size", type=headless.parse_size, default=(1200, 800),
+                        help="resolucao LARGURAxALTURA (ex.: 1920x1080)")
+    parser.add_argument("--output", default="frames",
+                        help="pasta dos PNGs ou arquivo .y4m no modo --headless ('' para nao gravar)")
+    parser.add_argument("--record",
+                        help="grava a janela desde o inicio (pasta de PNGs ou arquivo .y4m); R liga/desliga")
+    parser.add_argument("--record-session",
+                        help="grava entradas e estado da sessao em um arquivo para replay.py")
+    parser.add_argument("--sim-process", action="store_true",
+                        help="roda a simulacao (e a telemetria) em outro processo, lida por memoria compartilhada")
+    args = parser.parse_args(argv)
+    if args.sim_process and args.record_session:
+        parser.error("--record-session precisa da simulacao neste processo (sem --sim-process)")
+    if args.live_telemetry and args.record_session:
+        # Os pacotes UDP não vão para o arquivo: o replay não teria as mesmas entradas
+        parser.error("--record-session nao grava a telemetria ao vivo (sem --live-telemetry)")
+    return args
+
+# FUNÇÃO PRINCIPAL
+def main():
+    global camera_angle_y, camera_angle_x, camera_distance
+    global animation_running, track_budget
+    
+    args = parse_args(sys.argv[1:])
+    if not args.no_geometry_cache:
+        enable_mesh_cache(args.geometry_cache)
+    if args.asset:
+        load_car_asset(args.asset)
+    if args.circuit is not None:
+        track_budget = int(args.track_budget * 2 ** 20)
+        load_circuit(args.circuit or None)
+    if args.sim_process:
+        start_simulation_process(max(args.cars, grid.GRID_SIZE), args.telemetry, args.live_telemetry)
+    else:
+        if args.telemetry:
+            load_telemetry(args.telemetry)
+        if args.live_telemetry:
+            start_live_telemetry(args.live_telemetry)
+    if args.headless:
+        run_headless(args.frames, args.size, args.output, 'osmesa' if args.osmesa else 'egl', args.core,
+                     args.cars)
+        stop_live_telemetry()
+        stop_simulation_process()
+        return
+    
+    pygame.init()
+    
+    display = args.size
+    if args.core:
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
+    pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
+    pygame.display.set_caption("F1 Mercedes W16 - Animacao na Pista")
+    
+    setup_gl(display[0], display[1], args.core)
+    if args.cars:
+        enable_grid(args.cars)
+    record_path = args.record or "recording.y4m"
+    if args.record:
+        start_recording(record_path, display[0], display[1])
+    if args.record_session:
+        start_session_recording(args.record_session, display)
     
     mouse_dragging = False
     last_mouse_pos = (0, 0)
     clock = pygame.time.Clock()
+    drawn_state = None
     
     print("\n" + "="*50)
     print("  F1 Mercedes W16 - Simulacao de Corrida")
@@ -1505,22 +1150,57 @@ def main():
     print("  SPACE - Iniciar/Parar animacao")
     print("  Setas/Mouse - Rotacionar camera")
     print("  +/- ou Scroll - Zoom")
+    print("  C - Alternar geometria compilada")
+    print("  I - Contagem de chamadas GL por componente")
+    print("  L - Liga/desliga niveis de detalhe (LOD)")
+    print("  F - Liga/desliga culling por frustum")
+    print("  G - Alterna entre carro unico e grid de carros")
+    print("  R - Inicia/para a gravacao (%s)" % record_path)
     print("  ESC - Sair")
     print("="*50 + "\n")
     
     running = True
     while running:
-        dt = clock.tick(60) / 1000.0
+        # Arrastando o mouse também fica no ritmo do tick, e não de cada evento de movimento
+        if drawn_state is None or mouse_dragging or needs_continuous_redraw(pygame.key.get_pressed()):
+            dt = clock.tick(60) / 1000.0
+            events = pygame.event.get()
+        else:
+            # Parado: espera o próximo evento; o tempo dormindo não conta como dt
+            if live_telemetry_status() is not None:
+                events = [pygame.event.wait(LIVE_POLL_MS)] + pygame.event.get()
+            else:
+                events = [pygame.event.wait()] + pygame.event.get()
+            clock.tick()
+            dt = 0.0
+        redraw = False
+        if session_recorder is not None:
+            session_recorder.begin_frame()
         
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
             
+            elif event.type in REDRAW_EVENTS:
+                redraw = True
+            
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 elif event.key == pygame.K_SPACE:
-                    toggle_animation()
+                    apply_toggle('animation')
+                elif event.key == pygame.K_c:
+                    apply_toggle('compiled_geometry')
+                elif event.key == pygame.K_i:
+                    apply_toggle('instrumentation')
+                elif event.key == pygame.K_l:
+                    apply_toggle('lod')
+                elif event.key == pygame.K_f:
+                    apply_toggle('culling')
+                elif event.key == pygame.K_g:
+                    apply_toggle('grid')
+                elif event.key == pygame.K_r:
+                    toggle_recording(record_path, display[0], display[1])
                 elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS or event.key == pygame.K_KP_PLUS:
                     camera_distance = max(3, camera_distance - 1)
                 elif event.key == pygame.K_MINUS or event.key == pygame.K_KP_MINUS:
@@ -1561,23 +1241,22 @@ def main():
         
         update_animation(dt)
         
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
-        
-        cam_offset_x = camera_distance * math.cos(math.radians(camera_angle_x)) * math.sin(math.radians(camera_angle_y))
-        cam_offset_y = camera_distance * math.sin(math.radians(camera_angle_x))
-        cam_offset_z = camera_distance * math.cos(math.radians(camera_angle_x)) * math.cos(math.radians(camera_angle_y))
-        
-        gluLookAt(
-            cam_offset_x, abs(cam_offset_y) + 2, cam_offset_z,
-            0, 0, 0,
-            0, 1, 0
-        )
-        
-        draw_scene()
-        draw_hud_opengl(display[0], display[1])
-        pygame.display.flip()
-        
+        state = view_state()
+        # Gravando, todo tick vira quadro: o vídeo tem taxa fixa (F60:1 no .y4m)
+        # e não pode encurtar enquanto a imagem está parada
+        drawn = redraw or frame_capture is not None or state != drawn_state
+        if drawn:
+            render_frame(display[0], display[1])
+            pygame.display.flip()
+            drawn_state = state
+        if session_recorder is not None:
+            session_recorder.end_frame(dt, drawn)
+    
+    stop_recording()
+    stop_session_recording()
+    stop_live_telemetry()
+    stop_simulation_process()
+    release_gl()
     pygame.quit()
     sys.exit()
 
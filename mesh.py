@@ -0,0 +1,321 @@
+import math
+
+import numpy as np
+
+# REPRESENTAÇÃO INTERMEDIÁRIA DE MALHAS
+# Cada vértice guarda posição, normal, cor e coordenada de textura em um
+# único array estruturado, e os índices descrevem triângulos (GL_TRIANGLES).
+# Nada aqui depende de um contexto OpenGL.
+VERTEX_DTYPE = np.dtype([
+    ('position', np.float32, 3),
+    ('normal', np.float32, 3),
+    ('color', np.float32, 3),
+    ('uv', np.float32, 2),
+])
+
+INDEX_DTYPE = np.uint32
+
+
+class Mesh:
+    def __init__(self, vertices, indices, name='', metadata=None):
+        self.vertices = vertices
+        self.indices = indices
+        self.name = name
+        self.metadata = metadata if metadata is not None else {}
+
+    @property
+    def positions(self):
+        return self.vertices['position']
+
+    @property
+    def normals(self):
+        return self.vertices['normal']
+
+    @property
+    def colors(self):
+        return self.vertices['color']
+
+    @property
+    def uvs(self):
+        return self.vertices['uv']
+
+    @property
+    def vertex_count(self):
+        return len(self.vertices)
+
+    @property
+    def triangle_count(self):
+        return len(self.indices) // 3
+
+    @property
+    def nbytes(self):
+        return self.vertices.nbytes + self.indices.nbytes
+
+    def bounds(self):
+        if self.vertex_count == 0:
+            return np.zeros(3, np.float32), np.zeros(3, np.float32)
+        return self.positions.min(axis=0), self.positions.max(axis=0)
+
+    # Esfera que envolve a caixa de limites: (centro, raio)
+    def bounding_sphere(self):
+        low, high = self.bounds()
+        center = (low.astype(np.float64) + high) * 0.5
+        return center, float(np.linalg.norm(high - center))
+
+    def transformed(self, matrix, name=None):
+        vertices = self.vertices.copy()
+        vertices['position'] = transform_points(matrix, self.positions)
+        vertices['normal'] = transform_normals(matrix, self.normals)
+        return Mesh(vertices, self.indices.copy(), name or self.name, dict(self.metadata))
+
+    # Replica a malha para várias matrizes de uma vez (uma cópia por matriz)
+    def instanced(self, matrices, name=None):
+        matrices = np.asarray(matrices, dtype=np.float64)
+        count = len(matrices)
+        n = self.vertex_count
+
+        linear = matrices[:, :3, :3]
+        positions = np.einsum('kij,nj->kni', linear, self.positions) + matrices[:, None, :3, 3]
+        normal_matrices = np.linalg.inv(linear).transpose(0, 2, 1)
+        normals = _normalize(np.einsum('kij,nj->kni', normal_matrices, self.normals))
+
+        vertices = np.empty(count * n, dtype=VERTEX_DTYPE)
+        vertices['position'] = positions.reshape(-1, 3)
+        vertices['normal'] = normals.reshape(-1, 3)
+        vertices['color'] = np.tile(self.colors, (count, 1))
+        vertices['uv'] = np.tile(self.uvs, (count, 1))
+        offsets = (np.arange(count, dtype=INDEX_DTYPE) * n)[:, None]
+        indices = (self.indices[None, :] + offsets).reshape(-1)
+        return Mesh(vertices, indices.astype(INDEX_DTYPE), name or self.name, dict(self.metadata))
+
+    def with_color(self, color):
+        vertices = self.vertices.copy()
+        vertices['color'] = color
+        return Mesh(vertices, self.indices.copy(), self.name, dict(self.metadata))
+
+    def with_uvs(self, uvs):
+        vertices = self.vertices.copy()
+        vertices['uv'] = uvs
+        return Mesh(vertices, self.indices.copy(), self.name, dict(self.metadata))
+
+
+def empty_mesh(name=''):
+    return Mesh(np.empty(0, dtype=VERTEX_DTYPE), np.empty(0, dtype=INDEX_DTYPE), name)
+
+
+# Junta várias malhas em uma só, registrando o intervalo de índices de cada
+# componente em metadata['components']
+def merge_meshes(meshes, name=''):
+    meshes = [m for m in meshes if m.vertex_count]
+    if not meshes:
+        return empty_mesh(name)
+
+    vertex_counts = np.array([m.vertex_count for m in meshes])
+    vertex_offsets = np.concatenate(([0], np.cumsum(vertex_counts)[:-1]))
+    vertices = np.concatenate([m.vertices for m in meshes])
+    indices = np.concatenate([
+        m.indices + INDEX_DTYPE(offset) for m, offset in zip(meshes, vertex_offsets)
+    ]).astype(INDEX_DTYPE)
+
+    components = []
+    first_index = 0
+    for m, offset in zip(meshes, vertex_offsets):
+        components.append({
+            'name': m.name,
+            'first_index': first_index,
+            'index_count': len(m.indices),
+            'first_vertex': int(offset),
+            'vertex_count': m.vertex_count,
+        })
+        first_index += len(m.indices)
+
+    return Mesh(vertices, indices, name, {'components': components})
+
+
+# MATRIZES (mesma convenção de glTranslate/glRotate/glScale)
+def identity():
+    return np.identity(4)
+
+def translation(x, y, z):
+    m = np.identity(4)
+    m[:3, 3] = (x, y, z)
+    return m
+
+def scaling(x, y, z):
+    return np.diag((x, y, z, 1.0))
+
+def rotation(angle, x, y, z):
+    axis = np.array((x, y, z), dtype=np.float64)
+    axis /= np.linalg.norm(axis)
+    x, y, z = axis
+    c = math.cos(math.radians(angle))
+    s = math.sin(math.radians(angle))
+    C = 1 - c
+    m = np.identity(4)
+    m[:3, :3] = (
+        (x * x * C + c,     x * y * C - z * s, x * z * C + y * s),
+        (y * x * C + z * s, y * y * C + c,     y * z * C - x * s),
+        (z * x * C - y * s, z * y * C + x * s, z * z * C + c),
+    )
+    return m
+
+# Mesma matriz de gluPerspective
+def perspective(fov_y, aspect, near, far):
+    f = 1.0 / math.tan(math.radians(fov_y) * 0.5)
+    m = np.zeros((4, 4))
+    m[0, 0] = f / aspect
+    m[1, 1] = f
+    m[2, 2] = (far + near) / (near - far)
+    m[2, 3] = 2 * far * near / (near - far)
+    m[3, 2] = -1.0
+    return m
+
+# Mesma matriz de glOrtho
+def orthographic(left, right, bottom, top, near, far):
+    m = np.identity(4)
+    m[0, 0] = 2.0 / (right - left)
+    m[1, 1] = 2.0 / (top - bottom)
+    m[2, 2] = -2.0 / (far - near)
+    m[0, 3] = -(right + left) / (right - left)
+    m[1, 3] = -(top + bottom) / (top - bottom)
+    m[2, 3] = -(far + near) / (far - near)
+    return m
+
+# Mesma matriz de gluLookAt
+def look_at(eye, target, up):
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = _normalize(np.asarray(target, dtype=np.float64) - eye)
+    side = _normalize(np.cross(forward, up))
+    up = np.cross(side, forward)
+    m = np.identity(4)
+    m[0, :3], m[1, :3], m[2, :3] = side, up, -forward
+    m[:3, 3] = -m[:3, :3] @ eye
+    return m
+
+def compose(*matrices):
+    result = np.identity(4)
+    for m in matrices:
+        result = result @ m
+    return result
+
+def transform_points(matrix, points):
+    points = np.asarray(points, dtype=np.float64)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+def transform_normals(matrix, normals):
+    normal_matrix = np.linalg.inv(matrix[:3, :3]).T
+    return _normalize(np.asarray(normals, dtype=np.float64) @ normal_matrix.T)
+
+
+def _normalize(v):
+    length = np.linalg.norm(v, axis=-1, keepdims=True)
+    return v / np.where(length < 1e-12, 1.0, length)
+
+
+def _build(positions, normals, color, indices, name):
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    vertices = np.empty(len(positions), dtype=VERTEX_DTYPE)
+    vertices['position'] = positions
+    vertices['normal'] = np.broadcast_to(np.asarray(normals, dtype=np.float32), positions.shape) \
+        if np.ndim(normals) < 2 else np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+    vertices['color'] = color
+    vertices['uv'] = 0.0
+    return Mesh(vertices, np.asarray(indices, dtype=INDEX_DTYPE).reshape(-1), name)
+
+
+# PRIMITIVAS
+# Quadriláteros (N, 4, 3). A normal pode ser única, uma por quad ou
+# calculada a partir da geometria quando omitida.
+def quads(corners, color, normal=None, name=''):
+    corners = np.asarray(corners, dtype=np.float64).reshape(-1, 4, 3)
+    count = len(corners)
+
+    if normal is None:
+        normal = _normalize(np.cross(corners[:, 2] - corners[:, 0], corners[:, 3] - corners[:, 1]))
+    normal = np.broadcast_to(np.asarray(normal, dtype=np.float64).reshape(-1, 3), (count, 3))
+    normals = np.repeat(normal, 4, axis=0)
+
+    base = (np.arange(count, dtype=INDEX_DTYPE) * 4)[:, None]
+    indices = base + np.array((0, 1, 2, 0, 2, 3), dtype=INDEX_DTYPE)
+    return _build(corners, normals, color, indices, name)
+
+# Equivalente a um GL_QUAD_STRIP formado pelos pares (a[i], b[i])
+def quad_strip(a, b, color, normal=None, name=''):
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    corners = np.stack((a[:-1], b[:-1], b[1:], a[1:]), axis=1)
+    if normal is not None and np.ndim(normal) == 2 and len(normal) == len(a):
+        normal = (np.asarray(normal)[:-1] + np.asarray(normal)[1:]) * 0.5
+    return quads(corners, color, normal, name)
+
+# Polígono convexo triangulado em leque (GL_POLYGON)
+def polygon(points, color, normal=None, name=''):
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    if normal is None:
+        normal = _normalize(np.cross(points[1] - points[0], points[2] - points[0]))
+    second = np.arange(1, n - 1, dtype=INDEX_DTYPE)
+    indices = np.stack((np.zeros(n - 2, dtype=INDEX_DTYPE), second, second + 1), axis=1)
+    return _build(points, normal, color, indices, name)
+
+_CUBE_FACES = np.array([
+    [(-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)],
+    [(1, -1, -1), (-1, -1, -1), (-1, 1, -1), (1, 1, -1)],
+    [(-1, 1, -1), (-1, 1, 1), (1, 1, 1), (1, 1, -1)],
+    [(-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1)],
+    [(1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1)],
+    [(-1, -1, 1), (-1, 1, 1), (-1, 1, -1), (-1, -1, -1)],
+], dtype=np.float64) * 0.5
+
+_CUBE_NORMALS = np.array([
+    (0, 0, 1), (0, 0, -1), (0, 1, 0), (0, -1, 0), (1, 0, 0), (-1, 0, 0),
+], dtype=np.float64)
+
+# Cubo unitário centrado na origem (antigo draw_solid_cube)
+def box(color, matrix=None, name=''):
+    mesh = quads(_CUBE_FACES, color, _CUBE_NORMALS, name)
+    return mesh.transformed(matrix) if matrix is not None else mesh
+
+# Cilindro ao longo de +z, como gluCylinder
+def cylinder(base_radius, top_radius, height, slices, color, stacks=1, name=''):
+    angles = np.linspace(0.0, 2 * math.pi, slices + 1)
+    sin, cos = np.sin(angles), np.cos(angles)
+    z = np.linspace(0.0, height, stacks + 1)
+    radii = np.linspace(base_radius, top_radius, stacks + 1)
+
+    ring = np.stack((sin, cos, np.zeros_like(sin)), axis=1)
+    positions = ring[None, :, :] * radii[:, None, None]
+    positions[:, :, 2] = z[:, None]
+
+    nz = (base_radius - top_radius) / height if height else 0.0
+    normals = _normalize(np.stack((sin, cos, np.full_like(sin, nz)), axis=1))
+    normals = np.broadcast_to(normals, positions.shape)
+
+    cols = slices + 1
+    row = np.arange(stacks, dtype=INDEX_DTYPE)[:, None] * cols
+    col = np.arange(slices, dtype=INDEX_DTYPE)[None, :]
+    v0 = (row + col).reshape(-1)
+    indices = np.stack((v0, v0 + 1, v0 + cols + 1, v0, v0 + cols + 1, v0 + cols), axis=1)
+    return _build(positions, normals.reshape(-1, 3), color, indices, name)
+
+# Disco/anel no plano z = 0 com normal +z, como gluDisk
+def disk(inner_radius, outer_radius, slices, color, loops=1, name=''):
+    angles = np.linspace(0.0, 2 * math.pi, slices + 1)
+    radii = np.linspace(inner_radius, outer_radius, loops + 1)
+    ring = np.stack((np.sin(angles), np.cos(angles), np.zeros_like(angles)), axis=1)
+    positions = ring[None, :, :] * radii[:, None, None]
+
+    cols = slices + 1
+    row = np.arange(loops, dtype=INDEX_DTYPE)[:, None] * cols
+    col = np.arange(slices, dtype=INDEX_DTYPE)[None, :]
+    v0 = (row + col).reshape(-1)
+    indices = np.stack((v0, v0 + cols, v0 + cols + 1, v0, v0 + cols + 1, v0 + 1), axis=1)
+    return _build(positions, (0.0, 0.0, 1.0), color, indices, name)
+
+# Anel entre dois raios, cada um em sua própria profundidade z
+def ring(outer_radius, inner_radius, z_outer, z_inner, segments, color, normal, name=''):
+    angles = np.linspace(0.0, 2 * math.pi, segments + 1)
+    circle = np.stack((np.cos(angles), np.sin(angles)), axis=1)
+    outer = np.column_stack((circle * outer_radius, np.full(segments + 1, z_outer)))
+    inner = np.column_stack((circle * inner_radius, np.full(segments + 1, z_inner)))
+    return quad_strip(outer, inner, color, normal, name)
@@ -0,0 +1,278 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import types
+import zipfile
+
+import numpy as np
+
+import car_geometry
+import mesh as mesh_module
+from mesh import INDEX_DTYPE, VERTEX_DTYPE, Mesh, merge_meshes
+
+# CACHE DE GEOMETRIA EM DISCO
+# Cada malha gerada é guardada em um .npz cujo nome é o hash dos parâmetros
+# que a geraram: nome do componente, argumentos (nível de detalhe, número
+# de segmentos), as constantes do módulo que o gerador lê (tabelas de
+# perfil do monocoque, seções do bico, raios das rodas, ...) e o bytecode
+# do gerador e das funções que ele chama em car_geometry.py e mesh.py,
+# mais os métodos das classes desses módulos (Mesh.transformed, ...), que
+# entram em toda chave: pelo bytecode não dá para saber quais são chamados.
+# Mudou qualquer um deles, muda o hash e o componente é gerado de novo; os
+# outros continuam vindo do disco. O diretório tem tamanho máximo e os
+# arquivos usados há mais tempo são apagados primeiro (LRU pelo mtime).
+#
+#   python mesh_cache.py            # mostra o conteúdo do cache
+#   python mesh_cache.py --clear
+
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Módulos cujas funções entram no hash quando chamadas por um gerador
+_TRACKED_MODULES = (car_geometry.__name__, mesh_module.__name__)
+# Temporários de save_mesh mais velhos que isso sobraram de um processo que caiu
+TEMPORARY_MAX_AGE = 60.0
+
+
+def default_directory():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'f1-3d-car', 'meshes')
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return getattr(value, '__qualname__', repr(value))
+
+
+# Bytecode, constantes e nomes globais de um code object e dos que ele
+# contém (compreensões, lambdas)
+def _code_parts(code, parts, names):
+    parts.append(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _code_parts(const, parts, names)
+        else:
+            parts.append(repr(const).encode())
+    names.update(code.co_names)
+
+
+# Hash de uma função: bytecode, valores padrão, constantes em MAIÚSCULAS
+# que ela lê e, recursivamente, o hash das funções do projeto que ela chama.
+# digests guarda o resultado de cada função (uma vez por execução).
+def function_digest(function, digests, visiting=()):
+    if function in digests:
+        return digests[function]
+    parts = []
+    names = set()
+    _code_parts(function.__code__, parts, names)
+    parts.append(json.dumps([function.__defaults__, function.__kwdefaults__], default=_json_default).encode())
+
+    namespace = function.__globals__
+    for name in sorted(names):
+        value = namespace.get(name)
+        if isinstance(value, types.FunctionType) and value.__module__ in _TRACKED_MODULES:
+            if value is not function and value not in visiting:
+                parts.append(function_digest(value, digests, visiting + (function,)))
+        elif name.isupper() and value is not None:
+            parts.append(name.encode() + json.dumps(value, default=_json_default, sort_keys=True).encode())
+
+    digests[function] = hashlib.sha256(b'\0'.join(parts)).digest()
+    return digests[function]
+
+
+# Hash dos métodos (e propriedades) das classes de car_geometry.py e
+# mesh.py, com as funções que eles chamam; guardado em digests uma vez
+def methods_digest(digests):
+    if _TRACKED_MODULES in digests:
+        return digests[_TRACKED_MODULES]
+    parts = []
+    for module in (car_geometry, mesh_module):
+        for class_name, cls in sorted(vars(module).items()):
+            if not isinstance(cls, type) or cls.__module__ != module.__name__:
+                continue
+            for name, member in sorted(vars(cls).items()):
+                if isinstance(member, property):
+                    member = member.fget
+                elif isinstance(member, (staticmethod, classmethod)):
+                    member = member.__func__
+                if isinstance(member, types.FunctionType):
+                    parts.append(('%s.%s' % (class_name, name)).encode())
+                    parts.append(function_digest(member, digests))
+    digests[_TRACKED_MODULES] = hashlib.sha256(b'\0'.join(parts)).digest()
+    return digests[_TRACKED_MODULES]
+
+
+def mesh_key(name, generator, kwargs, digests=None):
+    digests = {} if digests is None else digests
+    parts = [
+        b'%d' % CACHE_FORMAT,
+        repr(VERTEX_DTYPE.descr).encode(),
+        name.encode(),
+        json.dumps(kwargs, default=_json_default, sort_keys=True).encode(),
+        function_digest(generator, digests),
+        methods_digest(digests),
+    ]
+    return hashlib.sha256(b'\0'.join(parts)).hexdigest()
+
+
+def save_mesh(path, mesh):
+    # Um temporário por processo: vários workers podem gerar a mesma malha
+    temporary = '%s.%d.tmp' % (path, os.getpid())
+    with open(temporary, 'wb') as f:
+        np.savez(f, vertices=mesh.vertices, indices=mesh.indices,
+                 name=np.array(mesh.name), metadata=np.array(json.dumps(mesh.metadata, default=_json_default)))
+    os.replace(temporary, path)
+
+
+def load_mesh(path):
+    with np.load(path, allow_pickle=False) as data:
+        vertices = data['vertices']
+        indices = data['indices']
+        if vertices.dtype != VERTEX_DTYPE or indices.dtype != INDEX_DTYPE:
+            raise ValueError("layout de vértices diferente de VERTEX_DTYPE")
+        return Mesh(vertices, indices, str(data['name']), json.loads(str(data['metadata'])))
+
+
+# Mesmas funções de car_geometry usadas pelo viewer, com cache em disco.
+# main.py usa este objeto ou o próprio módulo car_geometry, indiferentemente.
+class MeshCache:
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Hash de cada função e chave de cada malha, calculados uma vez por execução
+        self.digests = {}
+        self.keys = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def get(self, name, generator, **kwargs):
+        lookup = (name, generator, json.dumps(kwargs, sort_keys=True))
+        key = self.keys.get(lookup)
+        if key is None:
+            key = self.keys[lookup] = mesh_key(name, generator, kwargs, self.digests)
+        path = self.path(key)
+
+        try:
+            mesh = load_mesh(path)
+            os.utime(path)
+            self.hits += 1
+            return mesh
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # Ausente, de outro layout ou corrompido (gravação cortada): gera de novo
+            pass
+
+        mesh = generator(**kwargs)
+        self.misses += 1
+        try:
+            save_mesh(path, mesh)
+            self.evict()
+        except OSError:
+            pass
+        return mesh
+
+    # Apaga os arquivos menos usados até caber em max_bytes, e os
+    # temporários deixados por um save_mesh interrompido
+    def evict(self):
+        self.remove_stale_temporaries()
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def remove_stale_temporaries(self):
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith('.tmp'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                # Os recentes podem ser de outro processo gravando agora
+                if now - os.stat(path).st_mtime > TEMPORARY_MAX_AGE:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    # (caminho, bytes, último uso) de cada arquivo do cache
+    def entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            os.remove(path)
+
+    def static_chassis_mesh(self, lod=0):
+        meshes = []
+        for name, generator in car_geometry.STATIC_COMPONENTS:
+            mesh = self.get(name, generator, **car_geometry.lod_parameters(name, lod))
+            mesh.name = name
+            meshes.append(mesh)
+        return merge_meshes(meshes, 'static_chassis')
+
+    def lod_drs_flap_mesh(self, lod=0):
+        return self.get('drs_flap', car_geometry.drs_flap_mesh, **car_geometry.lod_parameters('drs_flap', lod))
+
+    def lod_wheel_mesh(self, is_front=False, side=1, lod=0):
+        return self.get('wheel', car_geometry.wheel_mesh, is_front=is_front, side=side,
+                        **car_geometry.lod_parameters('wheel', lod))
+
+    def drs_flap_sweep_mesh(self):
+        return self.get('drs_flap_sweep', car_geometry.drs_flap_sweep_mesh)
+
+    # Os valores padrão de wheel_mesh são os do nível 0
+    def wheel_mesh(self, is_front=False, side=1):
+        return self.lod_wheel_mesh(is_front, side, 0)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cache de geometria em disco")
+    parser.add_argument("--directory", default=None, help="diretório do cache (padrão: %s)" % default_directory())
+    parser.add_argument("--clear", action="store_true", help="apaga todo o cache")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cache = MeshCache(args.directory)
+    if args.clear:
+        cache.clear()
+
+    entries = cache.entries()
+    print("%s: %d malhas, %.1f KiB (limite %.0f MiB)" % (
+        cache.directory, len(entries), sum(size for _, size, _ in entries) / 1024, cache.max_bytes / 2 ** 20))
+
+    # Tempo para montar todos os níveis do carro, gerando (1ª vez) ou lendo do disco
+    start = time.perf_counter()
+    for level in range(len(car_geometry.LOD_LEVELS)):
+        cache.static_chassis_mesh(level)
+        cache.lod_drs_flap_mesh(level)
+        for is_front in (True, False):
+            for side in (1, -1):
+                cache.lod_wheel_mesh(is_front, side, level)
+    elapsed = time.perf_counter() - start
+    print("todos os níveis em %.1f ms (%d do disco, %d gerados)" % (elapsed * 1000, cache.hits, cache.misses))
+
+
+if __name__ == "__main__":
+    main()
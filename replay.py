@@ -0,0 +1,415 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+import grid
+import headless
+import simulation
+
+# GRAVAÇÃO E REPRODUÇÃO DE SESSÕES
+# Uma sessão da janela vira um arquivo binário de registros de tamanho fixo,
+# escritos ao fim de cada volta do loop: dt, câmera, teclas que mudaram a
+# cena (bits, ver TOGGLES) e o estado desenhado (rodas, pista, DRS, direção).
+# A cada KEYFRAME_INTERVAL quadros entra antes um snapshot completo: os dois
+# últimos estados da simulação, acumulador, opções e o estado do grid.
+#
+#   [cabeçalho][snapshot 0][quadro 0 ... quadro K-1][snapshot 1][quadro K ...]
+#
+# Como tudo tem tamanho fixo, a posição de qualquer quadro ou snapshot é uma
+# conta. Ir para um instante custa uma busca binária nos tempos dos
+# snapshots, restaurar um deles e simular no máximo K quadros, qualquer que
+# seja o tamanho da sessão. A simulação é em passo fixo e não lê relógio,
+# então reaplicar os mesmos dt e teclas reproduz o mesmo estado, bit a bit.
+#
+#   python main.py --record-session sessao.f1rec
+#   python replay.py sessao.f1rec --verify          # confere o determinismo, sem OpenGL
+#   python replay.py sessao.f1rec --seek 95 --output glitch.y4m
+#   python replay.py sessao.f1rec                   # reproduz na janela
+
+MAGIC = b'F1REPLAY'
+FORMAT_VERSION = 1
+KEYFRAME_INTERVAL = 240
+
+# Funções toggle_<nome> de main.py; o bit i de 'events' é TOGGLES[i]. Os bits
+# são trocados (xor) a cada tecla: apertar duas vezes no mesmo quadro se anula.
+TOGGLES = ('grid', 'animation', 'compiled_geometry', 'lod', 'culling', 'instrumentation')
+# Bits de 'flags'
+FLAG_RUNNING = 1
+FLAG_DRAWN = 2
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u2'),
+    ('keyframe_interval', '<u4'),
+    ('grid_capacity', '<u4'),
+    ('sim_rate', '<u4'),
+    ('size', '<u4', 2),
+])
+
+FRAME_DTYPE = np.dtype([
+    ('time', '<f8'),       # tempo da sessão no início do quadro
+    ('dt', '<f8'),         # passado a update_animation
+    ('camera', '<f8', 3),  # camera_angle_x, camera_angle_y, camera_distance
+    ('events', '<u2'),
+    ('flags', 'u1'),
+    ('drawn', '<f4', 4),   # wheel_rotation, track_line_offset, drs_open, steer_angle
+])
+
+
+
+def keyframe_dtype(grid_capacity):
+    return np.dtype([
+        ('time', '<f8'),
+        ('previous', '<f8', len(simulation.SimState._fields)),
+        ('current', '<f8', len(simulation.SimState._fields)),
+        ('accumulator', '<f8'),
+        ('steps', '<u8'),
+        ('camera', '<f8', 3),
+        ('options', 'u1'),
+        ('cars', '<u4'),
+        # Estado anterior e atual de cada carro: posição (3), giro, direção e DRS
+        ('grid', '<f8', (2, grid.STATE_ROWS, grid_capacity)),
+    ])
+
+
+def _drawn_state(viewer):
+    return (viewer.wheel_rotation, viewer.track_line_offset, viewer.drs_open, viewer.steer_angle)
+
+
+# Bits de 'options' no snapshot: geometria compilada, LOD, culling, instrumentação
+def _options(viewer):
+    values = (viewer.compiled_geometry, viewer.lod_selector.enabled, viewer.culling_enabled,
+              viewer.instrumentation.enabled)
+    return sum(1 << i for i, value in enumerate(values) if value)
+
+
+# Grava a sessão da janela. main.py chama begin_frame() no início de cada
+# volta do loop, event() a cada tecla de TOGGLES e end_frame() depois de
+# update_animation.
+class SessionRecorder:
+    def __init__(self, path, viewer, size, keyframe_interval=KEYFRAME_INTERVAL, grid_capacity=grid.GRID_SIZE):
+        self.viewer = viewer
+        self.keyframe_interval = keyframe_interval
+        self.grid_capacity = grid_capacity
+        self.keyframe = np.zeros(1, dtype=keyframe_dtype(grid_capacity))
+        self.frame = np.zeros(1, dtype=FRAME_DTYPE)
+        self.frames = 0
+        self.time = 0.0
+        self.events = 0
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header[0] = (MAGIC, FORMAT_VERSION, keyframe_interval, grid_capacity, viewer.car_simulation.rate, size)
+        self.file = open(path, 'wb')
+        self.file.write(header.tobytes())
+
+    def begin_frame(self):
+        if self.frames % self.keyframe_interval == 0:
+            self._write_keyframe()
+        self.events = 0
+
+    def event(self, name):
+        self.events ^= 1 << TOGGLES.index(name)
+
+    def end_frame(self, dt, drawn):
+        viewer = self.viewer
+        record = self.frame[0]
+        record['time'] = self.time
+        record['dt'] = dt
+        record['camera'] = (viewer.camera_angle_x, viewer.camera_angle_y, viewer.camera_distance)
+        record['events'] = self.events
+        record['flags'] = (FLAG_RUNNING if viewer.animation_running else 0) | (FLAG_DRAWN if drawn else 0)
+        record['drawn'] = _drawn_state(viewer)
+        self.file.write(self.frame.tobytes())
+        self.frames += 1
+        self.time += dt
+
+    def _write_keyframe(self):
+        viewer = self.viewer
+        sim = viewer.car_simulation
+        record = self.keyframe[0]
+        record['time'] = self.time
+        record['previous'] = sim.previous
+        record['current'] = sim.current
+        record['accumulator'] = sim.accumulator
+        record['steps'] = sim.steps
+        record['camera'] = (viewer.camera_angle_x, viewer.camera_angle_y, viewer.camera_distance)
+        record['options'] = _options(viewer)
+        record['grid'] = 0.0
+        record['cars'] = 0
+        car_grid = viewer.car_grid
+        if car_grid is not None and car_grid.count <= self.grid_capacity:
+            record['cars'] = car_grid.count
+            record['grid'][0, :, :car_grid.count] = grid.state_rows(car_grid.previous)
+            record['grid'][1, :, :car_grid.count] = grid.state_rows(car_grid.current)
+        self.file.write(self.keyframe.tobytes())
+
+    def close(self):
+        self.file.close()
+
+
+# Leitura da sessão por mmap: snapshots e quadros são views NumPy sobre o
+# arquivo, localizados pela posição
+class Session:
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        header = np.frombuffer(self.data, HEADER_DTYPE, 1)[0]
+        if header['magic'] != MAGIC or header['version'] != FORMAT_VERSION:
+            raise ValueError("%s não é uma sessão gravada por esta versão" % path)
+        self.keyframe_interval = int(header['keyframe_interval'])
+        self.grid_capacity = int(header['grid_capacity'])
+        self.sim_rate = int(header['sim_rate'])
+        self.size = tuple(int(v) for v in header['size'])
+        self.keyframe_dtype = keyframe_dtype(self.grid_capacity)
+        self.block_size = self.keyframe_dtype.itemsize + self.keyframe_interval * FRAME_DTYPE.itemsize
+
+        # Uma sessão interrompida pode terminar no meio de um registro
+        body = len(self.data) - HEADER_DTYPE.itemsize
+        blocks, rest = divmod(body, self.block_size)
+        self.frame_count = blocks * self.keyframe_interval
+        if rest >= self.keyframe_dtype.itemsize:
+            blocks += 1
+            self.frame_count += (rest - self.keyframe_dtype.itemsize) // FRAME_DTYPE.itemsize
+        self.keyframes = np.ndarray((blocks,), self.keyframe_dtype, self.data, HEADER_DTYPE.itemsize,
+                                    (self.block_size,))
+
+    def _frame_offset(self, index):
+        block, slot = divmod(index, self.keyframe_interval)
+        return (HEADER_DTYPE.itemsize + block * self.block_size + self.keyframe_dtype.itemsize
+                + slot * FRAME_DTYPE.itemsize)
+
+    # Quadros [first, first + count) de um mesmo bloco
+    def _block_frames(self, first, count):
+        return np.ndarray((count,), FRAME_DTYPE, self.data, self._frame_offset(first), (FRAME_DTYPE.itemsize,))
+
+    def frame(self, index):
+        return self._block_frames(index, 1)[0]
+
+    def frames(self, first=0, last=None):
+        last = self.frame_count if last is None else last
+        index = first
+        while index < last:
+            block_end = min((index // self.keyframe_interval + 1) * self.keyframe_interval, last)
+            for offset, record in enumerate(self._block_frames(index, block_end - index)):
+                yield index + offset, record
+            index = block_end
+
+    @property
+    def duration(self):
+        if not self.frame_count:
+            return 0.0
+        last = self.frame(self.frame_count - 1)
+        return float(last['time'] + last['dt'])
+
+    # Último quadro que começa em ou antes de seconds
+    def frame_at(self, seconds):
+        block = max(int(np.searchsorted(self.keyframes['time'], seconds, 'right')) - 1, 0)
+        first = block * self.keyframe_interval
+        count = min(self.keyframe_interval, self.frame_count - first)
+        if count <= 0:
+            return max(self.frame_count - 1, 0)
+        slot = int(np.searchsorted(self._block_frames(first, count)['time'], seconds, 'right')) - 1
+        return first + max(slot, 0)
+
+
+# Reproduz uma sessão sobre o módulo main.py (viewer)
+class Replayer:
+    def __init__(self, session, viewer):
+        self.session = session
+        self.viewer = viewer
+        # Índice do próximo quadro a aplicar (None: nada restaurado ainda)
+        self.position = None
+
+    def restore_keyframe(self, block):
+        viewer = self.viewer
+        record = self.session.keyframes[block]
+
+        cars = int(record['cars'])
+        if cars and (viewer.car_grid is None or viewer.car_grid.count != cars):
+            viewer.enable_grid(cars)
+        elif not cars and viewer.car_grid is not None:
+            viewer.disable_grid()
+
+        sim = viewer.car_simulation
+        sim.previous = simulation.state_from_values(record['previous'])
+        sim.current = simulation.state_from_values(record['current'])
+        sim.accumulator = float(record['accumulator'])
+        sim.steps = int(record['steps'])
+        viewer.seek_steps = None
+        viewer.apply_simulation_state(sim.current)
+        if cars:
+            viewer.car_grid.previous = grid.state_from_rows(record['grid'][0, :, :cars])
+            viewer.car_grid.current = grid.state_from_rows(record['grid'][1, :, :cars])
+            viewer.grid_state = viewer.car_grid.current
+
+        options = int(record['options'])
+        viewer.compiled_geometry = bool(options & 1)
+        if viewer.lod_selector.enabled != bool(options & 2):
+            viewer.toggle_lod()
+        viewer.culling_enabled = bool(options & 4)
+        if viewer.instrumentation.enabled != bool(options & 8):
+            viewer.toggle_instrumentation()
+        viewer.camera_angle_x, viewer.camera_angle_y, viewer.camera_distance = record['camera'].tolist()
+        self.position = block * self.session.keyframe_interval
+
+    # Reaplica um quadro: teclas, câmera e passo da simulação
+    def apply_frame(self, record):
+        viewer = self.viewer
+        events = int(record['events'])
+        for bit, name in enumerate(TOGGLES):
+            if events & (1 << bit):
+                getattr(viewer, 'toggle_' + name)()
+        viewer.camera_angle_x, viewer.camera_angle_y, viewer.camera_distance = record['camera'].tolist()
+        viewer.update_animation(float(record['dt']))
+        self.position += 1
+
+    # Deixa o viewer no estado do fim do quadro index
+    def seek_frame(self, index):
+        block = index // self.session.keyframe_interval
+        if self.position is None or self.position > index + 1 or self.position // self.session.keyframe_interval != block:
+            self.restore_keyframe(block)
+        for _, record in self.session.frames(self.position, index + 1):
+            self.apply_frame(record)
+
+    def seek(self, seconds):
+        index = self.session.frame_at(seconds)
+        self.seek_frame(index)
+        return index
+
+    # Prepara para aplicar a partir do quadro first
+    def start_at(self, first):
+        if first:
+            self.seek_frame(first - 1)
+        else:
+            self.restore_keyframe(0)
+
+    # Quadros em que o estado reproduzido difere do gravado, a partir do
+    # snapshot anterior a first
+    def verify(self, first=0):
+        mismatches = []
+        self.restore_keyframe(first // self.session.keyframe_interval)
+        for index, record in self.session.frames(self.position):
+            self.apply_frame(record)
+            drawn = np.array(_drawn_state(self.viewer), dtype=np.float32)
+            if not np.array_equal(drawn, record['drawn']):
+                mismatches.append(index)
+        return mismatches
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Reprodução de sessões gravadas com --record-session")
+    parser.add_argument("session", help="arquivo .f1rec")
+    parser.add_argument("--seek", type=float, default=0.0, help="começa neste instante da sessão, em segundos")
+    parser.add_argument("--verify", action="store_true",
+                        help="reproduz a simulação inteira sem OpenGL e confere o estado gravado")
+    parser.add_argument("--headless", action="store_true", help="renderiza sem janela (EGL/OSMesa)")
+    parser.add_argument("--osmesa", action="store_true", help="usa OSMesa em vez de EGL no modo --headless")
+    parser.add_argument("--core", action="store_true", help="usa o caminho de shaders (OpenGL 3.3 core)")
+    parser.add_argument("--output", help="grava os quadros reproduzidos (pasta de PNGs ou .y4m)")
+    parser.add_argument("--telemetry", help="a mesma telemetria usada na gravação (main.py --telemetry)")
+    parser.add_argument("--circuit", nargs='?', const='', metavar="CSV",
+                        help="o mesmo circuito usado na gravação (main.py --circuit)")
+    return parser.parse_args(argv)
+
+
+def _frame_report(frame_times):
+    milliseconds = np.array(frame_times) * 1000
+    print("tempo de quadro p50 %.3f ms  p95 %.3f ms  p99 %.3f ms  máx %.3f ms" % tuple(
+        np.percentile(milliseconds, [50, 95, 99, 100])))
+
+
+def replay_headless(replayer, first, backend, core, output):
+    viewer = replayer.viewer
+    width, height = replayer.session.size
+    context = headless.HeadlessContext(width, height, backend, 'core' if core else 'compatibility')
+    viewer.setup_gl(width, height, core)
+    replayer.start_at(first)
+    if output:
+        viewer.start_recording(output, width, height)
+
+    # Só os quadros que a janela desenhou (com o desenho sob demanda, nem todos)
+    frame_times = []
+    for _, record in replayer.session.frames(replayer.position):
+        replayer.apply_frame(record)
+        if record['flags'] & FLAG_DRAWN:
+            start = time.perf_counter()
+            viewer.render_frame(width, height)
+            frame_times.append(time.perf_counter() - start)
+    viewer.stop_recording()
+    viewer.release_gl()
+    context.release()
+    if frame_times:
+        _frame_report(frame_times)
+
+
+def replay_window(replayer, first, core):
+    import pygame
+
+    viewer = replayer.viewer
+    width, height = replayer.session.size
+    pygame.init()
+    if core:
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
+    pygame.display.set_mode((width, height), pygame.DOUBLEBUF | pygame.OPENGL)
+    pygame.display.set_caption("F1 Mercedes W16 - Replay %s" % os.path.basename(replayer.session.path))
+    viewer.setup_gl(width, height, core)
+    replayer.start_at(first)
+
+    # Cada quadro é mostrado no mesmo ritmo em que foi gravado
+    start = time.perf_counter()
+    if replayer.position < replayer.session.frame_count:
+        start -= float(replayer.session.frame(replayer.position)['time'])
+    for _, record in replayer.session.frames(replayer.position):
+        if any(event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE)
+               for event in pygame.event.get()):
+            break
+        replayer.apply_frame(record)
+        if record['flags'] & FLAG_DRAWN:
+            delay = float(record['time']) - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+            viewer.render_frame(width, height)
+            pygame.display.flip()
+    viewer.release_gl()
+    pygame.quit()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    backend = 'osmesa' if args.osmesa else 'egl'
+    if args.headless or args.verify:
+        headless.configure_platform(backend)
+    import main as viewer
+
+    if args.telemetry:
+        viewer.load_telemetry(args.telemetry)
+    if args.circuit is not None:
+        viewer.load_circuit(args.circuit or None)
+    session = Session(args.session)
+    replayer = Replayer(session, viewer)
+    first = session.frame_at(args.seek) if args.seek else 0
+    print("%s: %d quadros, %.1f s, %d snapshots" % (
+        session.path, session.frame_count, session.duration, len(session.keyframes)))
+
+    if args.verify:
+        start = time.perf_counter()
+        mismatches = replayer.verify(first)
+        elapsed = time.perf_counter() - start
+        checked = session.frame_count - first // session.keyframe_interval * session.keyframe_interval
+        print("%d quadros reproduzidos em %.2f s, %d diferentes do gravado%s" % (
+            checked, elapsed, len(mismatches),
+            " (primeiro: %d)" % mismatches[0] if mismatches else ""))
+        sys.exit(1 if mismatches else 0)
+    elif args.headless:
+        replay_headless(replayer, first, backend, args.core, args.output)
+    else:
+        replay_window(replayer, first, args.core)
+
+
+if __name__ == "__main__":
+    main()
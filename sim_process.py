@@ -0,0 +1,290 @@
+import argparse
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import grid
+import simulation
+
+# SIMULAÇÃO EM OUTRO PROCESSO
+# Com --sim-process a simulação em passo fixo (carro, grid e a telemetria
+# que a alimenta) roda em um processo próprio, no relógio de parede, e
+# publica cada passo em um buffer duplo em memória compartilhada: o
+# escritor preenche o slot inativo, troca o slot ativo e só então avança o
+# contador de sequência. O processo de desenho lê o slot ativo por views
+# NumPy direto na memória compartilhada, sem cópia nem pickle, e repete a
+# leitura se a sequência mudou no meio dela. Um passo pesado custa tempo do
+# outro núcleo, não do quadro.
+#
+# A câmera continua no processo de desenho, junto da entrada do usuário. O
+# resto dos comandos (animação, grid, parar) vai por um Pipe e cada um
+# espera a confirmação, que só chega depois do estado novo publicado.
+#
+#   python sim_process.py --seconds 5 --cars 20   # mede leituras por segundo
+
+HEADER_DTYPE = np.dtype([
+    ('sequence', '<u8'),  # avança a cada publicação
+    ('active', '<u8'),    # slot com o último estado completo
+])
+STATE_VALUES = len(simulation.SimState._fields)
+
+
+def slot_dtype(grid_capacity):
+    return np.dtype([
+        ('previous', '<f8', STATE_VALUES),
+        ('current', '<f8', STATE_VALUES),
+        # Instante (time.monotonic) em que o estado atual passou a valer
+        ('stamp', '<f8'),
+        ('steps', '<u8'),
+        ('cars', '<u4'),
+        # Telemetria ao vivo do processo da simulação, para o HUD
+        ('live_port', '<u4'),
+        ('live_signal', 'u1'),
+        ('live_speed', '<f4'),
+        ('live_throttle', '<f4'),
+        ('grid', '<f8', (2, grid.STATE_ROWS, grid_capacity)),
+    ])
+
+
+def block_size(grid_capacity):
+    return HEADER_DTYPE.itemsize + 2 * slot_dtype(grid_capacity).itemsize
+
+
+def map_block(buffer, grid_capacity):
+    header = np.ndarray((), HEADER_DTYPE, buffer, 0)
+    slots = np.ndarray((2,), slot_dtype(grid_capacity), buffer, HEADER_DTYPE.itemsize)
+    return header, slots
+
+
+# PROCESSO DA SIMULAÇÃO
+class SimulationServer:
+    def __init__(self, buffer, grid_capacity, rate=simulation.SIM_RATE, track_period=simulation.TRACK_OFFSET_PERIOD):
+        self.header, self.slots = map_block(buffer, grid_capacity)
+        self.grid_capacity = grid_capacity
+        self.simulation = simulation.Simulation(rate)
+        self.simulation.track_period = track_period
+        self.car_grid = None
+        self.receiver = None
+        # Parada com telemetria ao vivo, republica nesse intervalo (s) para o
+        # HUD ver o sinal cair ou voltar
+        self.live_interval = None
+        self.start = time.monotonic()
+
+    def load_telemetry(self, path):
+        import telemetry
+        self.simulation.driver = telemetry.TelemetryDriver(telemetry.open_telemetry(path), self.simulation.step_dt)
+
+    def start_live_telemetry(self, port):
+        import live_telemetry
+        self.receiver = live_telemetry.TelemetryReceiver(port).start()
+        self.live_interval = live_telemetry.STALE_SECONDS / 5
+        self.simulation.driver = live_telemetry.LiveTelemetryDriver(self.receiver)
+
+    def set_grid(self, count):
+        if self.car_grid is not None:
+            self.simulation.step_callbacks.remove(self.car_grid.step)
+            self.car_grid = None
+        if count:
+            if count > self.grid_capacity:
+                raise ValueError("grid de %d carros, a memória compartilhada cabe %d" % (count, self.grid_capacity))
+            self.car_grid = grid.CarGrid(count)
+            self.simulation.step_callbacks.append(self.car_grid.step)
+
+    def toggle(self):
+        self.simulation.toggle()
+        if self.car_grid is not None and not self.simulation.running:
+            self.car_grid.reset_motion()
+
+    # Tempo de parede correspondente ao passo atual
+    def stamp(self):
+        return self.start + self.simulation.steps * self.simulation.step_dt
+
+    def publish(self):
+        header = self.header
+        slot = self.slots[1 - int(header['active'])]
+        sim = self.simulation
+        slot['previous'] = sim.previous
+        slot['current'] = sim.current
+        slot['stamp'] = self.stamp()
+        slot['steps'] = sim.steps
+        cars = self.car_grid.count if self.car_grid is not None else 0
+        slot['cars'] = cars
+        if cars:
+            slot['grid'][0, :, :cars] = grid.state_rows(self.car_grid.previous)
+            slot['grid'][1, :, :cars] = grid.state_rows(self.car_grid.current)
+        if self.receiver is not None:
+            packet = self.receiver.latest()
+            slot['live_port'] = self.receiver.address[1]
+            slot['live_signal'] = packet is not None and not self.receiver.stale()
+            if packet is not None:
+                slot['live_speed'] = packet['speed']
+                slot['live_throttle'] = packet['throttle']
+        header['active'] = 1 - int(header['active'])
+        header['sequence'] = int(header['sequence']) + 1
+
+    # Aplica um comando do Pipe; devolve False no pedido para parar
+    def handle(self, command, argument):
+        if command == 'stop':
+            return False
+        if command == 'toggle':
+            self.toggle()
+            # Parada, a simulação não anda: o relógio recomeça de onde ela está
+            self.start = time.monotonic() - self.simulation.steps * self.simulation.step_dt
+        elif command == 'grid':
+            self.set_grid(argument)
+        return True
+
+    # Dá os passos devidos até agora (no máximo MAX_FRAME_TIME de atraso) e
+    # dorme no Pipe até o próximo; parada, dorme até chegar um comando (ou
+    # até live_interval, para republicar o estado da telemetria ao vivo)
+    def run(self, connection):
+        sim = self.simulation
+        max_behind = int(simulation.MAX_FRAME_TIME * sim.rate)
+        self.start = time.monotonic()
+        while True:
+            if sim.running:
+                due = int((time.monotonic() - self.start) * sim.rate) - sim.steps
+                if due > max_behind:
+                    # Atrasada demais: descarta o tempo em vez de correr atrás
+                    self.start += (due - max_behind) * sim.step_dt
+                    due = max_behind
+                if due > 0:
+                    sim.run(due)
+                    self.publish()
+                timeout = max(0.0, self.stamp() + sim.step_dt - time.monotonic())
+            else:
+                timeout = self.live_interval
+            if connection.poll(timeout):
+                command, argument = connection.recv()
+                keep_running = self.handle(command, argument)
+                self.publish()
+                connection.send(True)
+                if not keep_running:
+                    break
+            elif not sim.running:
+                self.publish()
+        if self.receiver is not None:
+            self.receiver.stop()
+
+
+def _serve(name, grid_capacity, rate, track_period, cars, telemetry_path, live_port, connection):
+    memory = shared_memory.SharedMemory(name)
+    server = SimulationServer(memory.buf, grid_capacity, rate, track_period)
+    if telemetry_path:
+        server.load_telemetry(telemetry_path)
+    if live_port:
+        server.start_live_telemetry(live_port)
+    server.set_grid(cars)
+    server.publish()
+    connection.send(True)
+    server.run(connection)
+    # As views precisam sumir antes de fechar o mapeamento
+    del server
+    memory.close()
+
+
+# PROCESSO DE DESENHO
+class SimulationClient:
+    def __init__(self, rate=simulation.SIM_RATE, cars=0, grid_capacity=grid.GRID_SIZE, telemetry_path=None,
+                 live_port=None, track_period=simulation.TRACK_OFFSET_PERIOD):
+        self.step_dt = 1.0 / rate
+        self.track_period = track_period
+        self.grid_capacity = max(grid_capacity, cars)
+        self.memory = shared_memory.SharedMemory(create=True, size=block_size(self.grid_capacity))
+        self.header, self.slots = map_block(self.memory.buf, self.grid_capacity)
+
+        context = multiprocessing.get_context('spawn')
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, name='simulation', daemon=True,
+            args=(self.memory.name, self.grid_capacity, rate, track_period, cars, telemetry_path, live_port, child))
+        self.process.start()
+        child.close()
+        # Espera o primeiro estado publicado (telemetria aberta, grid criado)
+        self.connection.recv()
+
+    def command(self, command, argument=None):
+        self.connection.send((command, argument))
+        return self.connection.recv()
+
+    def toggle(self):
+        self.command('toggle')
+
+    def set_grid(self, count):
+        self.command('grid', count)
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.command('stop')
+        except (BrokenPipeError, EOFError):
+            pass
+        self.process.join()
+        self.process = None
+        self.connection.close()
+        self.header = self.slots = None
+        self.memory.close()
+        self.memory.unlink()
+
+    # Estado interpolado no instante now, como Simulation.interpolated e
+    # CarGrid.interpolated: (SimState, estado do grid ou None, slot lido).
+    # O slot continua valendo só até a próxima publicação; os valores
+    # devolvidos já são cópias (floats e arrays novos da interpolação).
+    def read(self, now=None):
+        header = self.header
+        while True:
+            sequence = int(header['sequence'])
+            slot = self.slots[int(header['active'])]
+            now = time.monotonic() if now is None else now
+            alpha = min(max((now - slot['stamp']) / self.step_dt, 0.0), 1.0)
+            previous = simulation.state_from_values(slot['previous'])
+            current = simulation.state_from_values(slot['current'])
+            state = simulation.interpolate(previous, current, alpha, self.track_period)
+            cars = int(slot['cars'])
+            grid_state = None
+            if cars:
+                rows = slot['grid'][:, :, :cars]
+                # Com alpha < 1 a interpolação já gera arrays novos; o estado
+                # atual é copiado para não apontar para um slot reescrito depois
+                if alpha < 1:
+                    grid_state = grid.interpolate(grid.state_views(rows[0]), grid.state_views(rows[1]), alpha)
+                else:
+                    grid_state = grid.state_from_rows(rows[1])
+            live = None
+            if slot['live_port']:
+                live = (int(slot['live_port']), bool(slot['live_signal']),
+                        float(slot['live_speed']), float(slot['live_throttle']))
+            if int(header['sequence']) == sequence:
+                return state, grid_state, live
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulação em outro processo, lida pela memória compartilhada")
+    parser.add_argument("--seconds", type=float, default=5.0, help="tempo lendo o estado")
+    parser.add_argument("--cars", type=int, default=0, help="grid com N carros")
+    parser.add_argument("--telemetry", help="segue a telemetria (.f1tel ou .csv) em vez do movimento sintético")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    client = SimulationClient(cars=args.cars, telemetry_path=args.telemetry)
+    client.toggle()
+    reads = 0
+    first = int(client.header['sequence'])
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.seconds:
+        state, _, _ = client.read()
+        reads += 1
+    elapsed = time.perf_counter() - start
+    published = int(client.header['sequence']) - first
+    client.stop()
+    print("%d leituras (%.0f/s), %d publicações (%.0f/s)" % (reads, reads / elapsed, published, published / elapsed))
+    print(state)
+
+
+if __name__ == "__main__":
+    main()
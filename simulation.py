@@ -0,0 +1,195 @@
+import argparse
+import collections
+import math
+import time
+
+# SIMULAÇÃO EM PASSO FIXO
+# Todo o estado da animação (rodas, pista, DRS, direção) avança em passos
+# fixos de 1/SIM_RATE segundos, independente da taxa de quadros. O
+# renderizador acumula o tempo real e desenha uma interpolação entre os dois
+# últimos estados. Sem relógio de parede: a mesma sequência de passos gera
+# sempre o mesmo estado, com ou sem janela.
+#
+#   python simulation.py --seconds 600     # simula 10 minutos sem janela
+
+SIM_RATE = 240
+CAR_SPEED = 15.0
+WHEEL_DEGREES_PER_METER = 50.0
+TRACK_OFFSET_PERIOD = 100.0
+DRS_OPEN_RATE = 3.0
+STEER_AMPLITUDE = 2.0
+STEER_FREQUENCY = 15.0
+# Limite de passos por chamada de advance(), para não travar após uma pausa longa
+MAX_FRAME_TIME = 0.25
+
+SimState = collections.namedtuple('SimState', [
+    'time', 'running', 'wheel_rotation', 'track_offset', 'drs_open', 'steer_angle',
+])
+
+INITIAL_STATE = SimState(0.0, False, 0.0, 0.0, 0.0, 0.0)
+
+
+# SimState a partir de um array de floats (arquivos de sessão, memória compartilhada)
+def state_from_values(values):
+    time_value, running, *rest = (float(value) for value in values)
+    return SimState(time_value, bool(running), *rest)
+
+
+# inputs: (velocidade em m/s, ângulo de direção em graus, DRS aberto) do
+# passo, vindos da telemetria; sem eles o movimento é o sintético.
+# track_period: onde track_offset dá a volta (o comprimento da volta em um
+# circuito, ver circuit.py)
+def step_state(state, dt, inputs=None, track_period=TRACK_OFFSET_PERIOD):
+    if not state.running:
+        return state
+
+    time_now = state.time + dt
+    if inputs is None:
+        speed = CAR_SPEED
+        steer_angle = math.sin(time_now * STEER_FREQUENCY) * STEER_AMPLITUDE
+        drs_target = 1.0
+    else:
+        speed, steer_angle, drs = inputs
+        drs_target = 1.0 if drs else 0.0
+
+    # Um passo anda bem menos que uma volta da roda ou um período da pista
+    # mesmo a 350 km/h, então uma correção basta
+    wheel_rotation = state.wheel_rotation - speed * WHEEL_DEGREES_PER_METER * dt
+    if wheel_rotation < 0:
+        wheel_rotation += 360
+
+    track_offset = state.track_offset - speed * dt
+    if track_offset < -track_period:
+        track_offset += track_period
+
+    return SimState(
+        time=time_now,
+        running=True,
+        wheel_rotation=wheel_rotation,
+        track_offset=track_offset,
+        drs_open=state.drs_open + (drs_target - state.drs_open) * DRS_OPEN_RATE * dt,
+        steer_angle=steer_angle,
+    )
+
+
+# Interpolação de um valor que dá a volta no intervalo [low, low + period)
+# (ângulo das rodas, deslocamento da pista): segue pelo caminho mais curto
+def _lerp_wrapped(a, b, t, low, period):
+    delta = (b - a + period / 2) % period - period / 2
+    return low + (a + delta * t - low) % period
+
+
+def interpolate(previous, current, alpha, track_period=TRACK_OFFSET_PERIOD):
+    if alpha <= 0 or previous is current:
+        return previous if alpha <= 0 else current
+    if alpha >= 1 or previous.running != current.running:
+        return current
+
+    def lerp(a, b):
+        return a + (b - a) * alpha
+
+    return SimState(
+        time=lerp(previous.time, current.time),
+        running=current.running,
+        wheel_rotation=_lerp_wrapped(previous.wheel_rotation, current.wheel_rotation, alpha, 0.0, 360.0),
+        track_offset=_lerp_wrapped(previous.track_offset, current.track_offset, alpha,
+                                   -track_period, track_period),
+        drs_open=lerp(previous.drs_open, current.drs_open),
+        steer_angle=lerp(previous.steer_angle, current.steer_angle),
+    )
+
+
+class Simulation:
+    def __init__(self, rate=SIM_RATE, state=INITIAL_STATE):
+        self.rate = rate
+        self.step_dt = 1.0 / rate
+        self.previous = state
+        self.current = state
+        self.accumulator = 0.0
+        self.steps = 0
+        # Funções chamadas com (estado, dt) depois de cada passo (ex.: CarGrid.step)
+        self.step_callbacks = []
+        # Fonte de (velocidade, direção, DRS) por instante, ex.: telemetry.TelemetryDriver
+        self.driver = None
+        # Comprimento da volta em um circuito (track_offset = -distância percorrida)
+        self.track_period = TRACK_OFFSET_PERIOD
+
+    @property
+    def running(self):
+        return self.current.running
+
+    # Ligar não muda o estado atual; desligar zera DRS e direção na hora,
+    # sem interpolar a partir do estado anterior
+    def set_running(self, running):
+        if running == self.current.running:
+            return
+        if running:
+            state = self.current._replace(running=True)
+        else:
+            state = self.current._replace(running=False, drs_open=0.0, steer_angle=0.0)
+        self.previous = self.current = state
+
+    def toggle(self):
+        self.set_running(not self.running)
+
+    # Volta ao estado dado, com o contador de passos zerado
+    def reset(self, state=INITIAL_STATE):
+        self.previous = self.current = state
+        self.accumulator = 0.0
+        self.steps = 0
+
+    def step(self):
+        self.previous = self.current
+        inputs = None
+        if self.driver is not None and self.current.running:
+            inputs = self.driver.inputs(self.current.time + self.step_dt)
+        self.current = step_state(self.current, self.step_dt, inputs, self.track_period)
+        self.steps += 1
+        for callback in self.step_callbacks:
+            callback(self.current, self.step_dt)
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.step()
+
+    # Acumula dt de tempo real, dá quantos passos couberem e devolve a
+    # fração (0 a 1) do próximo passo que já passou, para interpolar
+    def advance(self, dt):
+        self.accumulator += min(dt, MAX_FRAME_TIME)
+        while self.accumulator >= self.step_dt:
+            self.step()
+            self.accumulator -= self.step_dt
+        return self.accumulator / self.step_dt
+
+    def interpolated(self, alpha):
+        return interpolate(self.previous, self.current, alpha, self.track_period)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulação em passo fixo, sem janela")
+    parser.add_argument("--seconds", type=float, default=600.0, help="tempo simulado")
+    parser.add_argument("--rate", type=int, default=SIM_RATE, help="passos por segundo simulado")
+    parser.add_argument("--telemetry", help="segue a telemetria (.f1tel ou .csv) em vez do movimento sintético")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    simulation = Simulation(args.rate)
+    if args.telemetry:
+        import telemetry
+        simulation.driver = telemetry.TelemetryDriver(telemetry.open_telemetry(args.telemetry), simulation.step_dt)
+    simulation.set_running(True)
+    steps = int(round(args.seconds * args.rate))
+
+    start = time.perf_counter()
+    simulation.run(steps)
+    elapsed = time.perf_counter() - start
+
+    print("%d passos (%.1f s simulados) em %.3f s: %.0f passos/s, %.0fx tempo real" % (
+        steps, args.seconds, elapsed, steps / elapsed, args.seconds / elapsed))
+    print(simulation.current)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import itertools
+import os
+import time
+
+import numpy as np
+
+import simulation
+
+# TELEMETRIA GRAVADA
+# Em vez da velocidade constante, da direção senoidal e do DRS sempre
+# aberto, a simulação pode seguir uma volta real: tempo (s), velocidade
+# (km/h), ângulo das rodas dianteiras (graus) e DRS (0/1). O CSV é
+# convertido uma vez para um binário em colunas (cabeçalho + tempo, depois
+# velocidade, direção e DRS, cada coluna contígua), lido por np.memmap: uma
+# temporada com milhões de amostras não é carregada na memória, só as
+# páginas em volta do instante reproduzido.
+#
+#   python telemetry.py volta.csv                 # grava volta.f1tel
+#   python main.py --telemetry volta.f1tel        # ou direto o .csv
+#   python simulation.py --telemetry volta.f1tel --seconds 3600
+
+MAGIC = b'F1TELEM1'
+FORMAT_VERSION = 1
+EXTENSION = '.f1tel'
+COLUMNS = ('time', 'speed', 'steer', 'drs')
+COLUMN_DTYPES = {'time': '<f8', 'speed': '<f4', 'steer': '<f4', 'drs': 'u1'}
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('pad', '<u4'),
+    ('count', '<u8'),
+])
+
+# Linhas do CSV lidas por vez na conversão
+CSV_CHUNK = 1 << 18
+# Passos da simulação interpolados de uma vez (1 s a 240 Hz)
+DRIVER_CHUNK = simulation.SIM_RATE
+
+
+def _column_offsets(count):
+    offsets = {}
+    offset = HEADER_DTYPE.itemsize
+    for name in COLUMNS:
+        offsets[name] = offset
+        offset += count * np.dtype(COLUMN_DTYPES[name]).itemsize
+    return offsets, offset
+
+
+# CSV com cabeçalho (time, speed, steer, drs, em qualquer ordem; outras
+# colunas são ignoradas) -> binário. Duas passagens: contar as linhas e
+# preencher o arquivo mapeado em blocos, sem ter o CSV inteiro na memória.
+def convert_csv(csv_path, output_path=None):
+    output_path = output_path or os.path.splitext(csv_path)[0] + EXTENSION
+    with open(csv_path) as f:
+        names = [name.strip().lower() for name in f.readline().split(',')]
+        count = sum(1 for line in f if line.strip())
+    missing = [name for name in COLUMNS if name not in names]
+    if missing:
+        raise ValueError("%s: faltam as colunas %s" % (csv_path, ', '.join(missing)))
+    positions = [names.index(name) for name in COLUMNS]
+
+    offsets, size = _column_offsets(count)
+    temporary = '%s.%d.tmp' % (output_path, os.getpid())
+    data = np.memmap(temporary, dtype=np.uint8, mode='w+', shape=(size,))
+    header = np.ndarray((1,), HEADER_DTYPE, data, 0)
+    header[0] = (MAGIC, FORMAT_VERSION, 0, count)
+    columns = {name: np.ndarray((count,), COLUMN_DTYPES[name], data, offsets[name]) for name in COLUMNS}
+
+    with open(csv_path) as f:
+        f.readline()
+        start = 0
+        lines = (line for line in f if line.strip())
+        while start < count:
+            chunk = list(itertools.islice(lines, CSV_CHUNK))
+            values = np.loadtxt(chunk, delimiter=',', usecols=positions, ndmin=2)
+            end = start + len(values)
+            for i, name in enumerate(COLUMNS):
+                columns[name][start:end] = values[:, i]
+            start = end
+
+    if count > 1 and np.any(np.diff(columns['time']) < 0):
+        raise ValueError("%s: a coluna time precisa ser crescente" % csv_path)
+    data.flush()
+    del data, header, columns
+    os.replace(temporary, output_path)
+    return output_path
+
+
+class Telemetry:
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        header = np.frombuffer(self.data, HEADER_DTYPE, 1)[0]
+        if header['magic'] != MAGIC or header['version'] != FORMAT_VERSION:
+            raise ValueError("%s não é um arquivo de telemetria desta versão" % path)
+        self.count = int(header['count'])
+        if self.count < 2:
+            raise ValueError("%s: telemetria com menos de duas amostras" % path)
+        offsets, _ = _column_offsets(self.count)
+        for name in COLUMNS:
+            setattr(self, name, np.ndarray((self.count,), COLUMN_DTYPES[name], self.data, offsets[name]))
+        self.start = float(self.time[0])
+        self.duration = float(self.time[-1]) - self.start
+
+    # Velocidade (m/s), direção (graus) e DRS (0 ou 1) nos instantes dados,
+    # em segundos desde o início da volta (ela se repete depois do fim).
+    # Busca binária na coluna de tempo e interpolação linear entre as duas
+    # amostras vizinhas: só as páginas em volta de cada instante são lidas.
+    def sample(self, seconds):
+        times = self.start + np.mod(np.asarray(seconds, dtype=np.float64), self.duration)
+        upper = np.clip(np.searchsorted(self.time, times, 'right'), 1, self.count - 1)
+        lower = upper - 1
+        t0, t1 = self.time[lower], self.time[upper]
+        span = t1 - t0
+        alpha = np.divide(times - t0, span, out=np.zeros_like(times), where=span > 0)
+
+        def lerp(column):
+            a = column[lower].astype(np.float64)
+            return a + (column[upper] - a) * alpha
+
+        # DRS é um estado (aberto/fechado): vale a amostra anterior
+        return lerp(self.speed) / 3.6, lerp(self.steer), self.drs[lower].astype(np.float64)
+
+
+# Entradas da simulação (simulation.Simulation.driver) tiradas da telemetria.
+# Os próximos DRIVER_CHUNK passos são interpolados de uma vez, em NumPy.
+class TelemetryDriver:
+    def __init__(self, telemetry, step_dt=1.0 / simulation.SIM_RATE, chunk=DRIVER_CHUNK):
+        self.telemetry = telemetry
+        self.step_dt = step_dt
+        self.chunk = chunk
+        self.first = None
+        self.values = None
+
+    def inputs(self, seconds):
+        slot = -1 if self.first is None else int(round((seconds - self.first) / self.step_dt))
+        if not 0 <= slot < self.chunk:
+            self.first = seconds
+            times = seconds + np.arange(self.chunk) * self.step_dt
+            self.values = np.column_stack(self.telemetry.sample(times)).tolist()
+            slot = 0
+        speed, steer, drs = self.values[slot]
+        return speed, steer, drs > 0.5
+
+
+# .f1tel direto; um .csv é convertido na primeira vez (e de novo se mudar)
+def open_telemetry(path):
+    if path.lower().endswith('.csv'):
+        binary = os.path.splitext(path)[0] + EXTENSION
+        if not os.path.exists(binary) or os.path.getmtime(binary) < os.path.getmtime(path):
+            convert_csv(path, binary)
+        path = binary
+    return Telemetry(path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Converte telemetria CSV para o formato binário mapeado")
+    parser.add_argument("csv", help="CSV com as colunas time, speed, steer e drs")
+    parser.add_argument("--output", help="arquivo de saída (padrão: o CSV com extensão %s)" % EXTENSION)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    path = convert_csv(args.csv, args.output)
+    elapsed = time.perf_counter() - start
+    telemetry = Telemetry(path)
+    print("%s: %d amostras, %.1f s de telemetria, %.1f MiB, convertido em %.2f s" % (
+        path, telemetry.count, telemetry.duration, len(telemetry.data) / 2 ** 20, elapsed))
+
+
+if __name__ == "__main__":
+    main()
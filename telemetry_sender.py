@@ -0,0 +1,106 @@
+import argparse
+import math
+import socket
+import time
+
+import numpy as np
+
+import live_telemetry
+
+# FONTE DE TELEMETRIA DE TESTE
+# Manda pacotes no formato de live_telemetry.py para a porta do viewer, no
+# lugar de um simulador ou equipamento de corrida: uma volta sintética
+# (acelera, freia, abre o DRS nas retas) ou uma volta gravada (.f1tel/.csv,
+# ver telemetry.py). Os pacotes devidos desde o último envio são montados
+# de uma vez com NumPy, então taxas de vários kHz não dependem da precisão
+# do sleep.
+#
+#   python telemetry_sender.py --rate 5000 --seconds 30
+#   python telemetry_sender.py --telemetry volta.f1tel
+#   python telemetry_sender.py --rate 0 --seconds 5      # o mais rápido possível
+
+LAP_SECONDS = 80.0
+# Pacotes no máximo por envio, para uma pausa longa não virar uma rajada enorme
+MAX_BATCH = 1024
+
+
+# Velocidade (km/h), direção (graus), acelerador (0 a 1) e DRS nos instantes dados
+def synthetic_lap(times):
+    phase = 2 * np.pi * times / LAP_SECONDS
+    speed = 190 + 110 * np.sin(phase * 3) + 20 * np.sin(phase * 7)
+    acceleration = 330 * np.cos(phase * 3) + 140 * np.cos(phase * 7)
+    throttle = np.clip(0.6 + acceleration / 400, 0, 1)
+    steer = np.where(speed < 160, 6.0, 1.0) * np.sin(phase * 5)
+    drs = (speed > 260).astype(np.uint8)
+    return speed, steer, throttle, drs
+
+
+# A telemetria gravada não tem acelerador: vem da aceleração (km/h por
+# segundo), medida sobre THROTTLE_WINDOW segundos antes de cada instante, e
+# não entre amostras vizinhas; assim não depende de --rate nem do tamanho do
+# lote. Cada km/h/s soma THROTTLE_GAIN aos 0,6 de cruzeiro: +10 km/h/s
+# (0,28 g) já é acelerador pleno e -15 km/h/s, freada, é zero.
+THROTTLE_WINDOW = 0.1
+THROTTLE_GAIN = 0.04
+
+
+def recorded_lap(telemetry):
+    def sample(times):
+        speed, steer, drs = telemetry.sample(times)
+        earlier, _, _ = telemetry.sample(times - THROTTLE_WINDOW)
+        acceleration = (speed - earlier) * 3.6 / THROTTLE_WINDOW
+        throttle = np.clip(0.6 + acceleration * THROTTLE_GAIN, 0, 1)
+        return speed * 3.6, steer, throttle, drs.astype(np.uint8)
+    return sample
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Manda telemetria de teste por UDP para o viewer")
+    parser.add_argument("--host", default=live_telemetry.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=live_telemetry.DEFAULT_PORT)
+    parser.add_argument("--rate", type=float, default=1000.0, help="pacotes por segundo (0 = sem limite)")
+    parser.add_argument("--seconds", type=float, default=0.0, help="tempo enviando (0 = até Ctrl+C)")
+    parser.add_argument("--telemetry", help="volta gravada (.f1tel ou .csv) em vez da sintética")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    source = synthetic_lap
+    if args.telemetry:
+        import telemetry
+        source = recorded_lap(telemetry.open_telemetry(args.telemetry))
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = (args.host, args.port)
+    print("enviando para %s:%d (%s pacotes/s)" % (args.host, args.port, args.rate or "sem limite de"))
+
+    sent = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            elapsed = time.perf_counter() - start
+            if args.seconds and elapsed >= args.seconds:
+                break
+            due = MAX_BATCH if not args.rate else min(int(elapsed * args.rate) - sent, MAX_BATCH)
+            if due <= 0:
+                time.sleep(0.0005)
+                continue
+
+            if args.rate:
+                times = (sent + np.arange(due)) / args.rate
+            else:
+                times = np.full(due, elapsed)
+            packets = live_telemetry.make_packets(sent, times, *source(times))
+            for packet in packets.view(np.uint8).reshape(due, live_telemetry.PACKET_SIZE):
+                sock.sendto(packet, address)
+            sent += due
+    except KeyboardInterrupt:
+        pass
+
+    elapsed = time.perf_counter() - start
+    print("%d pacotes em %.1f s (%.0f/s)" % (sent, elapsed, sent / elapsed if elapsed else math.inf))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import numpy as np
+
+from mesh import merge_meshes, quads
+
+# PISTA DE CORRIDA
+# A pista é formada por poucas malhas fixas. As faixas tracejadas e as
+# zebras são quads texturizados; o movimento vem do deslocamento da
+# coordenada de textura (track_texture_offset), não da geometria. Cada
+# malha é dividida em trechos de TRACK_CHUNK_LENGTH ao longo de x
+# (componentes 'chunk_N'), para que trechos fora da tela sejam descartados.
+
+TRACK_LENGTH = 80.0
+TRACK_WIDTH = 8.0
+TRACK_Y = -0.56
+LINE_WIDTH = 0.15
+DASH_LENGTH = 2.0
+DASH_GAP = 2.0
+DASH_WIDTH = 0.12
+KERB_WIDTH = 0.4
+KERB_SEGMENT_LENGTH = 1.5
+GRASS_WIDTH = 15.0
+START_X = -25.0
+START_WIDTH = 0.5
+FINISH_X = 25.0
+CHECKER_SIZE = 0.3
+CHECKER_ROWS = 3
+TRACK_CHUNK_LENGTH = 10.0
+
+ASPHALT_COLOR = (0.15, 0.15, 0.17)
+LINE_COLOR = (0.95, 0.95, 0.95)
+DASH_COLOR = (0.9, 0.9, 0.9)
+KERB_RED = (0.9, 0.1, 0.1)
+KERB_WHITE = (0.95, 0.95, 0.95)
+GRASS_COLOR = (0.15, 0.45, 0.15)
+CHECKER_DARK = (0.1, 0.1, 0.1)
+
+DASH_PERIOD = DASH_LENGTH + DASH_GAP
+KERB_PERIOD = KERB_SEGMENT_LENGTH * 2
+WHITE = (1.0, 1.0, 1.0)
+
+
+def _flat_rect(x0, x1, z0, z1, y, color):
+    return quads([[(x0, y, z0), (x0, y, z1), (x1, y, z1), (x1, y, z0)]], color, (0, 1, 0))
+
+# Intervalos [x0, x1) de cada trecho da pista
+def track_chunks(track_length=TRACK_LENGTH, chunk_length=TRACK_CHUNK_LENGTH):
+    count = max(1, int(np.ceil(track_length / chunk_length - 1e-9)))
+    edges = np.minimum(-track_length / 2 + np.arange(count + 1) * chunk_length, track_length / 2)
+    return list(zip(edges[:-1], edges[1:]))
+
+def _chunked(parts_for_chunk, track_length, chunk_length, name):
+    return merge_meshes([merge_meshes(parts_for_chunk(x0, x1), 'chunk_%d' % i)
+                         for i, (x0, x1) in enumerate(track_chunks(track_length, chunk_length))], name)
+
+# Quad de x0 a x1 com u = distância desde o início da pista / período
+def _scrolling_strip(x0, x1, track_length, z0, z1, y, period, name):
+    u0 = (x0 + track_length / 2) / period
+    u1 = (x1 + track_length / 2) / period
+    strip = _flat_rect(x0, x1, z0, z1, y, WHITE).with_uvs([(u0, 0), (u0, 1), (u1, 1), (u1, 0)])
+    strip.name = name
+    return strip
+
+
+# Asfalto, linhas laterais, grama, largada e chegada: nada disso se move
+def track_surface_mesh(track_length=TRACK_LENGTH, chunk_length=TRACK_CHUNK_LENGTH):
+    half_width = TRACK_WIDTH / 2
+    y = TRACK_Y
+
+    def parts(x0, x1):
+        chunk = [_flat_rect(x0, x1, -half_width, half_width, y, ASPHALT_COLOR)]
+
+        for side in [-1, 1]:
+            z_pos = side * (half_width - LINE_WIDTH / 2)
+            chunk.append(_flat_rect(x0, x1, z_pos - LINE_WIDTH / 2, z_pos + LINE_WIDTH / 2, y + 0.01, LINE_COLOR))
+
+        for side in [-1, 1]:
+            z_base = side * (half_width + KERB_WIDTH + GRASS_WIDTH / 2)
+            chunk.append(_flat_rect(x0, x1, z_base - GRASS_WIDTH / 2, z_base + GRASS_WIDTH / 2,
+                                    y - 0.01, GRASS_COLOR))
+
+        if x0 <= START_X < x1:
+            chunk.append(_flat_rect(START_X, START_X + START_WIDTH, -half_width + LINE_WIDTH,
+                                    half_width - LINE_WIDTH, y + 0.02, LINE_COLOR))
+        if x0 <= FINISH_X < x1:
+            chunk.append(finish_line_mesh())
+        return chunk
+
+    return _chunked(parts, track_length, chunk_length, 'track_surface')
+
+def finish_line_mesh():
+    columns = int((TRACK_WIDTH - 2 * LINE_WIDTH) / CHECKER_SIZE)
+    i, j = np.meshgrid(np.arange(CHECKER_ROWS), np.arange(columns), indexing='ij')
+    i, j = i.reshape(-1), j.reshape(-1)
+
+    x0 = FINISH_X + i * CHECKER_SIZE
+    z0 = -TRACK_WIDTH / 2 + LINE_WIDTH + j * CHECKER_SIZE
+    x1 = x0 + CHECKER_SIZE
+    z1 = z0 + CHECKER_SIZE
+    y = np.full_like(x0, TRACK_Y + 0.02, dtype=np.float64)
+    corners = np.stack([
+        np.stack((x0, y, z0), axis=1),
+        np.stack((x0, y, z1), axis=1),
+        np.stack((x1, y, z1), axis=1),
+        np.stack((x1, y, z0), axis=1),
+    ], axis=1)
+
+    mesh = quads(corners, WHITE, (0, 1, 0), 'finish_line')
+    dark = np.repeat((i + j) % 2 == 0, 4)
+    mesh.colors[dark] = CHECKER_DARK
+    mesh.colors[~dark] = LINE_COLOR
+    return mesh
+
+def track_dashes_mesh(track_length=TRACK_LENGTH, chunk_length=TRACK_CHUNK_LENGTH):
+    mesh = _chunked(lambda x0, x1: [
+        _scrolling_strip(x0, x1, track_length, -DASH_WIDTH / 2, DASH_WIDTH / 2, TRACK_Y + 0.01, DASH_PERIOD,
+                         'dashes')
+    ], track_length, chunk_length, 'track_dashes')
+    mesh.metadata['period'] = DASH_PERIOD
+    return mesh
+
+def track_kerbs_mesh(track_length=TRACK_LENGTH, chunk_length=TRACK_CHUNK_LENGTH):
+    half_width = TRACK_WIDTH / 2
+    mesh = _chunked(lambda x0, x1: [
+        _scrolling_strip(x0, x1, track_length, side * half_width + min(0, side * KERB_WIDTH),
+                         side * half_width + max(0, side * KERB_WIDTH), TRACK_Y + 0.02, KERB_PERIOD, 'kerb')
+        for side in [-1, 1]
+    ], track_length, chunk_length, 'track_kerbs')
+    mesh.metadata['period'] = KERB_PERIOD
+    return mesh
+
+
+# TEXTURAS (RGBA, uma linha de texels que se repete ao longo de u)
+# Tracejado: primeira metade é a faixa, segunda metade é transparente
+def dash_texture_pixels():
+    dash = [int(c * 255) for c in DASH_COLOR] + [255]
+    return np.array([[dash, [0, 0, 0, 0]]], dtype=np.uint8)
+
+def kerb_texture_pixels():
+    red = [int(c * 255) for c in KERB_RED] + [255]
+    white = [int(c * 255) for c in KERB_WHITE] + [255]
+    return np.array([[red, white]], dtype=np.uint8)
+
+
+# Deslocamento em u que faz o padrão andar junto com track_line_offset
+def track_texture_offset(track_offset, period):
+    return -(track_offset % period) / period
@@ -0,0 +1,149 @@
+import collections
+import concurrent.futures
+import time
+
+import numpy as np
+
+import circuit as circuit_module
+import culling
+
+# STREAMING DOS TRECHOS DO CIRCUITO
+# Em um circuito mais longo que a vista, só os trechos (circuit.chunk_meshes)
+# a até radius metros do carro ou da câmera precisam estar na GPU. Os
+# próximos trechos no sentido da corrida são gerados antes, em uma thread,
+# e enviados à GPU no loop de desenho, no máximo MAX_UPLOADS_PER_FRAME por
+# quadro. Os buffers ficam em um cache LRU: passando de budget bytes, os
+# trechos usados há mais tempo são liberados, menos os do raio e os logo à
+# frente, e a busca antecipada espera até sobrar espaço. Um trecho
+# necessário que ainda não ficou pronto é esperado na hora, então a imagem
+# nunca sai sem pista; com a busca antecipada isso só acontece na largada
+# ou depois de um salto (seek).
+#
+#   python main.py --circuit --track-budget 2      # 2 MiB de trechos na GPU
+
+PARTS = ('surface', 'dashes', 'kerbs')
+# Raio em volta do carro e da câmera: o plano distante da projeção
+STREAM_RADIUS = 200.0
+# Quanto além do raio, à frente do carro, os trechos são gerados antes
+PREFETCH_DISTANCE = 150.0
+DEFAULT_BUDGET = 4 * 1024 * 1024
+MAX_UPLOADS_PER_FRAME = 2
+
+# Trecho residente: buffers por parte, malhas (para o caminho sem geometria
+# compilada), caixa de limites e bytes enviados
+ChunkEntry = collections.namedtuple('ChunkEntry', ['buffers', 'meshes', 'low', 'high', 'nbytes'])
+
+
+class ChunkStreamer:
+    def __init__(self, circuit, new_buffer, budget=DEFAULT_BUDGET, radius=STREAM_RADIUS,
+                 prefetch=PREFETCH_DISTANCE):
+        self.circuit = circuit
+        self.new_buffer = new_buffer
+        self.budget = budget
+        self.radius = radius
+        self.prefetch = prefetch
+        self.centers, self.radii = circuit_module.chunk_spheres(circuit)
+
+        # Do usado há mais tempo para o mais recente
+        self.resident = collections.OrderedDict()
+        self.pending = {}
+        self.needed = set()
+        # Necessários mais os à frente: nunca liberados
+        self.kept = set()
+        self.resident_bytes = 0
+        self.pool = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix='track-chunks')
+        self.stats = {'uploads': 0, 'prefetched': 0, 'waited': 0, 'wait_ms': 0.0, 'evictions': 0}
+
+    # Trechos cuja esfera chega a radius metros de algum dos pontos (x, z)
+    def chunks_near(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        distances = np.linalg.norm(self.centers[:, None] - points[None], axis=2).min(axis=1)
+        return set(np.flatnonzero(distances <= self.radius + self.radii).tolist())
+
+    # Trechos de distance até prefetch metros depois do fim do raio
+    def chunks_ahead(self, distance):
+        first = int(distance // self.circuit.chunk_length)
+        count = int(np.ceil((self.radius + self.prefetch) / self.circuit.chunk_length))
+        return [(first + i) % self.circuit.chunk_count for i in range(count + 1)]
+
+    def _request(self, index):
+        if index not in self.resident and index not in self.pending:
+            self.pending[index] = self.pool.submit(circuit_module.chunk_meshes, self.circuit, index)
+
+    def _upload(self, index, meshes):
+        buffers = {part: self.new_buffer(meshes[part]) for part in PARTS}
+        lows, highs = zip(*(mesh.bounds() for mesh in meshes.values() if mesh.vertex_count))
+        entry = ChunkEntry(buffers, meshes, np.min(lows, axis=0), np.max(highs, axis=0),
+                           sum(mesh.nbytes for mesh in meshes.values()))
+        self.resident[index] = entry
+        self.resident_bytes += entry.nbytes
+        self.stats['uploads'] += 1
+
+    def _evict(self):
+        for index in list(self.resident):
+            if self.resident_bytes <= self.budget:
+                break
+            if index in self.kept:
+                continue
+            entry = self.resident.pop(index)
+            for buffer in entry.buffers.values():
+                buffer.release()
+            self.resident_bytes -= entry.nbytes
+            self.stats['evictions'] += 1
+
+    # Chamado uma vez por quadro: distance é a posição do carro na volta e
+    # camera, a posição (x, z) da câmera nas coordenadas do circuito
+    def update(self, distance, camera):
+        car, _ = self.circuit.sample([distance])
+        self.needed = self.chunks_near(np.vstack((car, [camera])))
+
+        ahead = self.chunks_ahead(distance)
+        self.kept = self.needed.union(ahead)
+        for index in self.needed:
+            self._request(index)
+        # Com o orçamento cheio, os adiantados esperam a liberação dos que ficaram para trás
+        for index in ahead:
+            if self.resident_bytes < self.budget:
+                self._request(index)
+
+        # Necessários primeiro (esperando se preciso), depois os adiantados que já ficaram prontos
+        start = time.perf_counter()
+        waited = 0
+        for index in sorted(self.needed & self.pending.keys()):
+            future = self.pending.pop(index)
+            waited += not future.done()
+            self._upload(index, future.result())
+        if waited:
+            self.stats['waited'] += waited
+            self.stats['wait_ms'] += (time.perf_counter() - start) * 1000
+        uploads = 0
+        for index, future in list(self.pending.items()):
+            if uploads == MAX_UPLOADS_PER_FRAME:
+                break
+            if future.done():
+                del self.pending[index]
+                self._upload(index, future.result())
+                self.stats['prefetched'] += 1
+                uploads += 1
+
+        for index in self.needed:
+            self.resident.move_to_end(index)
+        self._evict()
+
+    # Trechos necessários dentro do frustum (nas coordenadas do circuito)
+    def visible(self, frustum=None):
+        entries = [self.resident[index] for index in sorted(self.needed)]
+        if frustum is None or not entries:
+            return entries
+        visible = culling.boxes_visible(frustum, [entry.low for entry in entries],
+                                        [entry.high for entry in entries])
+        return [entry for entry, shown in zip(entries, visible) if shown]
+
+    def release(self):
+        self.pool.shutdown(cancel_futures=True)
+        for entry in self.resident.values():
+            for buffer in entry.buffers.values():
+                buffer.release()
+        self.resident.clear()
+        self.pending.clear()
+        self.resident_bytes = 0